@@ -0,0 +1,34 @@
+import sys, os
+import argparse
+
+# this add to path eBCSgen home dir, so it can be called from anywhere
+sys.path.append(os.path.split(sys.path[0])[0])
+
+from Parsing.ParseBCSL import load_TS
+from TS.BinaryTS import binary_TS_from_json, is_binary_TS
+
+"""
+usage: ConvertTS.py [-h] --input INPUT --output OUTPUT
+
+Transition system conversion between JSON and binary format
+(JSON is converted to binary, binary is converted to JSON)
+
+required arguments:
+  --input INPUT
+  --output OUTPUT
+"""
+
+args_parser = argparse.ArgumentParser(description='Transition system conversion')
+
+args_parser._action_groups.pop()
+required = args_parser.add_argument_group('required arguments')
+
+required.add_argument('--input', type=str, required=True)
+required.add_argument('--output', type=str, required=True)
+
+args = args_parser.parse_args()
+
+if is_binary_TS(args.input):
+    load_TS(args.input).save_to_json(args.output)
+else:
+    binary_TS_from_json(args.input).save(args.output)
@@ -0,0 +1,33 @@
+import sys, os
+import argparse
+
+# this add to path eBCSgen home dir, so it can be called from anywhere
+sys.path.append(os.path.split(sys.path[0])[0])
+
+import Parsing.ParseBCSL
+import Parsing.ParsePCTLformula
+
+"""
+usage: GenerateParserTables.py [-h] [--start START [START ...]]
+
+Pre-generates serialised LALR tables of BCSL and PCTL parsers to Parsing/tables,
+parsers created later (in any process) load them instead of compiling the grammar.
+
+optional arguments:
+  --start START [START ...]
+"""
+
+args_parser = argparse.ArgumentParser(description='Parser tables generating')
+
+args_parser._action_groups.pop()
+optional = args_parser.add_argument_group('optional arguments')
+
+optional.add_argument('--start', type=str, nargs="+", default=["model", "rate_complex"])
+
+args = args_parser.parse_args()
+
+os.makedirs(Parsing.ParseBCSL.TABLES_DIRECTORY, exist_ok=True)
+
+for start in args.start:
+    Parsing.ParseBCSL.Parser(start)
+Parsing.ParsePCTLformula.PCTLparser()
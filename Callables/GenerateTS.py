@@ -5,15 +5,21 @@ import numpy as np
 # this add to path eBCSgen home dir, so it can be called from anywhere
 sys.path.append(os.path.split(sys.path[0])[0])
 
-from Parsing.ParseBCSL import Parser, load_TS_from_json
+from Parsing.ParseBCSL import Parser, load_TS, load_TS_from_checkpoint
 from Errors.ModelParsingError import ModelParsingError
 from Errors.UnspecifiedParsingError import UnspecifiedParsingError
 from Errors.RatesNotSpecifiedError import RatesNotSpecifiedError
+from TS.Checkpoint import is_checkpoint
+from TS.TSworker import CHECKPOINT_INTERVAL
+from TS.VectorModel import ENGINES
 
 """
 usage: GenerateTS.py [-h] --model MODEL --output OUTPUT
                      [--transition_file TRANSITION_FILE] [--max_time MAX_TIME]
-                     [--max_size MAX_SIZE] [--bound BOUND]
+                     [--max_size MAX_SIZE] [--bound BOUND] [--network_free]
+                     [--engine {workers,batch}] [--checkpoint CHECKPOINT]
+                     [--checkpoint_interval CHECKPOINT_INTERVAL]
+                     [--output_format {json,binary}] [--processes PROCESSES]
 
 Transition system generating
 
@@ -26,6 +32,15 @@ optional arguments:
   --max_time MAX_TIME
   --max_size MAX_SIZE
   --bound BOUND
+  --network_free
+  --engine {workers,batch}
+  --checkpoint CHECKPOINT
+  --checkpoint_interval CHECKPOINT_INTERVAL
+  --output_format {json,binary}
+  --processes PROCESSES
+
+TRANSITION_FILE can be TS in JSON, binary TS or a checkpoint.
+If PROCESSES is given, the state space is explored by that many processes (engine and checkpoints are not used).
 """
 
 args_parser = argparse.ArgumentParser(description='Transition system generating')
@@ -41,11 +56,20 @@ optional.add_argument('--transition_file')
 optional.add_argument('--max_time', type=float, default=np.inf)
 optional.add_argument('--max_size', type=float, default=np.inf)
 optional.add_argument('--bound', type=int, default=None)
+optional.add_argument('--network_free', action='store_true')
+optional.add_argument('--engine', type=str, default="workers", choices=ENGINES)
+optional.add_argument('--checkpoint', type=str, default=None)
+optional.add_argument('--checkpoint_interval', type=float, default=CHECKPOINT_INTERVAL)
+optional.add_argument('--output_format', type=str, default="json", choices=["json", "binary"])
+optional.add_argument('--processes', type=int, default=None)
 
 args = args_parser.parse_args()
 
 if args.transition_file and args.transition_file != 'None':
-    ts = load_TS_from_json(args.transition_file)
+    if is_checkpoint(args.transition_file):
+        ts = load_TS_from_checkpoint(args.transition_file)
+    else:
+        ts = load_TS(args.transition_file)
 else:
     ts = None
 
@@ -57,9 +81,16 @@ if model.success:
     if not model.data.all_rates:
         raise RatesNotSpecifiedError
 
-    vm = model.data.to_vector_model(args.bound)
-    ts = vm.generate_transition_system(ts, args.max_time, args.max_size)
-    ts.save_to_json(args.output)
+    if args.network_free:
+        vm = model.data.to_rule_based_model(args.bound)
+    else:
+        vm = model.data.to_vector_model(args.bound)
+    ts = vm.generate_transition_system(ts, args.max_time, args.max_size, args.processes, engine=args.engine,
+                                       checkpoint=args.checkpoint, checkpoint_interval=args.checkpoint_interval)
+    if args.output_format == "binary":
+        ts.save_to_binary(args.output)
+    else:
+        ts.save_to_json(args.output)
 else:
     if "error" in model.data:
         raise UnspecifiedParsingError(model.data["error"])
@@ -14,7 +14,7 @@ from Errors.RatesNotSpecifiedError import RatesNotSpecifiedError
 
 """
 usage: ModelChecking.py [-h] --model MODEL --output OUTPUT [--bound BOUND]
-                        --formula FORMULA [--local_storm]
+                        --formula FORMULA [--local_storm] [--native] [--fifo]
 
 Model checking
 
@@ -26,6 +26,8 @@ required arguments:
 optional arguments:
   --bound BOUND
   --local_storm
+  --native
+  --fifo
 """
 
 args_parser = argparse.ArgumentParser(description='Model checking')
@@ -39,6 +41,8 @@ required.add_argument('--output', type=str, required=True)
 optional.add_argument('--bound', type=int, default=None)
 required.add_argument('--formula', type=str, required=True)
 optional.add_argument('--local_storm', nargs="?", const=True)
+optional.add_argument('--native', nargs="?", const=True)
+optional.add_argument('--fifo', nargs="?", const=True)
 
 args = args_parser.parse_args()
 
@@ -64,9 +68,13 @@ if model.success:
 
     formula = Parsing.ParsePCTLformula.PCTLparser().parse(args.formula)
     if formula.success:
-        result = model.data.PCTL_model_checking(formula, bound, local_storm)
+        if args.native:
+            result = model.data.PCTL_model_checking_native([formula], bound)[0]
+            result = 'Model checking property "{}" ...\nResult (for initial states): {}\n'.format(formula, result)
+        else:
+            result = model.data.PCTL_model_checking(formula, bound, local_storm, fifo=bool(args.fifo)).decode("utf-8")
         f = open(args.output, "w")
-        f.write(result.decode("utf-8"))
+        f.write(result)
         f.close()
     else:
         raise FormulaParsingError(formula.data, args.formula)
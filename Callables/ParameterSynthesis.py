@@ -16,7 +16,7 @@ from Errors.RatesNotSpecifiedError import RatesNotSpecifiedError
 """
 usage: ParameterSynthesis.py [-h] --model MODEL --output OUTPUT
                              [--bound BOUND] --formula FORMULA
-                             [--region REGION] [--local_storm]
+                             [--region REGION] [--local_storm] [--fifo]
 
 Parameter synthesis
 
@@ -29,6 +29,7 @@ optional arguments:
   --bound BOUND
   --region REGION
   --local_storm
+  --fifo
 """
 
 args_parser = argparse.ArgumentParser(description='Parameter synthesis')
@@ -43,6 +44,7 @@ optional.add_argument('--bound', type=int, default=None)
 required.add_argument('--formula', type=str, required=True)
 optional.add_argument('--region', type=str)
 optional.add_argument('--local_storm', nargs="?", const=True)
+optional.add_argument('--fifo', nargs="?", const=True)
 
 args = args_parser.parse_args()
 
@@ -83,7 +85,7 @@ if model.success:
 
     formula = Parsing.ParsePCTLformula.PCTLparser().parse(args.formula)
     if formula.success:
-        result = model.data.PCTL_synthesis(formula, region, bound, local_storm)
+        result = model.data.PCTL_synthesis(formula, region, bound, local_storm, fifo=bool(args.fifo))
         f = open(args.output, "w")
         f.write(result.decode("utf-8"))
         f.close()
@@ -9,11 +9,15 @@ from Errors.ModelParsingError import ModelParsingError
 from Errors.UnspecifiedParsingError import UnspecifiedParsingError
 from Errors.InvalidInputError import InvalidInputError
 from Errors.RatesNotSpecifiedError import RatesNotSpecifiedError
+from TS.StochasticSimulator import METHODS
+from TS.VectorModel import SOLVERS
 
 """
 usage: Simulation.py [-h] --model MODEL --output OUTPUT --deterministic
                      DETERMINISTIC --runs RUNS --max_time MAX_TIME --volume
-                     VOLUME --step STEP
+                     VOLUME --step STEP [--processes PROCESSES] [--seed SEED]
+                     [--method {direct,next_reaction,tau_leaping}]
+                     [--solver {odeint,LSODA,BDF,Radau,RK45,RK23,DOP853}]
 
 Simulation
 
@@ -25,12 +29,19 @@ required arguments:
   --max_time MAX_TIME
   --volume VOLUME
   --step STEP
+
+optional arguments:
+  --processes PROCESSES
+  --seed SEED
+  --method {direct,next_reaction,tau_leaping}
+  --solver {odeint,LSODA,BDF,Radau,RK45,RK23,DOP853}
 """
 
 args_parser = argparse.ArgumentParser(description='Simulation')
 
 args_parser._action_groups.pop()
 required = args_parser.add_argument_group('required arguments')
+optional = args_parser.add_argument_group('optional arguments')
 
 required.add_argument('--model', type=str, required=True)
 required.add_argument('--output', type=str, required=True)
@@ -39,6 +50,10 @@ required.add_argument('--runs', type=int, required=True)
 required.add_argument('--max_time', type=float, required=True)
 required.add_argument('--volume', type=float, required=True)
 required.add_argument('--step', type=float, required=True)
+optional.add_argument('--processes', type=int, default=None)
+optional.add_argument('--seed', type=int, default=None)
+optional.add_argument('--method', choices=METHODS, default="direct")
+optional.add_argument('--solver', choices=SOLVERS, default="odeint")
 
 args = args_parser.parse_args()
 
@@ -55,9 +70,13 @@ if model.success:
 
     vm = model.data.to_vector_model()
     if eval(args.deterministic):
-        df = vm.deterministic_simulation(args.max_time, args.volume, args.step)
+        df = vm.deterministic_simulation(args.max_time, args.volume, args.step, args.solver)
+    elif args.processes or args.seed is not None:
+        # seeded runs are reproducible only in the parallel mode (in a single process if not specified)
+        df = vm.stochastic_simulation_parallel(args.max_time, args.runs, args.step, args.processes or 1, args.seed,
+                                             method=args.method)
     else:
-        df = vm.stochastic_simulation(args.max_time, args.runs)
+        df = vm.stochastic_simulation(args.max_time, args.runs, method=args.method)
 
     df.to_csv(args.output, index=None, header=True)
 else:
@@ -2,6 +2,10 @@ import collections
 import itertools
 
 import Core.Atomic
+import Core.SpeciesRegistry
+
+COMPATIBILITY_CACHE = dict()
+CACHE_LIMIT = 2 ** 16
 
 
 class Complex:
@@ -58,30 +62,50 @@ class Complex:
         """
         Checks whether two Complexes are compatible.
 
+        It is the case when there is a bijection between agents of the Complexes such that
+        each agent is compatible with its image. The bijection is searched as a perfect matching
+        in bipartite graph of compatible agents. Results are cached by canonical forms
+        of the Complexes (compartment and sorted agents).
+
         :param other: another Complex
         :return: True if they are compatible
         """
         if type(self) != type(other):
             return False
-        if self == other:
-            return True
-        self_agents = collections.Counter(self.agents)
-        other_agents = collections.Counter(other.agents)
-        if self.compartment == other.compartment and sum(self_agents.values()) == sum(other_agents.values()):
-            other_permutations = list(itertools.permutations(list(other_agents.elements())))
-            for self_perm in itertools.permutations(list(self_agents.elements())):
-                for other_perm in other_permutations:
-                    if all([self_perm[i].compatible(other_perm[i]) for i in range(len(self_perm))]):
-                        return True
-        return False
+        self_agents = list(collections.Counter(self.agents).elements())
+        other_agents = list(collections.Counter(other.agents).elements())
+        if self.compartment != other.compartment or len(self_agents) != len(other_agents):
+            return False
+
+        key = (self.compartment, tuple(sorted(map(str, self_agents))), tuple(sorted(map(str, other_agents))))
+        if key not in COMPATIBILITY_CACHE:
+            if len(COMPATIBILITY_CACHE) >= CACHE_LIMIT:
+                COMPATIBILITY_CACHE.clear()
+            candidates = [[j for j in range(len(other_agents)) if agent.compatible(other_agents[j])]
+                          for agent in self_agents]
+            COMPATIBILITY_CACHE[key] = exists_perfect_matching(candidates)
+        return COMPATIBILITY_CACHE[key]
+
+    def get_skeleton(self) -> tuple:
+        """
+        Creates skeleton of the Complex - compartment and sorted names of its agents (without any context).
+        Only Complexes with the same skeleton can be compatible.
+
+        :return: hashable skeleton
+        """
+        agents = collections.Counter(self.agents).elements()
+        return self.compartment, tuple(sorted([(type(agent).__name__, agent.name) for agent in agents]))
 
     def identify_compatible(self, agents: tuple) -> list:
         """
         Identifies compatible agents from given list.
+        For SpeciesRegistry, only Complexes with the same skeleton are checked.
 
         :param agents: given tuple of agents (ordering)
         :return: list of indices of compatible agents
         """
+        if isinstance(agents, Core.SpeciesRegistry.SpeciesRegistry):
+            return [i for i in agents.with_skeleton(self.get_skeleton()) if self.compatible(agents[i])]
         positions = []
         for i in range(len(agents)):
             if self.compatible(agents[i]):
@@ -113,3 +137,24 @@ class Complex:
         for result in itertools.product(*results):
             output_complexes.add(Complex(list(result), self.compartment))
         return output_complexes
+
+
+def exists_perfect_matching(candidates: list) -> bool:
+    """
+    Checks whether there is a perfect matching in bipartite graph using augmenting paths (Kuhn's algorithm).
+
+    :param candidates: list of lists of vertices on the right side adjacent to particular vertices on the left side
+    :return: True if all vertices can be matched
+    """
+    matched = [None] * len(candidates)
+
+    def augment(left: int, visited: set) -> bool:
+        for right in candidates[left]:
+            if right not in visited:
+                visited.add(right)
+                if matched[right] is None or augment(matched[right], visited):
+                    matched[right] = left
+                    return True
+        return False
+
+    return all([augment(left, set()) for left in range(len(candidates))])
@@ -1,6 +1,9 @@
+import numpy as np
 import Core.Rate
 from lark import Transformer, Tree
 
+SIGNS = {"=": np.equal, "==": np.equal, "<": np.less, "<=": np.less_equal, ">": np.greater, ">=": np.greater_equal}
+
 
 class Formula:
     """
@@ -72,6 +75,29 @@ class AtomicProposition:
     def __eq__(self, other: 'AtomicProposition'):
         return self.complex == other.complex and self.sign == other.sign and self.number == other.number
 
+    def indices(self, ordering: tuple) -> list:
+        """
+        Identifies positions of agents counted by the AtomicProposition (the Complex itself
+        or all compatible ones if it is abstract).
+
+        :param ordering: given ordering of agents
+        :return: list of positions
+        """
+        if self.complex in ordering:
+            return [ordering.index(self.complex)]
+        return self.complex.identify_compatible(ordering)
+
+    def evaluate(self, states: np.array, indices: list) -> np.array:
+        """
+        Checks the AtomicProposition for all given States at once.
+
+        :param states: matrix of States (one State per row)
+        :param indices: positions of counted agents (see indices)
+        :return: boolean vector of States satisfying the AtomicProposition
+        """
+        values = states[:, indices].sum(axis=1)
+        return SIGNS[self.sign.strip()](values, float(self.number))
+
 
 class APextractor(Transformer):
     def __init__(self):
@@ -1,17 +1,21 @@
 import collections
-import subprocess
+import os
+import shlex
 
 import copy
-from sortedcontainers import SortedList
 
 from Core.Formula import Formula
 from Core.Atomic import AtomicAgent
 from Core.Complex import Complex
 from Core.Side import Side
+from Core.SpeciesRegistry import SpeciesRegistry
+from Core.StormPool import StormPool, STORM, STORM_PARS, check_available, exported, job_directory, run_storm
+from TS.DTMCChecker import DTMCChecker
+from TS.RuleBasedModel import RuleBasedModel
 from TS.TransitionSystem import TransitionSystem
 from TS.VectorModel import VectorModel
+from TS.VectorReaction import VectorReaction
 from Errors.ComplexOutOfScope import ComplexOutOfScope
-from Errors.StormNotAvailable import StormNotAvailable
 
 
 class Model:
@@ -61,44 +65,67 @@ class Model:
                 atomic_signature[name] = {"_"}
         return atomic_signature, structure_signature
 
-    def create_ordering(self) -> SortedList:
+    def create_ordering(self) -> SpeciesRegistry:
         """
-        Extracts all possible unique agents from the model and gives them fixed order using SortedList.
+        Extracts all possible unique agents from the model and gives them fixed order using SpeciesRegistry.
 
-        :return: SortedList of unique agents
+        Complexes occurring in rules are collected first, so each of them is expanded
+        to all compatible fully specified Complexes only once (even if it is used in several rules).
+
+        :return: SpeciesRegistry of unique agents
         """
-        unique_complexes = set()
+        complexes = set()
         for rule in self.rules:
-            unique_complexes |= rule.create_all_compatible(self.atomic_signature, self.structure_signature)
+            lhs, rhs = rule.create_complexes()
+            complexes |= set(lhs.agents) | set(rhs.agents)
 
-        unique_complexes |= set(self.init)
-        return SortedList(unique_complexes)
+        unique_complexes = set(self.init)
+        for complex in complexes:
+            unique_complexes |= complex.create_all_compatible(self.atomic_signature, self.structure_signature)
+        return SpeciesRegistry(unique_complexes)
 
     def to_vector_model(self, bound: int = None) -> VectorModel:
         """
         Creates vector representation of the model.
 
-        First reactions are generated, then unique complexes are collected and finally both reactions and
-        initial state are transformed to vector representation.
+        First unique complexes are collected, then reactions are generated rule by rule and
+        immediately transformed to vector representation (as well as initial state).
+        Reactions are streamed and deduplicated by their vectors and rate, therefore only distinct
+        VectorReactions are kept in memory.
 
         :param bound: given bound
         :return: VectorModel representation of the model
         """
         ordering = self.create_ordering()
-        reactions = set()
+        vector_reactions = dict()
 
         for rule in self.rules:
-            rule_copy = copy.deepcopy(rule)
-            rule_copy.rate_to_vector(ordering, self.definitions)
-            reactions |= rule_copy.create_reactions(self.atomic_signature, self.structure_signature)
+            rate = copy.deepcopy(rule.rate)
+            if rate:
+                rate.vectorize(ordering, self.definitions)
+            rate_key = str(rate)
+            for reaction in rule.generate_reactions(self.atomic_signature, self.structure_signature):
+                source = reaction.lhs.to_vector(ordering)
+                target = reaction.rhs.to_vector(ordering)
+                key = (source.sequence.tobytes(), target.sequence.tobytes(), rate_key)
+                if key not in vector_reactions:
+                    vector_reactions[key] = VectorReaction(source, target, copy.copy(rate))
 
         init = Side(self.init.elements()).to_vector(ordering)
-        vector_reactions = set()
+        return VectorModel(set(vector_reactions.values()), init, ordering, bound)
 
-        for reaction in reactions:
-            vector_reactions.add(reaction.to_vector(ordering, self.definitions))
+    def to_rule_based_model(self, bound: int = None) -> RuleBasedModel:
+        """
+        Creates network-free representation of the model, reactions are instantiated
+        from rules only when they are enabled during generating of transition system.
 
-        return VectorModel(vector_reactions, init, ordering, bound)
+        :param bound: given bound
+        :return: RuleBasedModel representation of the model
+        """
+        ordering = self.create_ordering()
+        init = Side(self.init.elements()).to_vector(ordering)
+        return RuleBasedModel(self.rules, init, ordering, bound, self.definitions,
+                              self.atomic_signature, self.structure_signature)
 
     def eliminate_redundant(self):
         """
@@ -142,7 +169,8 @@ class Model:
         """
         return any(list(map(lambda a: a.exists_compatible_agent(agent), self.rules)))
 
-    def PCTL_model_checking(self, PCTL_formula: Formula, bound: int = None, storm_local: bool = True):
+    def PCTL_model_checking(self, PCTL_formula, bound: int = None, storm_local: bool = True,
+                            pool: StormPool = None, fifo: bool = False):
         """
         Model checking of given PCTL formula.
 
@@ -150,29 +178,62 @@ class Model:
         appropriate PCTL formula issues resolved are (e.g. naming of agents). Finally,
         Storm model checker is called and results are returned.
 
-        :param PCTL_formula: given PCTL formula
+        Files are written to a unique temporary directory of the job (or streamed through named
+        pipes if fifo is set). Several formulas are checked against the exported model in a single
+        Storm invocation.
+
+        :param PCTL_formula: given PCTL formula (or list of formulas)
         :param bound: given bound
         :param storm_local: use local Storm installation
+        :param pool: StormPool used to execute Storm (new process is executed otherwise)
+        :param fifo: stream files to local Storm through named pipes (see StormPool.exported)
         :return: output of Storm model checker
         """
-        path = "/tmp/"
+        formulas = PCTL_formula if isinstance(PCTL_formula, list) else [PCTL_formula]
         vm = self.to_vector_model(bound)
         ts = vm.generate_transition_system()
 
         # generate labels and give them to save_storm
-        APs = PCTL_formula.get_APs()
-        state_labels, AP_labeles = self.create_AP_labels(APs, ts, vm.bound)
-        formula = PCTL_formula.replace_APs(AP_labeles)
-        transitions_file = path + "exp_transitions.tra"
-        labels_file = path + "exp_labels.lab"
-        ts.save_to_STORM_explicit(transitions_file, labels_file, state_labels, AP_labeles)
-
-        command = "storm --explicit {0} {1} --prop '{2}'"
-        result = call_storm(command.format(transitions_file, labels_file, formula),
-                            [transitions_file, labels_file], storm_local)
+        APs = list(dict.fromkeys([ap for formula in formulas for ap in formula.get_APs()]))
+        AP_labeles = create_AP_names(APs)
+        codes, satisfied = self.evaluate_APs(APs, ts, vm.bound)
+        satisfied = {AP_labeles[ap]: satisfied[ap] for ap in APs}
+        properties = "; ".join([str(formula.replace_APs(AP_labeles)) for formula in formulas])
+
+        with job_directory() as path:
+            transitions_file = os.path.join(path, "exp_transitions.tra")
+            labels_file = os.path.join(path, "exp_labels.lab")
+            writers = [(transitions_file, ts.save_transitions_to_STORM),
+                       (labels_file, lambda file: ts.save_AP_labels_to_STORM(file, codes, satisfied))]
+
+            command = [STORM, "--explicit", transitions_file, labels_file, "--prop", properties]
+            with exported(writers, fifo and storm_local):
+                result = call_storm(command, [transitions_file, labels_file], storm_local, pool)
         return result
 
-    def PCTL_synthesis(self, PCTL_formula: Formula, region: str, bound: int = None, storm_local: bool = True):
+    def PCTL_model_checking_native(self, PCTL_formulas: list, bound: int = None) -> list:
+        """
+        Model checking of given numeric PCTL formulas without Storm.
+
+        Transition system is generated once, states are labelled by all used atomic propositions
+        and the formulas are checked by DTMCChecker directly on its TransitionMatrix.
+
+        :param PCTL_formulas: given PCTL formulas
+        :param bound: given bound
+        :return: list of results (probability for P=? formulas, truth value otherwise)
+        """
+        vm = self.to_vector_model(bound)
+        ts = vm.generate_transition_system()
+
+        APs = list(dict.fromkeys([ap for formula in PCTL_formulas for ap in formula.get_APs()]))
+        codes, satisfied = self.evaluate_APs(APs, ts, vm.bound)
+        satisfying = {ap: codes[satisfied[ap]] for ap in APs}
+
+        checker = DTMCChecker(ts.transition_matrix(), ts.init, satisfying)
+        return checker.check_all(PCTL_formulas)
+
+    def PCTL_synthesis(self, PCTL_formula: Formula, region: str, bound: int = None, storm_local: bool = True,
+                       pool: StormPool = None, fifo: bool = False):
         """
         Parameter synthesis of given PCTL formula in given region.
 
@@ -187,26 +248,25 @@ class Model:
         :param region: string representation of region which will be checked by Storm
         :param bound: given bound
         :param storm_local: use local Storm installation
+        :param pool: StormPool used to execute Storm (new process is executed otherwise)
+        :param fifo: stream files to local Storm through named pipes (see StormPool.exported)
         :return: output of Storm model checker
         """
-        path = "/tmp/"
         vm = self.to_vector_model(bound)
         ts = vm.generate_transition_system()
 
         labels, prism_formulas = self.create_complex_labels(PCTL_formula.get_complexes(), ts.ordering)
         formula = PCTL_formula.replace_complexes(labels)
 
-        prism_file = path + "prism-parametric.pm"
+        with job_directory() as path:
+            prism_file = os.path.join(path, "prism-parametric.pm")
+            writers = [(prism_file, lambda file: ts.save_to_prism(file, vm.bound, self.params, prism_formulas))]
 
-        ts.save_to_prism(prism_file, vm.bound, self.params, prism_formulas)
-
-        command_region = "storm-pars --prism {0} --prop '{1}' --region '{2}' --refine 0.01 10 --printfullresult"
-        command_no_region = "storm-pars --prism {0} --prop '{1}'"
-
-        if region:
-            result = call_storm(command_region.format(prism_file, formula, region), [prism_file], storm_local)
-        else:
-            result = call_storm(command_no_region.format(prism_file, formula), [prism_file], storm_local)
+            command = [STORM_PARS, "--prism", prism_file, "--prop", str(formula)]
+            if region:
+                command += ["--region", region, "--refine", "0.01", "10", "--printfullresult"]
+            with exported(writers, fifo and storm_local):
+                result = call_storm(command, [prism_file], storm_local, pool)
         return result
 
     def create_complex_labels(self, complexes: list, ordering: tuple):
@@ -238,40 +298,63 @@ class Model:
     def create_AP_labels(self, APs: list, ts: TransitionSystem, bound: int):
         """
         Creates label for each AtomicProposition.
-        Moreover, goes through all states in ts.states_encoding and validates whether they satisfy give
-         APs - if so, the particular label is assigned to the state.
+        Moreover, validates whether states in ts.states_encoding satisfy give APs
+         (see evaluate_APs) - if so, the particular label is assigned to the state.
 
         :param APs: give AtomicProposition extracted from Formula
         :param ts: given TS
         :param bound: given bound
         :return: dictionary of State_code -> set of labels and AP -> label
         """
-        AP_lables = dict()
-        for ap in APs:
-            AP_lables[ap] = "property_" + str(len(AP_lables))
+        AP_lables = create_AP_names(APs)
+        codes, satisfied = self.evaluate_APs(APs, ts, bound)
 
         state_labels = dict()
-        ts.change_hell(bound)
-        for state in ts.states_encoding.keys():
-            for ap in APs:
-                if state.check_AP(ap, ts.ordering):
-                    state_labels[ts.states_encoding[state]] = \
-                        state_labels.get(ts.states_encoding[state], set()) | {AP_lables[ap]}
+        for ap in APs:
+            for code in codes[satisfied[ap]].tolist():
+                state_labels[code] = state_labels.get(code, set()) | {AP_lables[ap]}
         state_labels[ts.init] = state_labels.get(ts.init, set()) | {"init"}
         return state_labels, AP_lables
 
+    def evaluate_APs(self, APs: list, ts: TransitionSystem, bound: int) -> tuple:
+        """
+        Validates given APs for all states in ts.states_encoding at once.
+        Positions of agents counted by each AP are identified only once and APs are evaluated
+        over the matrix of all states (hell is changed to bound + 1 first).
+
+        :param APs: give AtomicProposition extracted from Formula
+        :param ts: given TS
+        :param bound: given bound
+        :return: codes of states and dictionary AP -> boolean vector of states satisfying it
+        """
+        ts.change_hell(bound)
+        codes, states = ts.states_matrix()
+        return codes, {ap: ap.evaluate(states, ap.indices(ts.ordering)) for ap in APs}
+
 
-def call_storm(command: str, files: list, storm_local: bool):
+def create_AP_names(APs: list) -> dict:
+    """
+    :param APs: given AtomicPropositions
+    :return: dictionary AP -> label
+    """
+    AP_lables = dict()
+    for ap in APs:
+        AP_lables[ap] = "property_" + str(len(AP_lables))
+    return AP_lables
+
+
+def call_storm(command: list, files: list, storm_local: bool, pool: StormPool = None):
     """
     Calls Storm model checker either locally or on the remote server.
 
-    :param command: given command to be executed
+    :param command: given command to be executed (list of arguments)
     :param files: files to be transferred to remote device
     :param storm_local: use local Storm installation
+    :param pool: StormPool used for local execution
     :return: result of Storm execution
     """
     if storm_local:
-        return call_local_storm(command)
+        return call_local_storm(command, pool)
     else:
         import paramiko, scp
         ssh = paramiko.SSHClient()
@@ -279,30 +362,32 @@ def call_storm(command: str, files: list, storm_local: bool):
         try:
             ssh.connect("psyche07.fi.muni.cz", username="biodivine")
         except Exception:
-            return call_local_storm(command)
+            return call_local_storm(command, pool)
 
+        directories = {os.path.dirname(file) for file in files}
+        ssh.exec_command("mkdir -p " + " ".join(map(shlex.quote, directories)))[1].channel.recv_exit_status()
         with scp.SCPClient(ssh.get_transport()) as tunnel:
             for file in files:
                 tunnel.put(file, file)
 
-        ssh_stdin, ssh_stdout, ssh_stderr = ssh.exec_command(command)
+        ssh_stdin, ssh_stdout, ssh_stderr = ssh.exec_command(" ".join(map(shlex.quote, command)))
         output = ssh_stdout.read()
+        ssh.exec_command("rm -rf " + " ".join(map(shlex.quote, directories)))
         ssh.close()
         del ssh, ssh_stdin, ssh_stdout, ssh_stderr
         return output
 
 
-def call_local_storm(command: str):
+def call_local_storm(command: list, pool: StormPool = None):
     """
     Calls Storm model checker locally.
+    Availability of Storm is checked only once per process (see StormPool.is_available).
 
-    :param command: given command to be executed
+    :param command: given command to be executed (list of arguments)
+    :param pool: StormPool used to execute the command (new process is executed otherwise)
     :return: result of Storm execution
     """
-    status, result = subprocess.getstatusoutput('storm')
-    if status == 0:
-        command = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, shell=True)
-        stdout, stderr = command.communicate()
-        return stdout
-    else:
-        raise StormNotAvailable
+    if pool is not None:
+        return pool.run(command)
+    check_available(command[0])
+    return run_storm(command)
@@ -9,6 +9,7 @@ import TS.State
 class Rate:
     def __init__(self, expression):
         self.expression = expression
+        self.compiled = None  # numeric callable over state vector, False if rate is symbolic
 
     def __eq__(self, other):
         return self.expression == other.expression
@@ -22,6 +23,12 @@ class Rate:
     def __hash__(self):
         return hash(str(self))
 
+    def __getstate__(self):
+        # compiled function cannot be pickled, it is created again when needed
+        state = self.__dict__.copy()
+        state["compiled"] = None
+        return state
+
     def vectorize(self, ordering: SortedList, definitions: dict) -> list:
         """
         Converts all occurrences of Complexes (resp. sub trees named agent)
@@ -31,12 +38,13 @@ class Rate:
         Moreover, in the process parameters are replaces with their values
         (if given).
 
-        :param ordering: given SortedList of Complexes
+        :param ordering: given ordering of Complexes (SpeciesRegistry)
         :param definitions: dict of (param_name, value)
         :return: list of transformed States (just for testing)
         """
         vec = Vectorizer(ordering, definitions)
         self.expression = vec.transform(self.expression)
+        self.compiled = None
         return vec.visited
 
     def evaluate(self, state) -> float:
@@ -47,9 +55,23 @@ class Rate:
 
         If the result is nan, None is returned instead.
 
+        For numeric rates (no undefined parameters) the expression is compiled
+        only once to a Python callable over the state vector, sympy is used only
+        for parametric rates which have to stay symbolic.
+
         :param state: given state
-        :return: Sympy object for expression representation
+        :return: Sympy object for expression representation (or float for numeric rates)
         """
+        if self.compiled is None:
+            self.compiled = self.compile()
+
+        if self.compiled:
+            try:
+                value = self.compiled(state.sequence.tolist())
+            except (ZeroDivisionError, OverflowError):
+                return None
+            return None if value != value else value
+
         evaluater = Evaluater(state)
         result = evaluater.transform(self.expression)
 
@@ -61,6 +83,35 @@ class Rate:
         except TypeError:
             return None
 
+    def compile(self):
+        """
+        Compiles vectorized expression to a Python function of state vector.
+        Each agent is replaced by sum of corresponding positions of the vector,
+        e.g. [1, 0, 1] -> (s[0] + s[2]).
+
+        Works for both a single state vector and for a 2D array of states
+        given by columns (each s[i] is then a row of the array).
+
+        :return: compiled function or False if the rate contains undefined parameters
+        """
+        compiler = Compiler()
+        expression = compiler.transform(self.expression)
+        if compiler.params:
+            return False
+        return eval("lambda s: " + "".join(tree_to_string(expression)))
+
+    def positions(self) -> set:
+        """
+        Collects positions of the state vector the vectorized expression depends on.
+
+        :return: set of indices of agents occurring in the expression
+        """
+        result = set()
+        if type(self.expression) == Tree:
+            for agent in self.expression.find_data("agent"):
+                result |= set(np.flatnonzero(agent.children[0].sequence).tolist())
+        return result
+
     def to_symbolic(self):
         """
         Translates rate from vector representation to symbolic one
@@ -69,6 +120,7 @@ class Rate:
         """
         transformer = SymbolicAgents()
         self.expression = transformer.transform(self.expression)
+        self.compiled = None
 
     def reduce_context(self) -> 'Rate':
         """
@@ -89,7 +141,7 @@ class ContextReducer(Transformer):
 
 class SymbolicAgents(Transformer):
     def agent(self, vector):
-        vector = "(" + vector[0].to_ODE_string() + ")"
+        vector = "(" + (vector[0].to_ODE_string() or "0") + ")"
         return Tree("agent", [vector])
 
 
@@ -103,9 +155,7 @@ class Vectorizer(Transformer):
     def agent(self, complex):
         complex = complex[0]
         result = np.zeros(len(self.ordering))
-        for i in range(len(self.ordering)):
-            if complex.compatible(self.ordering[i]):
-                result[i] = 1
+        result[complex.identify_compatible(self.ordering)] = 1
 
         result = TS.State.State(result)
         self.visited.append(result)
@@ -133,6 +183,25 @@ class Evaluater(Transformer):
         return name
 
 
+class Compiler(Transformer):
+    def __init__(self):
+        super(Transformer, self).__init__()
+        self.params = set()
+
+    def agent(self, state):
+        positions = []
+        for i, value in enumerate(state[0].sequence):
+            if value == 1:
+                positions.append("s[{}]".format(i))
+            elif value != 0:
+                positions.append("{}*s[{}]".format(value, i))
+        return Tree("agent", ["(" + (" + ".join(positions) if positions else "0") + ")"])
+
+    def param(self, matches):
+        self.params.add(str(matches[0]))
+        return Tree("param", matches)
+
+
 def tree_to_string(tree):
     if type(tree) == Tree:
         return sum(list(map(tree_to_string, tree.children)), [])
@@ -82,7 +82,7 @@ class Rule:
         """
         Converts all occurrences of Complexes in rate to vector representation.
 
-        :param ordering: given ordering of unique of Complexes (as sortedcontainers.SortedList)
+        :param ordering: given ordering of unique of Complexes (as SpeciesRegistry)
         :param definitions: dict of (param_name, value)
         """
         if self.rate:
@@ -95,7 +95,29 @@ class Rule:
 
         :param atomic_signature: given mapping of atomic name to possible states
         :param structure_signature: given mapping of structure name to possible atomics
-        :return:
+        :return: set of created Reactions
+        """
+        return set(self.generate_reactions(atomic_signature, structure_signature))
+
+    def generate_reactions(self, atomic_signature: dict, structure_signature: dict):
+        """
+        Lazily generates Reactions for all combinations of context of agents (see create_reactions).
+        Reactions are not deduplicated, only one of them is kept in memory at a time.
+
+        :param atomic_signature: given mapping of atomic name to possible states
+        :param structure_signature: given mapping of structure name to possible atomics
+        :return: generator of Reactions
+        """
+        for result in itertools.product(*self.create_contexts(atomic_signature, structure_signature)):
+            yield self.instantiate(result)
+
+    def create_contexts(self, atomic_signature: dict, structure_signature: dict) -> list:
+        """
+        Adds context to all pairs of entangled agents.
+
+        :param atomic_signature: given mapping of atomic name to possible states
+        :param structure_signature: given mapping of structure name to possible atomics
+        :return: list of possible pairs of agents with filled context (one list for each pair)
         """
         results = []
         for (l, r) in self.pairs:
@@ -108,13 +130,19 @@ class Rule:
             else:
                 left = self.agents[l]
                 right = self.agents[r]
-            results.append(left.add_context(right, atomic_signature, structure_signature))
-        reactions = set()
-        for result in itertools.product(*results):
-            new_agents = tuple(filter(None, column(result, 0) + column(result, 1)))
-            new_rule = Rule(new_agents, self.mid, self.compartments, self.complexes, self.pairs, self.rate)
-            reactions.add(new_rule.to_reaction())
-        return reactions
+            results.append(sorted(left.add_context(right, atomic_signature, structure_signature), key=str))
+        return results
+
+    def instantiate(self, result: tuple) -> Reaction:
+        """
+        Creates Reaction from chosen pairs of agents with filled context.
+
+        :param result: one pair of agents for each pair of entangled agents
+        :return: created Reaction
+        """
+        new_agents = tuple(filter(None, column(result, 0) + column(result, 1)))
+        new_rule = Rule(new_agents, self.mid, self.compartments, self.complexes, self.pairs, self.rate)
+        return new_rule.to_reaction()
 
     def compatible(self, other: 'Rule') -> bool:
         """
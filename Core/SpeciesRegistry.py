@@ -0,0 +1,62 @@
+import collections.abc
+
+
+class SpeciesRegistry(collections.abc.Sequence):
+    def __init__(self, complexes=()):
+        """
+        Fixed ordering of unique Complexes (species) of a model.
+
+        Complexes are sorted (same order as given by SortedList) and each of them gets
+        its position as an integer id. Positions are indexed by a hash table, therefore
+        lookup of a Complex (index, in) takes constant time. Positions are also grouped by
+        skeletons of Complexes to speed up search for compatible Complexes.
+
+        :param complexes: iterable of Complexes (duplicates are removed)
+        """
+        self.complexes = tuple(sorted(set(complexes)))
+        self.indices = {complex: i for i, complex in enumerate(self.complexes)}
+        self.skeletons = dict()
+        for i, complex in enumerate(self.complexes):
+            self.skeletons.setdefault(complex.get_skeleton(), []).append(i)
+
+    def __getitem__(self, item):
+        return self.complexes[item]
+
+    def __len__(self):
+        return len(self.complexes)
+
+    def __iter__(self):
+        return iter(self.complexes)
+
+    def __contains__(self, complex):
+        return complex in self.indices
+
+    def __eq__(self, other):
+        if not isinstance(other, collections.abc.Sequence):
+            return NotImplemented
+        return len(self) == len(other) and all([a == b for a, b in zip(self, other)])
+
+    def __hash__(self):
+        return hash(self.complexes)
+
+    def __str__(self):
+        return str(list(self.complexes))
+
+    def __repr__(self):
+        return "SpeciesRegistry(" + str(self) + ")"
+
+    def index(self, complex) -> int:
+        """
+        :param complex: given Complex
+        :return: position of the Complex
+        """
+        if complex not in self.indices:
+            raise ValueError("{} is not in the ordering".format(complex))
+        return self.indices[complex]
+
+    def with_skeleton(self, skeleton: tuple) -> list:
+        """
+        :param skeleton: skeleton of a Complex
+        :return: sorted positions of Complexes with given skeleton
+        """
+        return self.skeletons.get(skeleton, [])
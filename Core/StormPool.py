@@ -0,0 +1,200 @@
+import contextlib
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future
+
+from Errors.StormNotAvailable import StormNotAvailable
+
+STORM = "storm"
+STORM_PARS = "storm-pars"
+AVAILABLE = dict()  # binary -> True if it can be executed (probed once per process)
+PROBE_LOCK = threading.Lock()
+
+
+class StormPool:
+    def __init__(self, size: int = 1):
+        """
+        Bounded pool of concurrently running Storm subprocesses.
+
+        Commands are given as lists of arguments (no shell is involved) and at most size
+        of them are running at the same time, the remaining ones wait in the queue.
+
+        :param size: maximal number of concurrent Storm processes
+        """
+        self.executor = ThreadPoolExecutor(max_workers=size)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown()
+
+    def submit(self, arguments: list) -> Future:
+        """
+        Schedules execution of given command.
+
+        :param arguments: command as list of arguments (the first one is Storm binary)
+        :return: Future with output of the command
+        """
+        check_available(arguments[0])
+        return self.executor.submit(run_storm, arguments)
+
+    def run(self, arguments: list) -> bytes:
+        """
+        Executes given command and waits for the result.
+
+        :param arguments: command as list of arguments
+        :return: output of the command
+        """
+        return self.submit(arguments).result()
+
+    def map(self, commands: list) -> list:
+        """
+        Executes given commands concurrently.
+
+        :param commands: list of commands (lists of arguments)
+        :return: list of outputs in the same order
+        """
+        futures = [self.submit(arguments) for arguments in commands]
+        return [future.result() for future in futures]
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True)
+
+
+def is_available(binary: str) -> bool:
+    """
+    Checks whether given Storm binary can be executed. The check is done only once per process.
+
+    :param binary: name or path of Storm binary
+    :return: True if available
+    """
+    with PROBE_LOCK:
+        if binary not in AVAILABLE:
+            available = shutil.which(binary) is not None
+            if available:
+                try:
+                    available = subprocess.run([binary, "--version"], stdout=subprocess.DEVNULL,
+                                               stderr=subprocess.DEVNULL).returncode == 0
+                except OSError:
+                    available = False
+            AVAILABLE[binary] = available
+        return AVAILABLE[binary]
+
+
+def check_available(binary: str):
+    """
+    :param binary: name or path of Storm binary
+    :raises StormNotAvailable: if the binary cannot be executed
+    """
+    if not is_available(binary):
+        raise StormNotAvailable
+
+
+def run_storm(arguments: list) -> bytes:
+    """
+    Executes Storm command.
+
+    :param arguments: command as list of arguments
+    :return: output of the command (including error output)
+    """
+    return subprocess.run(arguments, stdout=subprocess.PIPE, stderr=subprocess.STDOUT).stdout
+
+
+def job_directory() -> tempfile.TemporaryDirectory:
+    """
+    Creates unique temporary directory for files of one job, it is removed when the job ends
+    (use as context manager).
+
+    :return: TemporaryDirectory
+    """
+    return tempfile.TemporaryDirectory(prefix="eBCSgen_")
+
+
+@contextlib.contextmanager
+def exported(writers: list, fifo: bool = True):
+    """
+    Exports files consumed by Storm. If fifo is set and named pipes are available, each file is
+    a FIFO filled by its own writer thread concurrently with Storm reading it, so the content
+    never touches the disk. Otherwise, regular files are written before the block is entered.
+
+    Writers blocked by a FIFO which was not opened by Storm are released when the block ends.
+
+    :param writers: list of (path, function writing the file to given path)
+    :param fifo: use named pipes if possible
+    """
+    threads, errors = [], []
+    if fifo and create_fifos([path for path, _ in writers]):
+        for path, write in writers:
+            thread = threading.Thread(target=write_fifo, args=(path, write, errors), daemon=True)
+            thread.start()
+            threads.append((path, thread))
+    else:
+        for path, write in writers:
+            write(path)
+    try:
+        yield
+    finally:
+        for path, thread in threads:
+            while thread.is_alive():
+                release_fifo(path)
+                thread.join(0.1)
+    if errors:
+        raise errors[0]
+
+
+def create_fifos(paths: list) -> bool:
+    """
+    :param paths: paths of FIFOs
+    :return: True if all FIFOs were created
+    """
+    try:
+        for path in paths:
+            os.mkfifo(path)
+        return True
+    except (AttributeError, OSError):
+        for path in paths:
+            if os.path.exists(path):
+                os.remove(path)
+        return False
+
+
+def write_fifo(path: str, write, errors: list):
+    """
+    Writes FIFO, the reader closing it prematurely is not considered an error.
+    If the writer fails, the reader gets end of file instead of waiting forever.
+
+    :param path: path of FIFO
+    :param write: function writing to given path
+    :param errors: list to store exceptions raised by the writer
+    """
+    try:
+        write(path)
+    except BrokenPipeError:
+        pass
+    except Exception as exception:
+        errors.append(exception)
+        try:
+            # the FIFO is held open for writing (waking up waiting readers) until it is replaced
+            # by an empty file, closing it gives end of file to readers which already opened it
+            fifo = os.open(path, os.O_RDWR | os.O_NONBLOCK)
+            open(path + ".empty", "w").close()
+            os.replace(path + ".empty", path)
+            os.close(fifo)
+        except OSError:
+            pass
+
+
+def release_fifo(path: str):
+    """
+    Unblocks the writer waiting for the reader of given FIFO (which is not going to come).
+
+    :param path: path of FIFO
+    """
+    try:
+        os.close(os.open(path, os.O_RDONLY | os.O_NONBLOCK))
+    except OSError:
+        pass
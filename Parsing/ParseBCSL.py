@@ -1,45 +1,120 @@
 import collections
-import json
+import os
 from numpy import inf
 import numpy as np
-from copy import deepcopy
 from lark import Lark, Transformer, Tree, Token
 from lark import UnexpectedCharacters, UnexpectedToken
 from lark.load_grammar import _TERMINAL_NAMES
-from sortedcontainers import SortedList
 
 from Core.Atomic import AtomicAgent
 from Core.Complex import Complex
 import Core.Model
 from Core.Rate import Rate
 from Core.Rule import Rule
+from Core.SpeciesRegistry import SpeciesRegistry
 from Core.Structure import StructureAgent
+from TS.BinaryTS import binary_TS_from_file, is_binary_TS
+from TS.Checkpoint import Checkpoint
+from TS.JSONStream import iterate_TS_json
 from TS.State import State
 from TS.TransitionSystem import TransitionSystem
-from TS.Edge import edge_from_dict
+from TS.Edge import Edge
 from Core.Side import Side
 
 
 def load_TS_from_json(json_file: str) -> TransitionSystem:
     """
     Loads given JSON and interprets it as a TransitionSystem.
+    The file is read incrementally (see iterate_TS_json).
 
     :param json_file: given TS in JSON
     :return: resulting TransitionSystem
     """
+    states_encoding, edges, unprocessed, data = dict(), set(), set(), dict()
+    for item in iterate_TS_json(json_file):
+        if item[0] == "node":
+            states_encoding[item[2]] = item[1]
+        elif item[0] == "edge":
+            edges.add(item[1])
+        elif item[0] == "unprocessed":
+            unprocessed.add(item[1])
+        else:
+            data[item[0]] = item[1]
+
     complex_parser = Parser("rate_complex")
-    with open(json_file) as json_file:
-        data = json.load(json_file)
+    ordering = SpeciesRegistry(map(lambda agent: complex_parser.parse(agent).data.children[0], data['ordering']))
+    ts = TransitionSystem(ordering)
+    ts.states_encoding = states_encoding
+    ts.edges = edges
+    ts.matrix = None
+    ts.init = data['initial']
+
+    ts.unprocessed = unprocessed
+    ts.processed = ts.states_encoding.keys() - ts.unprocessed
+    return ts
+
+
+def load_TS_from_binary(binary_file: str) -> TransitionSystem:
+    """
+    Loads TransitionSystem stored in binary format (see BinaryTS), arrays are memory-mapped.
+
+    The TransitionMatrix of the TS is taken over from the CSR arrays without sorting the Edges again.
+    However, TransitionSystem keeps its States and Edges as objects, so they are still created
+    for the whole TS and the memory is comparable to loading JSON. Use binary_TS_from_file to
+    work with the arrays only.
+
+    :param binary_file: given binary TS
+    :return: resulting TransitionSystem
+    """
+    data = binary_TS_from_file(binary_file)
+
+    complex_parser = Parser("rate_complex")
+    ordering = SpeciesRegistry(map(lambda agent: complex_parser.parse(agent).data.children[0], data.ordering))
+    ts = TransitionSystem(ordering)
+    ts.states_encoding = {State(data.state(row)): code for row, code in enumerate(data.codes.tolist())}
+    ts.matrix = data.transition_matrix()
+    ts.edges = {Edge(source, target, probability, True) for source, target, probability
+                in zip(ts.matrix.sources().tolist(), ts.matrix.targets.tolist(), ts.matrix.probabilities)}
+    ts.init = data.initial
+
+    decoding = ts.create_decoding()
+    ts.unprocessed = {decoding[code] for code in data.unprocessed.tolist()}
+    ts.processed = ts.states_encoding.keys() - ts.unprocessed
+    return ts
 
-        ordering = SortedList(map(lambda agent: complex_parser.parse(agent).data.children[0], data['ordering']))
-        ts = TransitionSystem(ordering)
-        ts.states_encoding = {State(np.array(eval(data['nodes'][node_id]))): int(node_id) for node_id in data['nodes']}
-        ts.edges = {edge_from_dict(edge) for edge in data['edges']}
-        ts.init = data['initial']
 
-        ts.unprocessed = {State(np.array(eval(state))) for state in data.get('unprocessed', list())}
-        ts.processed = ts.states_encoding.keys() - ts.unprocessed
-        return ts
+def load_TS(ts_file: str) -> TransitionSystem:
+    """
+    Loads TransitionSystem stored either in binary format or in JSON.
+
+    :param ts_file: given TS file
+    :return: resulting TransitionSystem
+    """
+    if is_binary_TS(ts_file):
+        return load_TS_from_binary(ts_file)
+    return load_TS_from_json(ts_file)
+
+
+def load_TS_from_checkpoint(checkpoint_file: str) -> TransitionSystem:
+    """
+    Loads TransitionSystem from the last complete checkpoint of its generating.
+    Generating can be continued from the resulting TransitionSystem.
+
+    :param checkpoint_file: given checkpoint file
+    :return: resulting TransitionSystem
+    """
+    header, store, edges, frontier = Checkpoint(checkpoint_file).load()
+
+    complex_parser = Parser("rate_complex")
+    ordering = SpeciesRegistry(map(lambda agent: complex_parser.parse(agent).data.children[0], header['ordering']))
+    ts = TransitionSystem(ordering)
+    ts.states_encoding = store.to_encoding()
+    ts.store = store
+    ts.edges = set(edges)
+    ts.matrix = None
+    ts.init = store.code(State(np.array(header['init'])))
+    ts.unprocessed = {store.get(code) for code in frontier}
+    return ts
 
 
 class Result:
@@ -159,107 +234,49 @@ class ReplaceVariables(Transformer):
         self.to_replace = to_replace
 
     def VAR(self, matches):
-        return deepcopy(self.to_replace)
+        return self.to_replace
 
 
-class ExtractComplexNames(Transformer):
+def extract_complex_names(tree: Tree) -> dict:
     """
-    Extracts definitions of cmplx_name from #! complexes part.
+    Extracts definitions of cmplx_name from #! complexes part (the part is removed from the tree).
 
     Also multiplies rule with variable to its instances using ReplaceVariables Transformer.
-    """
-    def __init__(self):
-        super(Transformer, self).__init__()
-        self.complex_defns = dict()
-
-    def cmplx_dfn(self, matches):
-        self.complex_defns[str(matches[0].children[0])] = matches[1]
-
-    def rules(self, matches):
-        new_rules = [matches[0]]
-        for rule in matches[1:]:
-            if rule.children[-1].data == 'variable':
-                variables = rule.children[-1].children[1:]
-                for variable in variables:
-                    replacer = ReplaceVariables(variable)
-                    new_rule = Tree('rule', deepcopy(rule.children[:-1]))
-                    new_rules.append(replacer.transform(new_rule))
-            else:
-                new_rules.append(rule)
-        return Tree('rules', new_rules)
+    Only sections of the model are visited, not the whole tree.
 
-
-class TransformAbstractSyntax(Transformer):
+    :param tree: given parsed Tree
+    :return: dictionary of cmplx_name -> sequence Tree
     """
-    Transformer to remove "zooming" syntax.
-
-    Divided to three special cases (declared below).
-    Based on replacing subtrees in parent trees.
+    complex_defns = dict()
+    for parent in [tree] + [child for child in tree.children if isinstance(child, Tree)]:
+        for section in [child for child in parent.children if isinstance(child, Tree)]:
+            if section.data == 'complexes':
+                for definition in filter(lambda item: isinstance(item, Tree), section.children):
+                    complex_defns[str(definition.children[0].children[0])] = definition.children[1]
+                parent.children.remove(section)
+            elif section.data == 'rules':
+                section.children = expand_variables(section.children)
+    return complex_defns
+
+
+def expand_variables(rules: list) -> list:
     """
-    def __init__(self, complex_defns):
-        super(Transformer, self).__init__()
-        self.complex_defns = complex_defns
-
-    def cmplx_name(self, matches):
-        return deepcopy(self.complex_defns[str(matches[0])])
-
-    def abstract_sequence(self, matches):
-        return matches[0]
-
-    def atomic_structure_complex(self, matches):
-        """
-        atomic:structure:complex
-        """
-        structure = self.insert_atomic_to_struct(matches[0], matches[1])
-        sequence = self.insert_struct_to_complex(structure, matches[2])
-        return sequence
-
-    def atomic_complex(self, matches):
-        """
-        atomic:complex
-        """
-        sequence = self.insert_atomic_to_complex(matches[0], matches[1])
-        return sequence
-
-    def structure_complex(self, matches):
-        """
-        structure:complex
-        """
-        sequence = self.insert_struct_to_complex(matches[0], matches[1])
-        return sequence
+    Replaces rules with variable by their instances (see ReplaceVariables).
+    Transformers create new trees, therefore the rules do not have to be copied.
 
-    def insert_atomic_to_struct(self, atomic, struct):
-        """
-        Adds or replaces atomic subtree in struct tree.
-        """
-        if len(struct.children) == 2:
-            struct.children[1].children.append(atomic)
+    :param rules: children of rules Tree
+    :return: new children of rules Tree
+    """
+    new_rules = [rules[0]]
+    for rule in rules[1:]:
+        if rule.children[-1].data == 'variable':
+            variables = rule.children[-1].children[1:]
+            for variable in variables:
+                replacer = ReplaceVariables(variable)
+                new_rules.append(replacer.transform(Tree('rule', rule.children[:-1])))
         else:
-            struct.children.append(Tree('composition', [atomic]))
-        return struct
-
-    def insert_struct_to_complex(self, struct, complex):
-        """
-        Adds or replaces struct subtree in complex tree.
-        """
-        for i in range(len(complex.children)):
-            if self.get_name(struct) == self.get_name(complex.children[i].children[0]):
-                complex.children[i] = Tree('agent', [struct])
-                break
-        return complex
-
-    def insert_atomic_to_complex(self, atomic, complex):
-        """
-        Adds or replaces atomic subtree in complex tree.
-        """
-        for i in range(len(complex.children)):
-            if self.get_name(atomic) == self.get_name(complex.children[i].children[0]):
-                complex.children[i] = Tree('agent', [atomic])
-                break
-        return complex
-
-    def get_name(self, agent):
-        return str(agent.children[0].children[0])
+            new_rules.append(rule)
+    return new_rules
 
 
 class TreeToComplex(Transformer):
@@ -293,16 +310,59 @@ class TreeToComplex(Transformer):
         return str(matches[0])
 
 
-class TreeToObjects(Transformer):
+class TreeToObjects(TreeToComplex):
     def __init__(self):
-        super(Transformer, self).__init__()
+        super(TreeToObjects, self).__init__(visit_tokens=False)
         self.params = set()
+        self.complex_defns = dict()
     """
     A transformer which is called on a tree in a bottom-up manner and transforms all subtrees/tokens it encounters.
     Note the defined methods have the same name as elements in the grammar above.
 
-    Creates the actual Model object after all the above transformers were applied.
+    Creates the actual Model object in a single pass - agents and Complexes are created (see TreeToComplex)
+    and "zooming" syntax is removed on the way. Definitions of cmplx_name (see extract_complex_names)
+    are given in already transformed form.
+
+    Sequences of agents are never changed in place, they can be shared (e.g. by cmplx_name)
+    and agents are not copied.
     """
+    def cmplx_name(self, matches):
+        return self.complex_defns[str(matches[0])]
+
+    def abstract_sequence(self, matches):
+        return matches[0]
+
+    def atomic_structure_complex(self, matches):
+        """
+        atomic:structure:complex
+        """
+        atomic, structure, sequence = matches
+        structure = StructureAgent(structure.name, structure.composition | {atomic})
+        return self.insert_agent_to_complex(structure, sequence)
+
+    def atomic_complex(self, matches):
+        """
+        atomic:complex
+        """
+        return self.insert_agent_to_complex(matches[0], matches[1])
+
+    def structure_complex(self, matches):
+        """
+        structure:complex
+        """
+        return self.insert_agent_to_complex(matches[0], matches[1])
+
+    def insert_agent_to_complex(self, agent, sequence):
+        """
+        Creates new sequence where the first agent with the same name is replaced by given agent.
+        """
+        agents = list(sequence.children)
+        for i in range(len(agents)):
+            if agents[i].children[0].name == agent.name:
+                agents[i] = Tree('agent', [agent])
+                break
+        return Tree('sequence', agents)
+
     def const(self, matches):
         return float(matches[0])
 
@@ -324,7 +384,7 @@ class TreeToObjects(Transformer):
                 for i in range(stochio):
                     start = helper.counter
                     for agent in agents.children:
-                        helper.seq.append(deepcopy(agent.children[0]))
+                        helper.seq.append(agent.children[0])
                         helper.comp.append(compartment)
                         helper.counter += 1
                     helper.complexes.append((start, helper.counter - 1))
@@ -380,13 +440,41 @@ class TreeToObjects(Transformer):
         return Core.Model.Model(set(matches[0]), matches[1], matches[2], params)
 
 
+PARSERS = dict()  # (name, grammar) -> compiled Lark parser
+TABLES_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tables")
+
+
+def create_lark_parser(name: str, grammar: str, **options) -> Lark:
+    """
+    Creates LALR parser for given grammar, the grammar is compiled only once per process.
+
+    If TABLES_DIRECTORY exists, serialised LALR tables are loaded from it, so the grammar
+    is not compiled even in new processes (tables are stored there when they are missing
+    or outdated, see Callables/GenerateParserTables.py).
+
+    :param name: name of the parser (start symbol) used for its tables file
+    :param grammar: given grammar
+    :param options: options for Lark
+    :return: Lark parser
+    """
+    key = (name, grammar)
+    if key not in PARSERS:
+        tables = os.path.join(TABLES_DIRECTORY, name + ".lark")
+        try:
+            PARSERS[key] = Lark(grammar, parser='lalr', cache=tables if os.path.isdir(TABLES_DIRECTORY) else False,
+                                **options)
+        except OSError:
+            PARSERS[key] = Lark(grammar, parser='lalr', **options)
+    return PARSERS[key]
+
+
 class Parser:
     def __init__(self, start):
         grammar = "start: " + start + GRAMMAR + COMPLEX_GRAMMAR + EXTENDED_GRAMMAR
-        self.parser = Lark(grammar, parser='lalr',
-                           propagate_positions=False,
-                           maybe_placeholders=False
-                           )
+        self.parser = create_lark_parser(start, grammar,
+                                         propagate_positions=False,
+                                         maybe_placeholders=False
+                                         )
 
         self.terminals = dict((v, k) for k, v in _TERMINAL_NAMES.items())
         self.terminals.update({"COM": "//",
@@ -429,18 +517,17 @@ class Parser:
 
     def transform(self, tree: Tree) -> Result:
         """
-        Apply several transformers to construct BCSL object from given tree.
+        Construct BCSL object from given tree in a single pass of TreeToObjects transformer
+        (only definitions of named complexes are transformed in advance).
 
         :param tree: given parsed Tree
         :return: Result containing constructed BCSL object
         """
         try:
-            complexer = ExtractComplexNames()
-            tree = complexer.transform(tree)
-            de_abstracter = TransformAbstractSyntax(complexer.complex_defns)
-            tree = de_abstracter.transform(tree)
-            tree = TreeToComplex().transform(tree)
-            tree = TreeToObjects().transform(tree)
+            complex_defns = extract_complex_names(tree)
+            objects = TreeToObjects()
+            objects.complex_defns = {name: objects.transform(sequence) for name, sequence in complex_defns.items()}
+            tree = objects.transform(tree)
 
             return Result(True, tree.children[0])
         except Exception as u:
@@ -1,4 +1,4 @@
-from lark import Lark, Transformer, Tree
+from lark import Transformer, Tree
 from lark import UnexpectedCharacters, UnexpectedToken
 from lark.load_grammar import _TERMINAL_NAMES
 
@@ -91,11 +91,11 @@ class TreeToStrings(Transformer):
 class PCTLparser:
     def __init__(self):
         grammar = GRAMMAR + Parsing.ParseBCSL.COMPLEX_GRAMMAR
-        self.parser = Lark(grammar, parser='lalr',
-                           propagate_positions=False,
-                           maybe_placeholders=False,
-                           transformer=Parsing.ParseBCSL.TreeToComplex()
-                           )
+        self.parser = Parsing.ParseBCSL.create_lark_parser("PCTL", grammar,
+                                                           propagate_positions=False,
+                                                           maybe_placeholders=False,
+                                                           transformer=Parsing.ParseBCSL.TreeToComplex()
+                                                           )
 
         self.terminals = dict((v, k) for k, v in _TERMINAL_NAMES.items())
         self.terminals.update({"NEXT": "X",
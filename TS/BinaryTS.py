@@ -0,0 +1,216 @@
+import json
+import struct
+
+import numpy as np
+
+from TS.JSONStream import iterate_TS_json
+from TS.TransitionMatrix import TransitionMatrix, create_csr
+
+MAGIC = b"BCSTSB01"
+LENGTH = struct.Struct("<Q")  # length of header
+ALIGNMENT = 64
+HELL = -1  # value used for "hell" state in the matrix of states
+
+
+class BinaryTS:
+    def __init__(self, ordering: list, initial: int, codes: np.array, states: np.array, indptr: np.array,
+                 targets: np.array, probabilities, unprocessed: np.array):
+        """
+        Array representation of TransitionSystem used for binary storage.
+
+        States are rows of a matrix sorted by their codes (the "hell" state is filled by HELL),
+        Edges are stored in CSR form: outgoing Edges of the i-th State are on positions
+        indptr[i]:indptr[i + 1] of targets (codes of target States) and probabilities.
+        Probabilities are floats, parametric TS can contain also strings.
+
+        The file contains MAGIC, length of JSON header and the header (with ordering, initial State
+        and description of arrays), followed by the arrays aligned to ALIGNMENT bytes, therefore they can
+        be memory-mapped when loading.
+
+        :param ordering: string representation of ordering of agents
+        :param initial: code of initial State
+        :param codes: sorted codes of States
+        :param states: 2D array of States (one row per code)
+        :param indptr: CSR index of Edges
+        :param targets: codes of target States of Edges
+        :param probabilities: array of float probabilities or list of float and string probabilities of Edges
+        :param unprocessed: codes of unprocessed States
+        """
+        self.ordering = ordering
+        self.initial = initial
+        self.codes = codes
+        self.states = states
+        self.indptr = indptr
+        self.targets = targets
+        self.probabilities = probabilities
+        self.unprocessed = unprocessed
+
+    def __len__(self):
+        return len(self.codes)
+
+    def sources(self) -> np.array:
+        """
+        :return: codes of source States of Edges
+        """
+        return np.repeat(self.codes, np.diff(self.indptr))
+
+    def transition_matrix(self) -> TransitionMatrix:
+        """
+        Creates TransitionMatrix directly from the (possibly memory-mapped) CSR arrays,
+        Edges are already in the required order.
+
+        :return: TransitionMatrix of Edges
+        """
+        probabilities = self.probabilities.tolist() if isinstance(self.probabilities, np.ndarray) \
+            else self.probabilities
+        return TransitionMatrix(self.codes, self.indptr, self.targets, probabilities)
+
+    def save(self, output_file: str):
+        """
+        Save the TS as a binary file.
+
+        :param output_file: given file to write to
+        """
+        arrays = {"codes": np.asarray(self.codes, dtype="<i8"),
+                  "states": np.asarray(self.states, dtype="<i8"),
+                  "indptr": np.asarray(self.indptr, dtype="<i8"),
+                  "targets": np.asarray(self.targets, dtype="<i8"),
+                  "unprocessed": np.asarray(self.unprocessed, dtype="<i8")}
+        if isinstance(self.probabilities, np.ndarray):
+            arrays["probabilities"] = np.asarray(self.probabilities, dtype="<f8")
+        else:
+            arrays["probabilities"] = np.array([np.nan if isinstance(probability, str) else probability
+                                                for probability in self.probabilities], dtype="<f8")
+            text = [probability.encode() if isinstance(probability, str) else b""
+                    for probability in self.probabilities]
+            arrays["text_offsets"] = np.cumsum([0] + list(map(len, text)), dtype="<i8")
+            arrays["text"] = np.frombuffer(b"".join(text), dtype="u1")
+
+        header = {"ordering": list(self.ordering), "initial": int(self.initial), "arrays": dict()}
+        offset = 0
+        for name, array in arrays.items():
+            header["arrays"][name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+            offset = align(offset + array.nbytes)
+        encoded = json.dumps(header).encode()
+        start = align(len(MAGIC) + LENGTH.size + len(encoded))
+
+        with open(output_file, "wb") as file:
+            file.write(MAGIC + LENGTH.pack(len(encoded)) + encoded)
+            for name, array in arrays.items():
+                file.seek(start + header["arrays"][name]["offset"])
+                file.write(array.tobytes())
+            file.truncate(start + offset)
+
+    def state(self, row: int) -> np.array:
+        """
+        :param row: index of State
+        :return: vector of the State (with inf values for "hell" state)
+        """
+        vector = np.asarray(self.states[row], dtype=float)
+        return np.full(len(vector), np.inf) if len(vector) and (vector == HELL).all() else vector
+
+
+def align(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def is_binary_TS(path: str) -> bool:
+    """
+    :param path: given file
+    :return: True if the file is a binary TS
+    """
+    with open(path, "rb") as file:
+        return file.read(len(MAGIC)) == MAGIC
+
+
+def binary_TS_from_file(input_file: str, mmap: bool = True) -> BinaryTS:
+    """
+    Loads binary TS, arrays are memory-mapped (read only) if required.
+
+    :param input_file: given binary TS file
+    :param mmap: memory-map arrays instead of reading them
+    :return: BinaryTS
+    """
+    with open(input_file, "rb") as file:
+        if file.read(len(MAGIC)) != MAGIC:
+            raise ValueError("{} is not a binary TS.".format(input_file))
+        length, = LENGTH.unpack(file.read(LENGTH.size))
+        header = json.loads(file.read(length).decode())
+    start = align(len(MAGIC) + LENGTH.size + length)
+
+    arrays = dict()
+    for name, description in header["arrays"].items():
+        dtype, shape = np.dtype(description["dtype"]), tuple(description["shape"])
+        offset = start + description["offset"]
+        if not np.prod(shape):
+            arrays[name] = np.empty(shape, dtype=dtype)
+        elif mmap:
+            arrays[name] = np.memmap(input_file, dtype=dtype, mode="r", offset=offset, shape=shape)
+        else:
+            arrays[name] = np.fromfile(input_file, dtype=dtype, count=int(np.prod(shape)),
+                                       offset=offset).reshape(shape)
+
+    probabilities = arrays["probabilities"]
+    if "text" in arrays:
+        text, offsets = bytes(arrays["text"]), arrays["text_offsets"].tolist()
+        probabilities = [text[offsets[i]:offsets[i + 1]].decode() if offsets[i] < offsets[i + 1] else probability
+                         for i, probability in enumerate(probabilities.tolist())]
+
+    return BinaryTS(header["ordering"], header["initial"], arrays["codes"], arrays["states"], arrays["indptr"],
+                    arrays["targets"], probabilities, arrays["unprocessed"])
+
+
+def create_binary_TS(ordering: list, initial: int, nodes: dict, edges: tuple, unprocessed: list) -> BinaryTS:
+    """
+    Creates BinaryTS from States and Edges given in arbitrary order.
+
+    :param ordering: string representation of ordering of agents
+    :param initial: code of initial State
+    :param nodes: dict of (code, vector of State)
+    :param edges: lists of sources, targets and probabilities of Edges
+    :param unprocessed: codes of unprocessed States
+    :return: BinaryTS
+    """
+    codes = np.array(sorted(nodes), dtype=np.int64)
+    states = np.array([nodes[code] for code in codes.tolist()], dtype=float).reshape(len(codes), len(ordering))
+    states[np.isinf(states).all(axis=1) & (states.shape[1] > 0)] = HELL
+    states = states.astype(np.int64)
+
+    sources, targets, probabilities = edges
+    sources, targets = np.array(sources, dtype=np.int64), np.array(targets, dtype=np.int64)
+    order, indptr = create_csr(codes, sources, targets)
+
+    if all([not isinstance(probability, str) for probability in probabilities]):
+        probabilities = np.array(probabilities, dtype=float)[order]
+    else:
+        probabilities = [probabilities[i] for i in order.tolist()]
+
+    return BinaryTS(ordering, initial, codes, states, indptr, targets[order], probabilities,
+                    np.array(sorted(unprocessed), dtype=np.int64))
+
+
+def binary_TS_from_json(json_file: str) -> BinaryTS:
+    """
+    Converts TS in JSON (as stored by TransitionSystem.save_to_json) to BinaryTS.
+    The file is read incrementally (see iterate_TS_json) and only vectors of States
+    and arrays of Edges are kept.
+
+    :param json_file: given TS in JSON
+    :return: BinaryTS
+    """
+    nodes, sources, targets, probabilities, unprocessed, data = dict(), [], [], [], [], dict()
+    for item in iterate_TS_json(json_file):
+        if item[0] == "node":
+            nodes[item[1]] = item[2].sequence
+        elif item[0] == "edge":
+            sources.append(item[1].source)
+            targets.append(item[1].target)
+            probabilities.append(item[1].probability)
+        elif item[0] == "unprocessed":
+            unprocessed.append(item[1])
+        else:
+            data[item[0]] = item[1]
+
+    codes = {tuple(vector.tolist()): code for code, vector in nodes.items()}
+    unprocessed = [codes[tuple(state.sequence.tolist())] for state in unprocessed]
+    return create_binary_TS(data['ordering'], data['initial'], nodes, (sources, targets, probabilities), unprocessed)
@@ -0,0 +1,142 @@
+import json
+import os
+import struct
+
+import numpy as np
+
+from TS.Edge import Edge
+from TS.State import State
+from TS.StateStore import StateStore
+
+MAGIC = b"BCSCKPT1"
+RECORD = struct.Struct("<cQ")  # tag and length of payload
+EDGE_TYPE = np.dtype([("s", "<i8"), ("t", "<i8"), ("p", "<f8")])
+
+HEADER, STATES, EDGES, PARAMETRIC_EDGES, FRONTIER = b"H", b"S", b"E", b"P", b"F"
+
+
+class Checkpoint:
+    def __init__(self, path: str, ordering=None, init: State = None):
+        """
+        Binary appendable checkpoint of transition system generating.
+
+        The file starts with MAGIC followed by records (one byte tag, 64-bit length of payload, payload):
+            H - header (JSON with ordering, length of States, number of bits per value and initial State)
+            S - packed States (rows of StateStore) with subsequent codes
+            E - numeric encoded Edges (source, target, probability)
+            P - parametric encoded Edges (JSON list of [source, target, probability])
+            F - codes of unprocessed States (frontier)
+
+        The first save writes the whole generated part of the TS (to a temporary file which replaces
+        the checkpoint), each next save appends only new States and Edges and the current frontier.
+        A checkpoint is complete with its frontier record, therefore anything after the last frontier
+        (e.g. when the process was killed during writing) is ignored when loading.
+
+        :param path: checkpoint file
+        :param ordering: ordering of the TS (needed only for saving)
+        :param init: initial State (needed only for saving)
+        """
+        self.path = path
+        self.ordering = ordering
+        self.init = init
+        self.saved_states = None  # number of States already written, None if nothing was written yet
+
+    def save(self, store: StateStore, edges, frontier: list):
+        """
+        Writes current state of generating.
+
+        :param store: StateStore with all States of the TS
+        :param edges: encoded Edges not saved yet (all Edges of the TS for the first save)
+        :param frontier: codes of unprocessed States
+        """
+        if self.saved_states is None:
+            path = self.path + ".tmp"
+            file = open(path, "wb")
+            file.write(MAGIC)
+            header = {"ordering": list(map(str, self.ordering)), "length": store.length, "bits": store.bits,
+                      "init": [float(value) for value in self.init.sequence]}
+            write_record(file, HEADER, json.dumps(header).encode())
+            self.saved_states = 0
+        else:
+            path = self.path
+            file = open(path, "ab")
+
+        with file:
+            if len(store) > self.saved_states:
+                write_record(file, STATES, store.rows(self.saved_states + 1, len(store)))
+
+            numeric, parametric = [], []
+            for edge in edges:
+                if isinstance(edge.probability, str):
+                    parametric.append([edge.source, edge.target, edge.probability])
+                else:
+                    numeric.append((edge.source, edge.target, edge.probability))
+            if numeric:
+                write_record(file, EDGES, np.array(numeric, dtype=EDGE_TYPE).tobytes())
+            if parametric:
+                write_record(file, PARAMETRIC_EDGES, json.dumps(parametric).encode())
+
+            write_record(file, FRONTIER, np.array(frontier, dtype="<i8").tobytes())
+            file.flush()
+            os.fsync(file.fileno())
+
+        if path != self.path:
+            os.replace(path, self.path)
+        self.saved_states = len(store)
+
+    def load(self) -> tuple:
+        """
+        Reads the last complete checkpoint.
+
+        :return: header, StateStore with all States, list of encoded Edges, and frontier codes
+        """
+        with open(self.path, "rb") as file:
+            data = file.read()
+        if not data.startswith(MAGIC):
+            raise ValueError("{} is not a checkpoint.".format(self.path))
+
+        records = []
+        position = len(MAGIC)
+        while position + RECORD.size <= len(data):
+            tag, length = RECORD.unpack_from(data, position)
+            position += RECORD.size
+            if position + length > len(data):
+                break
+            records.append((tag, data[position:position + length]))
+            position += length
+
+        complete = [i for i, (tag, _) in enumerate(records) if tag == FRONTIER]
+        if not complete or records[0][0] != HEADER:
+            raise ValueError("{} does not contain a complete checkpoint.".format(self.path))
+        records = records[:complete[-1] + 1]
+
+        header = json.loads(records[0][1].decode())
+        store = StateStore(header["length"], (1 << header["bits"]) - 2)
+        store.extend(b"".join([payload for tag, payload in records if tag == STATES]))
+
+        edges = []
+        for tag, payload in records:
+            if tag == EDGES:
+                array = np.frombuffer(payload, dtype=EDGE_TYPE)
+                edges += [Edge(source, target, probability, True) for source, target, probability
+                          in zip(array["s"].tolist(), array["t"].tolist(), array["p"].tolist())]
+            elif tag == PARAMETRIC_EDGES:
+                edges += [Edge(source, target, probability, True)
+                          for source, target, probability in json.loads(payload.decode())]
+
+        frontier = np.frombuffer(records[-1][1], dtype="<i8").tolist()
+        return header, store, edges, frontier
+
+
+def write_record(file, tag: bytes, payload: bytes):
+    file.write(RECORD.pack(tag, len(payload)))
+    file.write(payload)
+
+
+def is_checkpoint(path: str) -> bool:
+    """
+    :param path: given file
+    :return: True if the file is a checkpoint
+    """
+    with open(path, "rb") as file:
+        return file.read(len(MAGIC)) == MAGIC
@@ -0,0 +1,224 @@
+import numpy as np
+from lark import Tree
+from scipy.sparse import csr_matrix, identity
+from scipy.sparse.linalg import spsolve
+
+from Core.Formula import Formula, SIGNS
+from Errors.InvalidInputError import InvalidInputError
+from TS.TransitionMatrix import TransitionMatrix
+
+PRECEDENCE = ["|", "&"]  # binary operators from the weakest one
+
+
+class DTMCChecker:
+    def __init__(self, matrix: TransitionMatrix, init: int, APs: dict):
+        """
+        Native model checker of numeric PCTL formulas (see ParsePCTLformula) over DTMC given
+        by TransitionMatrix. Probabilities of path formulas are computed directly on the sparse
+        matrix (X by multiplication, U, F and G by solving linear system), results of subformulas
+        are shared among all checked formulas.
+
+        States without outgoing Edges are considered absorbing.
+
+        :param matrix: numeric TransitionMatrix
+        :param init: code of initial State
+        :param APs: dictionary of AtomicProposition -> codes of States satisfying it
+        """
+        self.init = int(matrix.rows(init))
+        self.matrix = matrix.to_scipy()
+        absorbing = np.flatnonzero(np.diff(matrix.indptr) == 0)
+        self.matrix = self.matrix + csr_matrix((np.ones(len(absorbing)), (absorbing, absorbing)),
+                                               shape=self.matrix.shape)
+        self.graph = (self.matrix != 0).astype(np.int64)  # graph.dot(States) gives their predecessors
+        self.APs = dict()
+        for ap, codes in APs.items():
+            satisfied = np.zeros(len(matrix), dtype=bool)
+            satisfied[matrix.rows(np.array(sorted(codes), dtype=np.int64))] = True
+            self.APs[str(ap)] = satisfied
+        self.cache = dict()
+
+    def check(self, formula: Formula):
+        """
+        Checks given formula in the initial State.
+
+        :param formula: PCTL formula (P=? or a state formula)
+        :return: probability for P=? formula, otherwise True if initial State satisfies the formula
+        """
+        tree = formula.data
+        probability = top_level_query(tree)
+        if probability is not None:
+            return float(self.path_probabilities(probability.children[2])[self.init])
+        return bool(self.state_formula(tree)[self.init])
+
+    def check_all(self, formulas: list) -> list:
+        """
+        Checks given formulas in the initial State.
+
+        :param formulas: list of PCTL formulas
+        :return: list of results (see check)
+        """
+        return [self.check(formula) for formula in formulas]
+
+    def state_formula(self, tree: Tree) -> np.array:
+        """
+        Computes States satisfying given state formula. Boolean operators have usual precedence
+        (! over & over |) regardless the shape of the tree.
+
+        :param tree: state_formula Tree
+        :return: boolean vector of States satisfying the formula
+        """
+        return self.expression(flatten(tree))
+
+    def expression(self, items: list, level: int = 0) -> np.array:
+        """
+        Evaluates flattened boolean expression.
+
+        :param items: operators and operands (see flatten)
+        :param level: index of the weakest operator in PRECEDENCE
+        :return: boolean vector of States
+        """
+        if level < len(PRECEDENCE):
+            operands = split(items, PRECEDENCE[level])
+            result = self.expression(operands[0], level + 1)
+            for operand in operands[1:]:
+                other = self.expression(operand, level + 1)
+                result = result | other if PRECEDENCE[level] == "|" else result & other
+            return result
+        if not items:
+            raise InvalidInputError("Missing operand in PCTL formula.")
+        if isinstance(items[0], str) and items[0] == "!":
+            return ~self.expression(items[1:], level)
+        if len(items) != 1:
+            raise InvalidInputError("Unexpected operand in PCTL formula.")
+        return self.operand(items[0])
+
+    def operand(self, item) -> np.array:
+        """
+        Evaluates single operand of boolean expression.
+
+        :param item: True, AtomicProposition, brackets or nested probability Tree
+        :return: boolean vector of States
+        """
+        if not isinstance(item, Tree):
+            return np.ones(self.matrix.shape[0], dtype=bool)
+        if item.data == "ap":
+            return self.atomic_proposition(item.children[0])
+        if item.data == "brackets":
+            return self.state_formula(item.children[1])
+        # prob
+        bound = item.children[0]
+        if bound.data == "pq":
+            raise InvalidInputError("Nested P=? query is not allowed.")
+        sign, number = str(bound.children[1]).strip(), float(bound.children[2])
+        return SIGNS[sign](self.path_probabilities(item.children[2]), number)
+
+    def atomic_proposition(self, ap) -> np.array:
+        """
+        :param ap: AtomicProposition
+        :return: boolean vector of States satisfying it
+        """
+        if str(ap) not in self.APs:
+            raise InvalidInputError("Atomic proposition {} is not labelled.".format(ap))
+        return self.APs[str(ap)]
+
+    def path_probabilities(self, tree: Tree) -> np.array:
+        """
+        Computes probabilities of given path formula for all States.
+
+        :param tree: path_formula Tree
+        :return: vector of probabilities
+        """
+        key = str(Formula(True, tree))
+        if key not in self.cache:
+            operator = str(tree.children[0]).strip() if len(tree.children) == 2 else "U"
+            if operator == "X":
+                result = self.matrix.dot(self.state_formula(tree.children[1]).astype(float))
+            elif operator == "F":
+                result = self.until(np.ones(self.matrix.shape[0], dtype=bool), self.state_formula(tree.children[1]))
+            elif operator == "G":
+                result = 1 - self.until(np.ones(self.matrix.shape[0], dtype=bool),
+                                        ~self.state_formula(tree.children[1]))
+            else:
+                result = self.until(self.state_formula(tree.children[0]), self.state_formula(tree.children[2]))
+            self.cache[key] = np.clip(result, 0, 1)
+        return self.cache[key]
+
+    def until(self, left: np.array, right: np.array) -> np.array:
+        """
+        Computes probabilities of left U right. States which cannot reach right via left States
+        have probability 0, probabilities of the remaining ones are given by linear system
+        x = P x restricted to them (with x = 1 on right States).
+
+        :param left: boolean vector of States satisfying left formula
+        :param right: boolean vector of States satisfying right formula
+        :return: vector of probabilities
+        """
+        result = right.astype(float)
+        maybe = self.backward_reachable(right, left & ~right) & ~right
+        indices = np.flatnonzero(maybe)
+        if len(indices):
+            rows = self.matrix[indices]
+            system = identity(len(indices), format="csc") - rows[:, indices].tocsc()
+            result[indices] = spsolve(system, rows.dot(right.astype(float)))
+        return result
+
+    def backward_reachable(self, targets: np.array, allowed: np.array) -> np.array:
+        """
+        Computes States from which targets can be reached via allowed States.
+
+        :param targets: boolean vector of target States
+        :param allowed: boolean vector of States allowed on the way
+        :return: boolean vector of States
+        """
+        reached = targets.copy()
+        frontier = targets
+        while frontier.any():
+            predecessors = self.graph.dot(frontier.astype(np.int64)) != 0
+            frontier = predecessors & allowed & ~reached
+            reached |= frontier
+        return reached
+
+
+def top_level_query(tree: Tree):
+    """
+    :param tree: state_formula Tree
+    :return: prob Tree if the formula is P=? query, otherwise None
+    """
+    while isinstance(tree, Tree) and tree.data == "state_formula" and len(tree.children) == 1:
+        tree = tree.children[0]
+    if isinstance(tree, Tree) and tree.data == "prob" and tree.children[0].data == "pq":
+        return tree
+    return None
+
+
+def flatten(tree: Tree) -> list:
+    """
+    Flattens chain of boolean operators in state formula to list of operators and operands.
+
+    :param tree: state_formula Tree
+    :return: list of operators (strings) and operands (True token or Trees)
+    """
+    items = []
+    for child in tree.children:
+        if isinstance(child, Tree) and child.data == "state_formula":
+            items += flatten(child)
+        elif isinstance(child, str) and child.strip() in ["&", "|", "!"]:
+            items.append(child.strip())
+        else:
+            items.append(child)
+    return items
+
+
+def split(items: list, operator: str) -> list:
+    """
+    :param items: operators and operands
+    :param operator: given binary operator
+    :return: parts of items separated by operator
+    """
+    parts = [[]]
+    for item in items:
+        if isinstance(item, str) and item == operator:
+            parts.append([])
+        else:
+            parts[-1].append(item)
+    return parts
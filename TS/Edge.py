@@ -39,7 +39,7 @@ class Edge:
         """
         return Edge(encoding_new[encoding_old[self.source]],
                     encoding_new[encoding_old[self.target]],
-                    self.probability)
+                    self.probability, True)
 
     def add_rate(self, rate):
         """
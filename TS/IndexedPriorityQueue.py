@@ -0,0 +1,67 @@
+class IndexedPriorityQueue:
+    def __init__(self, keys: list):
+        """
+        Binary min-heap over items 0..n-1 with given keys.
+
+        Position of each item in the heap is tracked, therefore key of any item
+        can be changed in O(log n) and the minimal item is available in O(1).
+
+        :param keys: initial keys of items
+        """
+        self.keys = list(keys)
+        self.heap = list(range(len(self.keys)))
+        self.position = list(range(len(self.keys)))
+        for i in reversed(range(len(self.heap) // 2)):
+            self.sift_down(i)
+
+    def __len__(self):
+        return len(self.heap)
+
+    def top(self) -> tuple:
+        """
+        :return: item with minimal key and the key
+        """
+        item = self.heap[0]
+        return item, self.keys[item]
+
+    def update(self, item: int, key: float):
+        """
+        Changes key of the item and restores the heap property.
+
+        :param item: given item
+        :param key: new key
+        """
+        old = self.keys[item]
+        self.keys[item] = key
+        if key < old:
+            self.sift_up(self.position[item])
+        elif key > old:
+            self.sift_down(self.position[item])
+
+    def swap(self, i: int, j: int):
+        heap = self.heap
+        heap[i], heap[j] = heap[j], heap[i]
+        self.position[heap[i]] = i
+        self.position[heap[j]] = j
+
+    def sift_up(self, i: int):
+        keys, heap = self.keys, self.heap
+        while i > 0:
+            parent = (i - 1) // 2
+            if keys[heap[i]] >= keys[heap[parent]]:
+                return
+            self.swap(i, parent)
+            i = parent
+
+    def sift_down(self, i: int):
+        keys, heap = self.keys, self.heap
+        size = len(heap)
+        while True:
+            smallest = i
+            for child in (2 * i + 1, 2 * i + 2):
+                if child < size and keys[heap[child]] < keys[heap[smallest]]:
+                    smallest = child
+            if smallest == i:
+                return
+            self.swap(i, smallest)
+            i = smallest
@@ -0,0 +1,150 @@
+import json
+
+from TS.Edge import edge_from_dict
+from TS.State import state_from_string
+
+CHUNK_SIZE = 2 ** 20  # in characters
+WHITESPACE = " \t\n\r"
+
+
+class JSONStream:
+    def __init__(self, file, chunk_size: int = CHUNK_SIZE):
+        """
+        Incremental reader of JSON documents.
+
+        The file is read by chunks, only the currently parsed part is kept in memory.
+        Containers can be iterated by members and elements (their values have to be consumed
+        by the caller before the iteration continues), any other value is decoded as a whole by value.
+
+        :param file: opened text file
+        :param chunk_size: number of characters read at once
+        """
+        self.file = file
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.position = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def read_more(self) -> bool:
+        """
+        Reads next chunk of the file, already parsed part of buffer is dropped.
+
+        :return: False if the end of file was reached
+        """
+        if self.eof:
+            return False
+        chunk = self.file.read(self.chunk_size)
+        self.buffer = self.buffer[self.position:] + chunk
+        self.position = 0
+        self.eof = not chunk
+        return not self.eof
+
+    def peek(self) -> str:
+        """
+        Skips whitespaces.
+
+        :return: next character
+        """
+        while True:
+            while self.position < len(self.buffer) and self.buffer[self.position] in WHITESPACE:
+                self.position += 1
+            if self.position < len(self.buffer):
+                return self.buffer[self.position]
+            if not self.read_more():
+                raise ValueError("Unexpected end of JSON.")
+
+    def expect(self, characters: str) -> str:
+        """
+        Consumes next character which has to be one of given characters.
+
+        :param characters: allowed characters
+        :return: the consumed character
+        """
+        character = self.peek()
+        if character not in characters:
+            raise ValueError("Expected one of '{}' but got '{}'.".format(characters, character))
+        self.position += 1
+        return character
+
+    def value(self):
+        """
+        Decodes next complete value.
+
+        :return: decoded value
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.position)
+                # a number could continue in the next chunk
+                if end < len(self.buffer) or self.eof:
+                    self.position = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self.read_more()
+
+    def members(self):
+        """
+        Iterates members of an object, value of each member has to be consumed before the next one.
+
+        :return: generator of keys
+        """
+        self.expect("{")
+        if self.peek() == "}":
+            self.position += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(":")
+            yield key
+            if self.expect(",}") == "}":
+                return
+
+    def elements(self):
+        """
+        Iterates elements of an array, each element has to be consumed before the next one.
+
+        :return: generator of indices
+        """
+        self.expect("[")
+        if self.peek() == "]":
+            self.position += 1
+            return
+        index = 0
+        while True:
+            yield index
+            index += 1
+            if self.expect(",]") == "]":
+                return
+
+
+def iterate_TS_json(json_file: str):
+    """
+    Iterates parts of TS stored in JSON (see TransitionSystem.save_to_json) in the order given by the file,
+    the file is read incrementally and States are parsed without evaluation.
+
+    Items are tuples ("node", code, State), ("edge", Edge), ("unprocessed", State),
+    ("ordering", list of str) and ("initial", code).
+
+    :param json_file: given TS in JSON
+    :return: generator of items
+    """
+    with open(json_file) as file:
+        stream = JSONStream(file)
+        for key in stream.members():
+            if key == "nodes":
+                for code in stream.members():
+                    yield "node", int(code), state_from_string(stream.value())
+            elif key == "edges":
+                for _ in stream.elements():
+                    yield "edge", edge_from_dict(stream.value())
+            elif key == "unprocessed":
+                for _ in stream.elements():
+                    yield "unprocessed", state_from_string(stream.value())
+            elif key in ("ordering", "initial"):
+                yield key, stream.value()
+            else:
+                stream.value()
@@ -0,0 +1,119 @@
+import json
+import math
+import os
+from json.encoder import encode_basestring_ascii
+
+INDENT = 4
+
+
+class JSONWriter:
+    def __init__(self, output_file: str):
+        """
+        Incremental writer of JSON documents with top-level object.
+
+        Members of the top-level object and items of nested containers are written to the file
+        as soon as they are given, so the document does not have to be kept in memory.
+        The output is the same as given by json.dump with indent=4.
+
+        The document is written to a temporary file which replaces the given file only when
+        the writer is closed successfully, so a failed writing never leaves a truncated document.
+
+        :param output_file: given file to write to
+        """
+        self.path = output_file
+        self.file = open(output_file + ".tmp", "w")
+        self.file.write("{")
+        self.containers = [["}", 0]]  # closing character and number of items of open containers
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def prefix(self, key):
+        """
+        Writes separator of a new item of the innermost container (and its key, if given).
+
+        :param key: key of the item (for objects) or None (for arrays)
+        """
+        container = self.containers[-1]
+        self.file.write(("," if container[1] else "") + "\n" + " " * INDENT * len(self.containers))
+        if key is not None:
+            self.file.write(json.dumps(str(key)) + ": ")
+        container[1] += 1
+
+    def item(self, value, key=None):
+        """
+        Writes a complete value as an item of the innermost container.
+
+        :param value: JSON serialisable value
+        :param key: key of the item (for objects) or None (for arrays)
+        """
+        self.prefix(key)
+        self.file.write(encode(value, len(self.containers)))
+
+    def start(self, key=None, array: bool = False):
+        """
+        Starts a nested container, its items are given by next calls of item until end is called.
+
+        :param key: key of the container (for objects) or None (for arrays)
+        :param array: True if the container is array, otherwise it is object
+        """
+        self.prefix(key)
+        self.file.write("[" if array else "{")
+        self.containers.append(["]" if array else "}", 0])
+
+    def end(self):
+        """
+        Ends the innermost container.
+        """
+        closing, count = self.containers.pop()
+        if count:
+            self.file.write("\n" + " " * INDENT * len(self.containers))
+        self.file.write(closing)
+
+    def close(self):
+        """
+        Ends all open containers, closes the file and replaces the given file by it.
+        """
+        while self.containers:
+            self.end()
+        self.file.close()
+        os.replace(self.path + ".tmp", self.path)
+
+    def abort(self):
+        """
+        Closes and removes the unfinished document, the given file is not changed.
+        """
+        self.file.close()
+        os.remove(self.path + ".tmp")
+
+
+def encode(value, level: int) -> str:
+    """
+    Encodes value in the same way as json.dumps with indent=4 (but faster, scalars are encoded
+    without indentation which is done by C implementation of json).
+
+    :param value: JSON serialisable value
+    :param level: level of indentation of the value
+    :return: encoded value
+    """
+    if isinstance(value, dict):
+        items = [encode_basestring_ascii(str(key)) + ": " + encode(item, level + 1) for key, item in value.items()]
+    elif isinstance(value, (list, tuple)):
+        items = [encode(item, level + 1) for item in value]
+    elif type(value) == str:
+        return encode_basestring_ascii(value)
+    elif type(value) == int or (type(value) == float and math.isfinite(value)):
+        return repr(value)
+    else:
+        return json.dumps(value)
+    if not items:
+        return "{}" if isinstance(value, dict) else "[]"
+    indent = "\n" + " " * INDENT * (level + 1)
+    brackets = "{}" if isinstance(value, dict) else "[]"
+    return brackets[0] + indent + ("," + indent).join(items) + "\n" + " " * INDENT * level + brackets[1]
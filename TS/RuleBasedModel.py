@@ -0,0 +1,142 @@
+import collections
+import copy
+import itertools
+
+import numpy as np
+
+from TS.State import State
+from TS.VectorModel import VectorModel
+from TS.VectorReaction import VectorReaction
+
+
+class RuleBasedModel(VectorModel):
+    def __init__(self, rules: set, init: State, ordering, bound: int, definitions: dict,
+                 atomic_signature: dict, structure_signature: dict):
+        """
+        Network-free representation of a model used for generating of transition system.
+
+        Rules are kept in their abstract form and VectorReactions are instantiated only when
+        they can be enabled in an explored State. For each rule, possible contexts of its agents
+        are restricted to those agents which are present in the State (in the right compartment),
+        reactions created from the restricted contexts are cached (they share the vectorized rate of the rule).
+
+        The resulting transition system is the same as for VectorModel created by Model.to_vector_model.
+
+        :param rules: set of Rules
+        :param init: initial State
+        :param ordering: SpeciesRegistry of unique Complexes
+        :param bound: given bound (computed from rules if not given)
+        :param definitions: dict of (param_name, value)
+        :param atomic_signature: given atomic signature
+        :param structure_signature: given structure signature
+        """
+        # agents (together with compartment) of particular Complexes from ordering, identified by integers
+        agent_ids = dict()
+        self.present_agents = [{agent_ids.setdefault((complex.compartment, agent), len(agent_ids))
+                                for agent in complex.agents} for complex in ordering]
+
+        self.rules = []
+        for rule in sorted(rules):
+            rate = copy.deepcopy(rule.rate)
+            if rate:
+                rate.vectorize(ordering, definitions)
+            contexts = rule.create_contexts(atomic_signature, structure_signature)
+            # for each option, id of its agent from left-hand side (None for agents only on right-hand side)
+            required = [[None if l is None else agent_ids.get((rule.compartments[l], option[0]), -1)
+                         for option in options] for (l, _), options in zip(rule.pairs, contexts)]
+            self.rules.append((rule, rate, str(rate), contexts, required))
+        self.instantiated = dict()  # (rule index, allowed contexts) -> VectorReactions
+        self.candidates = dict()    # support of State -> candidate VectorReactions
+
+        super(RuleBasedModel, self).__init__(set(), init, ordering, bound)
+
+    def compute_bound(self):
+        """
+        Computes maximal value of vectors of reactions (without instantiating them) and initial state.
+        Number of occurrences of a Complex in a side is bounded by number of abstract Complexes
+        in the side compatible with it.
+
+        :return: maximal bound
+        """
+        result = max(self.init.sequence)
+        for rule, _, _, _, _ in self.rules:
+            for side in rule.create_complexes():
+                occurrences = collections.Counter()
+                for complex in side.agents:
+                    occurrences.update(complex.identify_compatible(self.ordering))
+                result = max([result] + list(occurrences.values()))
+        return result
+
+    def instantiate(self, index: int, choices: tuple) -> list:
+        """
+        Creates VectorReactions of a rule from restricted contexts of its agents.
+
+        :param index: index of the rule
+        :param choices: indices of allowed contexts for each pair of agents
+        :return: list of unique VectorReactions
+        """
+        rule, rate, _, contexts, _ = self.rules[index]
+        reactions = dict()
+        for result in itertools.product(*[[contexts[i][j] for j in choice] for i, choice in enumerate(choices)]):
+            reaction = rule.instantiate(result)
+            source = reaction.lhs.to_vector(self.ordering)
+            target = reaction.rhs.to_vector(self.ordering)
+            key = (source.sequence.tobytes(), target.sequence.tobytes())
+            if key not in reactions:
+                reactions[key] = VectorReaction(source, target, rate)
+        return list(reactions.values())
+
+    def create_candidates(self, support: tuple) -> tuple:
+        """
+        Instantiates reactions of all rules which can be enabled in States with given support
+        (i.e. positions of present Complexes).
+
+        :param support: sorted positions of present Complexes
+        :return: list of unique VectorReactions and 2D array of their sources
+        """
+        present = set()
+        for i in support:
+            present |= self.present_agents[i]
+
+        candidates = dict()
+        for index, (rule, rate, rate_key, contexts, required) in enumerate(self.rules):
+            choices = [tuple([j for j, agent in enumerate(agents) if agent is None or agent in present])
+                       for agents in required]
+            if not all(choices):
+                continue
+
+            key = (index, tuple(choices))
+            if key not in self.instantiated:
+                self.instantiated[key] = self.instantiate(index, tuple(choices))
+            for reaction in self.instantiated[key]:
+                # all reactants have to be present
+                if set(np.flatnonzero(reaction.source.sequence).tolist()) <= set(support):
+                    candidates[(reaction.source.sequence.tobytes(), reaction.target.sequence.tobytes(),
+                                rate_key)] = reaction
+
+        reactions = list(candidates.values())
+        sources = np.array([reaction.source.sequence for reaction in reactions]).reshape(-1, len(self.ordering))
+        return reactions, sources
+
+    def candidate_reactions(self, state: State):
+        """
+        Gives reactions of all rules which are enabled in the given State.
+        Candidates are instantiated once for each support of States.
+
+        :param state: given State
+        :return: iterable of VectorReactions
+        """
+        support = tuple(np.flatnonzero(state.sequence).tolist())
+        if support not in self.candidates:
+            self.candidates[support] = self.create_candidates(support)
+        reactions, sources = self.candidates[support]
+        return [reactions[i] for i in np.flatnonzero((sources <= state.sequence).all(axis=1))]
+
+    def create_batch_kernel(self):
+        """
+        Reactions are not known in advance, therefore States cannot be expanded in batches
+        (they are expanded one by one instead).
+
+        :return: None
+        """
+        return None
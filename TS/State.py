@@ -1,3 +1,5 @@
+import re
+
 import numpy as np
 
 import Core.Formula
@@ -21,7 +23,7 @@ class State:
         return self.sequence * other.sequence
 
     def __ge__(self, other: 'State') -> bool:
-        return all(self.sequence >= other.sequence)
+        return bool((self.sequence >= other.sequence).all())
 
     def __str__(self):
         return str(tuple(self.sequence))
@@ -92,26 +94,18 @@ class State:
         Checks whether state is special "hell" infinite state.
         :return: True if is special
         """
-        return all([np.isinf(i) for i in self.sequence])
+        return bool(np.isinf(self.sequence).all())
 
     def check_AP(self, ap, ordering: tuple) -> bool:
         """
         Checks whether the State satisfies given AtomicProposition.
-
-        TBA : could be abstract !!!
+        AtomicProposition can be abstract, then sum of all compatible agents is checked.
 
         :param ap: given AtomicProposition
         :param ordering: position of corresponding Complex
         :return: True if satisfied
         """
-        if ap.complex in ordering:
-            operand = str(self.sequence[ordering.index(ap.complex)])
-        else:
-            indices = ap.complex.identify_compatible(ordering)
-            state = State(np.array([1 if i in indices else 0 for i in range(len(ordering))]))
-            operand = str(self.filter_values(state))
-        sign = "==" if ap.sign == " = " else ap.sign
-        return eval(operand + sign + str(ap.number))
+        return bool(ap.evaluate(self.sequence.reshape(1, -1), ap.indices(ordering))[0])
 
     def to_PRISM_string(self, apostrophe=False) -> str:
         """
@@ -123,3 +117,16 @@ class State:
         aps = "'" if apostrophe else ""
         vars = list(map(lambda i: "(VAR_{}{}={})".format(i, aps, self.sequence[i]), range(len(self))))
         return " & ".join(vars)
+
+
+def state_from_string(string: str) -> State:
+    """
+    Creates State from its string representation (as given by str of State) without evaluating it,
+    e.g. "(1, 0, 2)" or "(inf, inf, inf)".
+
+    :param string: string representation of State
+    :return: State
+    """
+    string = re.sub(r"np\.\w+\(([^()]*)\)", r"\1", string).strip().strip("()")
+    values = [value.strip() for value in string.split(",") if value.strip()]
+    return State(np.array([int(value) if value.lstrip("-").isdigit() else float(value) for value in values]))
@@ -0,0 +1,178 @@
+from array import array
+
+import numpy as np
+
+from TS.State import State
+
+WORD_SIZE = 8  # in bytes
+EMPTY = -1
+
+
+class StateStore:
+    def __init__(self, length: int, bound: int, capacity: int = 1024):
+        """
+        Compact storage of States.
+
+        State vectors are bit-packed (each value takes the number of bits required by the bound)
+        to a fixed number of 64-bit words and stored in a contiguous buffer. An open-addressing
+        hash index maps packed vectors to their codes. Codes are assigned incrementally
+        starting from 1 (same as in TransitionSystem.encode).
+
+        The special "hell" state is stored with all values set to the maximal representable value.
+
+        :param length: length of State vectors
+        :param bound: maximal value in non-hell States
+        :param capacity: initial number of States which can be stored
+        """
+        self.length = length
+        self.bits = max(int(bound + 1).bit_length(), 1)
+        self.mask = (1 << self.bits) - 1
+        self.width = max(-(-length * self.bits // (8 * WORD_SIZE)), 1) * WORD_SIZE
+
+        self.size = 0
+        self.buffer = bytearray(capacity * self.width)
+        self.index = array('q', [EMPTY]) * (2 * capacity)
+
+    def __len__(self):
+        return self.size
+
+    def __contains__(self, state: State):
+        return self.find(self.pack(state)) != EMPTY
+
+    def pack(self, state: State) -> bytes:
+        """
+        Packs State to fixed width sequence of bytes.
+
+        :param state: given State
+        :return: packed vector
+        """
+        key = 0
+        if state.is_inf:
+            for _ in range(self.length):
+                key = (key << self.bits) | self.mask
+        else:
+            for value in reversed(state.sequence.tolist()):
+                value = int(value)
+                if not 0 <= value < self.mask:
+                    raise ValueError("State {} is out of bounds of the store.".format(state))
+                key = (key << self.bits) | value
+        return key.to_bytes(self.width, "little")
+
+    def unpack(self, packed: bytes) -> State:
+        """
+        Unpacks sequence of bytes to State.
+
+        :param packed: packed vector
+        :return: State
+        """
+        key = int.from_bytes(packed, "little")
+        values = [(key >> (i * self.bits)) & self.mask for i in range(self.length)]
+        if self.length and all([value == self.mask for value in values]):
+            return State(np.array([np.inf] * self.length))
+        return State(np.array(values, dtype=np.int64))
+
+    def row(self, position: int) -> bytes:
+        return bytes(self.buffer[position * self.width:(position + 1) * self.width])
+
+    def find(self, packed: bytes) -> int:
+        """
+        Finds position of packed vector in the buffer using linear probing in the hash index.
+
+        :param packed: packed vector
+        :return: position of the vector in buffer or EMPTY
+        """
+        mask = len(self.index) - 1
+        i = hash(packed) & mask
+        while self.index[i] != EMPTY:
+            if self.row(self.index[i]) == packed:
+                return self.index[i]
+            i = (i + 1) & mask
+        return EMPTY
+
+    def insert(self, packed: bytes, position: int):
+        mask = len(self.index) - 1
+        i = hash(packed) & mask
+        while self.index[i] != EMPTY:
+            i = (i + 1) & mask
+        self.index[i] = position
+
+    def add(self, state: State):
+        """
+        Inserts the State to the store if it is not present yet.
+
+        :param state: given State
+        :return: code of the State and True if it was newly inserted
+        """
+        packed = self.pack(state)
+        position = self.find(packed)
+        if position != EMPTY:
+            return position + 1, False
+
+        if self.size * self.width == len(self.buffer):
+            self.grow()
+        self.buffer[self.size * self.width:(self.size + 1) * self.width] = packed
+        self.insert(packed, self.size)
+        self.size += 1
+        return self.size, True
+
+    def extend(self, packed: bytes):
+        """
+        Appends already packed States (e.g. loaded from a checkpoint), they get subsequent codes.
+        The States are assumed to be unique.
+
+        :param packed: concatenated packed vectors
+        """
+        count = len(packed) // self.width
+        while (self.size + count) * self.width > len(self.buffer):
+            self.grow()
+        self.buffer[self.size * self.width:(self.size + count) * self.width] = packed[:count * self.width]
+        for position in range(self.size, self.size + count):
+            self.insert(self.row(position), position)
+        self.size += count
+
+    def rows(self, start: int, end: int) -> bytes:
+        """
+        :param start: code of the first State
+        :param end: code of the last State
+        :return: packed vectors of States with codes in given range (inclusive)
+        """
+        return bytes(self.buffer[(start - 1) * self.width:end * self.width])
+
+    def grow(self):
+        """
+        Doubles capacity of the buffer and rebuilds the hash index.
+        """
+        self.buffer.extend(bytes(len(self.buffer)))
+        self.index = array('q', [EMPTY]) * (2 * len(self.buffer) // self.width)
+        for position in range(self.size):
+            self.insert(self.row(position), position)
+
+    def code(self, state: State) -> int:
+        """
+        :param state: given State
+        :return: code of the State or None if not present
+        """
+        position = self.find(self.pack(state))
+        return None if position == EMPTY else position + 1
+
+    def get(self, code: int) -> State:
+        """
+        :param code: code of a stored State
+        :return: decoded State
+        """
+        return self.unpack(self.row(code - 1))
+
+    def to_array(self) -> np.array:
+        """
+        :return: stored packed vectors as 2D array of 64-bit words (one row per State)
+        """
+        data = bytes(self.buffer[:self.size * self.width])
+        return np.frombuffer(data, dtype=np.uint64).reshape(self.size, self.width // WORD_SIZE)
+
+    def to_encoding(self) -> dict:
+        """
+        Creates encoding used by TransitionSystem.
+
+        :return: dict State -> code
+        """
+        return {self.get(code): code for code in range(1, self.size + 1)}
@@ -0,0 +1,408 @@
+import random
+import numpy as np
+
+from Errors.InvalidInputError import InvalidInputError
+from TS.IndexedPriorityQueue import IndexedPriorityQueue
+from TS.State import State
+
+METHODS = ("direct", "next_reaction", "tau_leaping")
+
+
+class StochasticSimulator:
+    def __init__(self, vector_reactions: set, init: State):
+        """
+        Stoichiometry-matrix based stochastic simulation of a VectorModel.
+
+        Reactions are fixed to a deterministic order, their reactants and changes are
+        precomputed as matrices (one row per reaction) and rates are compiled
+        to functions over the state vector.
+
+        For the Next Reaction Method, also sparse representation of reactions and
+        dependency graph of reactions are precomputed.
+
+        :param vector_reactions: set of VectorReactions
+        :param init: initial State
+        """
+        reactions = sorted(vector_reactions)
+        length = len(init)
+
+        self.init = init.sequence
+        self.reactants = np.array([reaction.source.sequence for reaction in reactions]).reshape(-1, length)
+        self.changes = np.array([reaction.target.sequence - reaction.source.sequence
+                                 for reaction in reactions]).reshape(-1, length)
+        self.rates = [reaction.rate for reaction in reactions]
+        self.functions = self.compile_rates()
+
+        # sparse reactions: (position, required amount) and (position, change)
+        self.requirements = [[(i, int(value)) for i, value in enumerate(row) if value] for row in self.reactants]
+        self.updates = [[(i, int(value)) for i, value in enumerate(row) if value] for row in self.changes]
+        self.dependencies = self.create_dependency_graph()
+
+    def __getstate__(self):
+        # compiled functions cannot be pickled, they are created again in __setstate__
+        state = self.__dict__.copy()
+        del state["functions"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.functions = self.compile_rates()
+
+    def compile_rates(self) -> list:
+        """
+        Compiles rates of all reactions to functions over the state vector.
+
+        :return: list of compiled functions
+        """
+        functions = []
+        for rate in self.rates:
+            function = rate.compile()
+            if not function:
+                raise InvalidInputError("Rate {} is not numeric - simulation cannot be executed.".format(rate))
+            functions.append(function)
+        return functions
+
+    def create_dependency_graph(self) -> list:
+        """
+        Creates dependency graph of reactions - reaction depends on another one if its enablement or
+        rate uses some agent changed by the other reaction. Each reaction depends on itself.
+
+        :return: list of sorted lists of reactions to be updated after particular reaction is applied
+        """
+        readers = dict()
+        for i, rate in enumerate(self.rates):
+            for position in {position for position, _ in self.requirements[i]} | rate.positions():
+                readers.setdefault(position, set()).add(i)
+
+        graph = []
+        for j, update in enumerate(self.updates):
+            affected = {j}
+            for position, _ in update:
+                affected |= readers.get(position, set())
+            graph.append(sorted(affected))
+        return graph
+
+    def propensity(self, reaction: int, values: list) -> float:
+        """
+        Evaluates rate of single reaction.
+
+        :param reaction: index of the reaction
+        :param values: state vector as a list
+        :return: rate, 0 if the reaction is disabled (or its rate is not positive)
+        """
+        for position, required in self.requirements[reaction]:
+            if values[position] < required:
+                return 0.0
+        try:
+            value = self.functions[reaction](values)
+        except (ZeroDivisionError, OverflowError):
+            return 0.0
+        return value if value > 0 else 0.0
+
+    def propensities(self, state: np.array) -> np.array:
+        """
+        Evaluates rates of all reactions enabled in the given state.
+
+        :param state: state vector
+        :return: array of rates, nan for disabled reactions (or reactions with undefined rate)
+        """
+        result = np.full(len(self.functions), np.nan)
+        values = state.tolist()
+        for i in np.flatnonzero((state >= self.reactants).all(axis=1)):
+            try:
+                result[i] = self.functions[i](values)
+            except (ZeroDivisionError, OverflowError):
+                pass
+        return result
+
+    def direct(self, max_time: float, time_step, generator=random) -> tuple:
+        """
+        One run of Gillespie direct method.
+
+        In each step, enabled reactions are ordered by their rates and one of them is selected
+        with probability proportional to its rate (using cumulative sum and binary search).
+        If there is no enabled reaction (with positive rate), the state is kept and the time
+        is moved forward randomly.
+
+        :param max_time: time when simulation ends
+        :param time_step: function giving time to next reaction from sum of rates
+        :param generator: source of random numbers (random module or its Random instance)
+        :return: array of times and 2D array of corresponding states
+        """
+        capacity = 1024
+        times = np.empty(capacity)
+        states = np.empty((capacity, len(self.init)))
+
+        state = self.init
+        time = 0.0
+        step = 0
+        while time < max_time:
+            if step == capacity:
+                times = np.concatenate((times, np.empty(capacity)))
+                states = np.concatenate((states, np.empty((capacity, len(self.init)))))
+                capacity *= 2
+            times[step] = time
+            states[step] = state
+            step += 1
+
+            rates = self.propensities(state)
+            applied = np.flatnonzero(rates > 0)
+            if applied.size:
+                rates_sum = rates[applied].sum()
+                order = applied[np.argsort(rates[applied], kind="stable")]
+                cumsum = np.cumsum(rates[order])
+
+                # pick random reaction based on rates
+                chosen = min(np.searchsorted(cumsum, rates_sum * generator.random()), len(order) - 1)
+                state = state + self.changes[order[chosen]]
+            else:
+                rates_sum = generator.uniform(0.5, 0.9)
+
+            time += time_step(rates_sum)
+
+        return times[:step], states[:step]
+
+    def next_reaction(self, max_time: float, generator=random) -> tuple:
+        """
+        One run of Gibson-Bruck Next Reaction Method.
+
+        Each reaction has its absolute putative firing time stored in indexed priority queue,
+        the one with minimal time is applied. Afterwards, only rates of reactions depending
+        on the applied one (given by dependency graph) are evaluated again and their times
+        are rescaled (the applied reaction gets a new random time).
+        If there is no enabled reaction, the state is kept until the end.
+
+        :param max_time: time when simulation ends
+        :param generator: source of random numbers (random module or its Random instance)
+        :return: array of times and 2D array of corresponding states
+        """
+        values = self.init.tolist()
+        rates = [self.propensity(i, values) for i in range(len(self.functions))]
+        queue = IndexedPriorityQueue([generator.expovariate(rate) if rate else np.inf for rate in rates])
+
+        times, states = [0.0], [list(values)]
+        while len(queue):
+            reaction, time = queue.top()
+            if time >= max_time:
+                break
+
+            for position, change in self.updates[reaction]:
+                values[position] += change
+            times.append(time)
+            states.append(list(values))
+
+            for i in self.dependencies[reaction]:
+                old, rates[i] = rates[i], self.propensity(i, values)
+                if not rates[i]:
+                    key = np.inf
+                elif i != reaction and old:
+                    key = time + old / rates[i] * (queue.keys[i] - time)
+                else:
+                    key = time + generator.expovariate(rates[i])
+                queue.update(i, key)
+
+        return np.array(times), np.array(states).reshape(len(times), len(self.init))
+
+    def leap_size(self, state: np.array, rates: np.array, noncritical: np.array, epsilon: float) -> float:
+        """
+        Cao-Gillespie-Petzold selection of leap size - the largest step such that expected relative change
+        of rates caused by noncritical reactions is bounded by epsilon.
+
+        Order of a reaction is given by number of its reactants, it is used to estimate how sensitive
+        are rates to change of particular agents.
+
+        :param state: state vector
+        :param rates: rates of all reactions
+        :param noncritical: mask of noncritical reactions
+        :param epsilon: error control parameter
+        :return: leap size (inf if there is no noncritical reaction)
+        """
+        consumed = (self.reactants[noncritical] > 0).any(axis=0)
+        if not consumed.any():
+            return np.inf
+
+        orders = self.reactants.sum(axis=1)
+        highest_order = np.where(self.reactants > 0, orders[:, None], 0).max(axis=0)[consumed]
+
+        mean = self.changes[noncritical].T.dot(rates[noncritical])[consumed]
+        variance = (self.changes[noncritical] ** 2).T.dot(rates[noncritical])[consumed]
+        bound = np.maximum(epsilon * state[consumed] / highest_order, 1)
+
+        with np.errstate(divide="ignore"):
+            return min(np.min(bound / np.abs(mean)), np.min(bound ** 2 / variance))
+
+    def tau_leaping(self, max_time: float, generator=random, epsilon: float = 0.03, critical: int = 10,
+                    threshold: float = 10, exact_steps: int = 100) -> tuple:
+        """
+        One run of adaptive explicit tau-leaping (Cao, Gillespie and Petzold).
+
+        In each leap, numbers of firings of noncritical reactions are sampled from Poisson distribution.
+        Reactions which can be applied less than critical times are handled exactly - at most one
+        of them is applied in a leap. If the selected leap is not much longer than an exact step
+        (populations are small), given number of steps of exact direct method is done instead.
+        When some population would become negative, the leap is halved.
+
+        :param max_time: time when simulation ends
+        :param generator: source of random numbers (random module or its Random instance)
+        :param epsilon: error control parameter
+        :param critical: reactions which can be applied fewer times are critical
+        :param threshold: leaping is used only if the leap is at least threshold times longer than exact step
+        :param exact_steps: number of exact steps done when leaping is not efficient
+        :return: array of times and 2D array of corresponding states
+        """
+        poisson = np.random.default_rng(generator.getrandbits(64)).poisson
+        required = self.reactants > 0
+
+        times, states = [], []
+        state = self.init
+        time = 0.0
+        exact = 0
+        while time < max_time:
+            times.append(time)
+            states.append(state)
+
+            rates = self.propensities(state)
+            rates = np.where(rates > 0, rates, 0)
+            rates_sum = rates.sum()
+            if not rates_sum:
+                break
+
+            if not exact:
+                # number of times each reaction can be applied before some of its reactants is depleted
+                with np.errstate(divide="ignore"):
+                    firings = np.where(required, state // np.where(required, self.reactants, 1), np.inf).min(axis=1)
+                criticals = (firings < critical) & (rates > 0)
+                noncritical = ~criticals & (rates > 0)
+                tau_noncritical = self.leap_size(state, rates, noncritical, epsilon)
+                if tau_noncritical < threshold / rates_sum:
+                    exact = exact_steps
+
+            if exact:
+                exact -= 1
+                chosen = min(np.searchsorted(np.cumsum(rates), rates_sum * generator.random()), len(rates) - 1)
+                state = state + self.changes[chosen]
+                time += generator.expovariate(rates_sum)
+                continue
+
+            critical_sum = rates[criticals].sum()
+            tau_critical = generator.expovariate(critical_sum) if critical_sum else np.inf
+            while True:
+                # leap is never longer than the remaining time (it is not recorded anyway)
+                tau = min(tau_noncritical, tau_critical, max_time - time)
+                firings = np.zeros(len(rates))
+                firings[noncritical] = poisson(rates[noncritical] * tau)
+                if tau_critical <= tau_noncritical:
+                    candidates = np.flatnonzero(criticals)
+                    cumsum = np.cumsum(rates[candidates])
+                    chosen = min(np.searchsorted(cumsum, critical_sum * generator.random()), len(candidates) - 1)
+                    firings[candidates[chosen]] = 1
+                new_state = state + firings.dot(self.changes).astype(state.dtype)
+                if (new_state >= 0).all():
+                    break
+                tau_noncritical /= 2
+
+            state = new_state
+            time += tau
+
+        return np.array(times), np.array(states).reshape(len(times), len(self.init))
+
+    def run(self, max_time: float, method: str = "direct", generator=random) -> tuple:
+        """
+        One run of chosen simulation method.
+
+        :param max_time: time when simulation ends
+        :param method: one of METHODS
+        :param generator: source of random numbers (random module or its Random instance)
+        :return: array of times and 2D array of corresponding states
+        """
+        if method == "direct":
+            return self.direct(max_time, generator.expovariate, generator)
+        if method == "next_reaction":
+            return self.next_reaction(max_time, generator)
+        if method == "tau_leaping":
+            return self.tau_leaping(max_time, generator)
+        raise InvalidInputError("Unknown simulation method {}, use one of {}.".format(method, ", ".join(METHODS)))
+
+    def run_on_grid(self, max_time: float, grid: np.array, seed: int, method: str = "direct") -> np.array:
+        """
+        One independent run of the chosen simulation method sampled on given time grid.
+        Value in a grid point is the state reached at that time (trajectory is piecewise constant).
+
+        :param max_time: time when simulation ends
+        :param grid: sorted array of time points
+        :param seed: seed of random numbers for the run
+        :param method: simulation method
+        :return: 2D array of states in grid points
+        """
+        times, states = self.run(max_time, method, random.Random(seed))
+        return states[np.searchsorted(times, grid, side="right") - 1]
+
+    def simulate_runs(self, max_time: float, grid: np.array, seeds: list,
+                      method: str = "direct") -> 'RunningStatistics':
+        """
+        Computes given runs and aggregates them on the fly.
+
+        :param max_time: time when simulation ends
+        :param grid: sorted array of time points
+        :param seeds: seeds of particular runs
+        :param method: simulation method
+        :return: aggregated statistics
+        """
+        statistics = RunningStatistics((len(grid), len(self.init)))
+        for seed in seeds:
+            statistics.add(self.run_on_grid(max_time, grid, seed, method))
+        return statistics
+
+
+class RunningStatistics:
+    def __init__(self, shape: tuple):
+        """
+        Running mean and variance of arrays (Welford's algorithm),
+        memory does not depend on number of added arrays.
+
+        :param shape: shape of aggregated arrays
+        """
+        self.count = 0
+        self.mean = np.zeros(shape)
+        self.m2 = np.zeros(shape)  # sum of squared differences from the mean
+
+    def add(self, values: np.array):
+        self.count += 1
+        delta = values - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (values - self.mean)
+
+    def merge(self, other: 'RunningStatistics'):
+        """
+        Merges statistics computed independently on another set of arrays.
+
+        :param other: given RunningStatistics
+        """
+        count = self.count + other.count
+        if other.count:
+            delta = other.mean - self.mean
+            self.mean = self.mean + delta * other.count / count
+            self.m2 = self.m2 + other.m2 + delta ** 2 * self.count * other.count / count
+        self.count = count
+
+    @property
+    def variance(self) -> np.array:
+        """
+        :return: sample variance (zeros if there is less than two arrays)
+        """
+        if self.count < 2:
+            return np.zeros_like(self.m2)
+        return self.m2 / (self.count - 1)
+
+
+def run_seeds(seed, runs: int) -> list:
+    """
+    Creates independent reproducible seeds for given number of runs.
+    Seed of a run depends only on given seed and index of the run.
+
+    :param seed: given seed (None for random one)
+    :param runs: number of runs
+    :return: list of seeds
+    """
+    sequences = np.random.SeedSequence(seed).spawn(runs)
+    return [int.from_bytes(sequence.generate_state(4).tobytes(), "little") for sequence in sequences]
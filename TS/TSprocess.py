@@ -0,0 +1,91 @@
+import multiprocessing
+import signal
+
+
+def owner(state, processes: int) -> int:
+    """
+    Assigns a State to the process which owns its part of the state space.
+
+    :param state: given State
+    :param processes: number of processes
+    :return: index of the owning process
+    """
+    return hash(state) % processes
+
+
+class TSprocess(multiprocessing.Process):
+    def __init__(self, index: int, model, processed: set, unprocessed: set, inboxes: list, commands, reports):
+        """
+        Process exploring its own partition of the state space.
+
+        Processes work in synchronised rounds controlled by the coordinator. In each round,
+        every process expands its frontier and sends exactly one batch of discovered states
+        to every other process (states are partitioned by their hash), then it waits for
+        batches of all other processes and reports the size of its new frontier.
+
+        :param index: index of the process (determines owned partition)
+        :param model: VectorModel used to compute successors
+        :param processed: already processed States of the partition
+        :param unprocessed: States of the partition to be processed
+        :param inboxes: queues for batches of States, one for each process
+        :param commands: queue with commands from coordinator
+        :param reports: queue shared by all processes to report to coordinator
+        """
+        super(TSprocess, self).__init__()
+        self.index = index
+        self.model = model
+        self.processed = processed
+        self.unprocessed = unprocessed
+        self.edges = set()
+
+        self.inboxes = inboxes
+        self.commands = commands
+        self.reports = reports
+
+    def run(self):
+        """
+        Waits for commands of the coordinator:
+        - ("expand", limit) : expands at most limit States of the frontier and exchanges discovered States
+        - "stop"            : sends processed and unprocessed States together with created Edges and terminates
+
+        Interruption is handled by the coordinator only.
+        """
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        while True:
+            command = self.commands.get()
+            if command == "stop":
+                self.reports.put((self.index, self.processed, self.unprocessed, self.edges))
+                return
+            self.expand(command[1])
+            self.reports.put((self.index, len(self.processed), len(self.unprocessed)))
+
+    def expand(self, limit: int):
+        """
+        Processes States from the frontier, then exchanges batches of newly discovered
+        States with other processes and creates a new frontier from the received ones
+        (together with States which were not processed because of the limit).
+
+        :param limit: maximal number of processed States
+        """
+        processes = len(self.inboxes)
+        batches = [set() for _ in range(processes)]
+
+        postponed = set()
+        while len(self.unprocessed) > limit:
+            postponed.add(self.unprocessed.pop())
+
+        for state in self.unprocessed:
+            self.processed.add(state)
+            for edge in self.model.compute_edges(state):
+                self.edges.add(edge)
+                batches[owner(edge.target, processes)].add(edge.target)
+
+        for i in range(processes):
+            if i != self.index:
+                self.inboxes[i].put(batches[i])
+
+        received = batches[self.index]
+        for _ in range(processes - 1):
+            received |= self.inboxes[self.index].get()
+
+        self.unprocessed = (received - self.processed) | postponed
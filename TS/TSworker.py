@@ -1,64 +1,247 @@
 import threading
+import time
 
 from TS.Edge import Edge
+from TS.StateStore import StateStore
+
+
+CHECKPOINT_INTERVAL = 600  # in seconds
+
+
+class Scheduler:
+    def __init__(self, ts, bound: int, max_time: float, max_size: float,
+                 checkpoint=None, checkpoint_interval: float = CHECKPOINT_INTERVAL):
+        """
+        Work queue shared by TSworkers.
+
+        States are taken from unprocessed ones and results are merged back under a single condition,
+        workers sleep on the condition when there is no work. Generating is finished as soon as
+        there are no unprocessed States (or some of the limits is reached) and all workers are idle.
+
+        During generating, States are kept only in compact StateStore and referred by their codes,
+        Edges are recorded as encoded from the start. The TS is updated by finish method.
+        If the TS already has a StateStore consistent with its encoding (e.g. it was loaded from a checkpoint),
+        the store is reused.
+
+        If a Checkpoint is given, the generated part of the TS is periodically saved to it
+        (new Edges are collected in journal in between).
+
+        :param ts: TransitionSystem being generated
+        :param bound: maximal value in non-hell States
+        :param max_time: time limit for generating (in seconds)
+        :param max_size: limit on number of states
+        :param checkpoint: Checkpoint to be saved periodically
+        :param checkpoint_interval: time between checkpoints (in seconds)
+        """
+        self.ts = ts
+        self.deadline = time.time() + max_time
+        self.max_size = max_size
+
+        if ts.store is not None and len(ts.store) == len(ts.states_encoding) and bound < ts.store.mask:
+            self.store = ts.store
+        else:
+            states = set(ts.states_encoding) | ts.processed | ts.unprocessed
+            bound = max([bound] + [max(state.sequence) for state in states if not state.is_inf and len(state)])
+            self.store = StateStore(len(ts.ordering), bound)
+            for state in sorted(ts.states_encoding, key=lambda state: ts.states_encoding[state]):
+                self.store.add(state)
+            if any([self.store.code(state) != code for state, code in ts.states_encoding.items()]):
+                ts.recode(self.store.to_encoding())
+        for state in ts.processed | ts.unprocessed:
+            self.store.add(state)
+
+        self.unprocessed = [self.store.code(state) for state in ts.unprocessed]
+        self.size = len(ts.processed) + len(ts.states_encoding)
+
+        self.condition = threading.Condition()
+        self.active = 0         # number of workers currently processing a State
+        self.stopped = False    # no more States are given to workers
+        self.finished = False
+        self.processing = set()  # codes of States taken by workers
+        self.error = None        # exception raised by a worker (re-raised by the generating thread)
+
+        self.checkpoint = checkpoint
+        self.checkpoint_interval = checkpoint_interval
+        self.last_checkpoint = time.time()
+        self.journal = [] if checkpoint else None  # Edges created since the last checkpoint
+
+    def size_exceeded(self) -> bool:
+        return self.size >= self.max_size
+
+    def update_finished(self):
+        """
+        Checks whether generating is finished and if so, wakes up everybody waiting.
+        Has to be called while holding the condition.
+        """
+        if self.active == 0 and (self.stopped or self.size_exceeded() or not self.unprocessed):
+            self.finished = True
+            self.condition.notify_all()
+
+    def get(self):
+        """
+        Takes a State to be processed, blocks until some is available.
+
+        :return: code and State to be processed or (None, None) if generating is finished
+        """
+        with self.condition:
+            while not self.finished:
+                if self.unprocessed and not self.stopped and not self.size_exceeded():
+                    code = self.unprocessed.pop()
+                    self.size += 1
+                    self.active += 1
+                    self.processing.add(code)
+                    return code, self.store.get(code)
+                self.update_finished()
+                if not self.finished:
+                    self.condition.wait()
+            return None, None
+
+    def take(self, count: int) -> list:
+        """
+        Takes a block of States to be processed at once, does not block.
+
+        :param count: maximal number of States
+        :return: list of codes and States to be processed (empty if there is no work or generating is stopped)
+        """
+        with self.condition:
+            if self.stopped:
+                return []
+            count = int(max(min(count, len(self.unprocessed), self.max_size - self.size), 0))
+            codes = [self.unprocessed.pop() for _ in range(count)]
+            self.size += count
+            self.active += count
+            self.processing.update(codes)
+            return [(code, self.store.get(code)) for code in codes]
+
+    def release(self, codes: list):
+        """
+        Returns taken but not processed States back to unprocessed,
+        States which were already processed are ignored.
+
+        :param codes: codes of the States
+        """
+        with self.condition:
+            codes = [code for code in codes if code in self.processing]
+            self.unprocessed.extend(codes)
+            self.processing.difference_update(codes)
+            self.size -= len(codes)
+            self.active -= len(codes)
+            self.update_finished()
+
+    def done(self, source: int, edges: set):
+        """
+        Merges outgoing Edges of processed State to the TS as encoded Edges.
+        Target States which were not seen yet are added to unprocessed.
+
+        :param source: code of processed State
+        :param edges: outgoing Edges
+        """
+        with self.condition:
+            for edge in edges:
+                target, new = self.store.add(edge.target)
+                if new:
+                    self.unprocessed.append(target)
+                encoded = Edge(source, target, edge.probability, True)
+                self.ts.edges.add(encoded)
+                self.ts.matrix = None
+                if self.journal is not None:
+                    self.journal.append(encoded)
+            self.processing.discard(source)
+            self.active -= 1
+            self.update_finished()
+            self.condition.notify_all()
+
+    def finish(self):
+        """
+        Stores explored States to the TS, remaining unprocessed States are kept for later continuation.
+        """
+        if self.checkpoint:
+            self.save_checkpoint()
+        self.ts.states_encoding = self.store.to_encoding()
+        self.ts.store = self.store
+        self.ts.matrix = None
+        self.ts.processed = set()
+        self.ts.unprocessed = {self.store.get(code) for code in self.unprocessed}
+
+    def save_checkpoint(self):
+        """
+        Saves the generated part of the TS to the checkpoint, States being processed are saved as unprocessed.
+        """
+        with self.condition:
+            edges = self.journal if self.checkpoint.saved_states is not None else self.ts.edges
+            self.checkpoint.save(self.store, edges, self.unprocessed + sorted(self.processing))
+            self.journal = []
+            self.last_checkpoint = time.time()
+
+    def update_checkpoint(self):
+        """
+        Saves checkpoint if the checkpoint interval has elapsed since the last one.
+        """
+        if self.checkpoint and time.time() - self.last_checkpoint >= self.checkpoint_interval:
+            self.save_checkpoint()
+
+    def fail(self, code: int, error: Exception):
+        """
+        Records error of a worker, the State is returned to unprocessed and generating is stopped.
+
+        :param code: code of the State which could not be processed
+        :param error: raised exception
+        """
+        self.release([code])
+        with self.condition:
+            if self.error is None:
+                self.error = error
+        self.stop()
+
+    def stop(self):
+        """
+        Stops giving States to workers, generating finishes when the currently processed are done.
+        """
+        with self.condition:
+            self.stopped = True
+            self.update_finished()
+
+    def wait(self):
+        """
+        Waits until generating is finished, time limit and checkpoints are enforced here.
+        """
+        with self.condition:
+            while not self.finished:
+                self.update_checkpoint()
+                remaining = self.deadline - time.time()
+                if self.checkpoint:
+                    remaining = min(remaining, self.last_checkpoint + self.checkpoint_interval - time.time())
+                if self.deadline <= time.time() and not self.stopped:
+                    self.stopped = True
+                    self.update_finished()
+                elif remaining > 0:
+                    self.condition.wait(min(remaining, threading.TIMEOUT_MAX))
+                else:
+                    self.condition.wait()
 
 
 class TSworker(threading.Thread):
-    def __init__(self, ts, model):
+    def __init__(self, scheduler: Scheduler, model):
         super(TSworker, self).__init__()
-        self.ts = ts  # resulting transition system
+        self.scheduler = scheduler
         self.model = model
 
-        self.stop_request = threading.Event()
-        self.work = threading.Event()  # to control whether the Worker is supposed to work
-
     def run(self):
         """
-        Method takes a state from pool of states to be processed and:
-        1. iteratively applies all reactions on it
-        2. checks whether newly created state (if any) was already processed (present in self.ts.states_encoding)
-           2.1 if not, it is added to self.states_to_process
-        3. creates Edge from the source state to created one (since ts.edges is a set, we don't care about its presence)
-        4. all outgoing Edges from the state are normalised to probability
+        Method takes a state from the scheduler to be processed and:
+        1. computes all outgoing (normalised) Edges from the state using the model
+        2. gives the Edges back to the scheduler, which adds them to the TS and
+           adds their target states to unprocessed (if they were not processed yet)
+
+        If computing of Edges fails, the error is passed to the scheduler and generating is stopped.
         """
-        while not self.stop_request.isSet():
-            self.work.wait()
+        while True:
+            code, state = self.scheduler.get()
+            if state is None:
+                return
             try:
-                state = self.ts.unprocessed.pop()
-                self.ts.processed.add(state)
-                unique_states = dict()
-
-                # special "hell" state
-                if state.is_inf:
-                    self.ts.edges.add(Edge(state, state, 1))
-                else:
-                    for reaction in self.model.vector_reactions:
-                        new_state, rate = reaction.apply(state, self.model.bound)
-                        if new_state and rate:
-                            if new_state not in self.ts.processed:
-                                self.ts.unprocessed.add(new_state)
-
-                            # multiple arrows between two states are not allowed
-                            if new_state in unique_states:
-                                unique_states[new_state].add_rate(rate)
-                            else:
-                                edge = Edge(state, new_state, rate)
-                                unique_states[new_state] = edge
-
-                    edges = set(unique_states.values())
-
-                    # normalise
-                    factor = sum(list(map(lambda edge: edge.probability, edges)))
-                    if edges:
-                        for edge in edges:
-                            edge.normalise(factor)
-                            self.ts.edges.add(edge)
-                    else:
-                        self.ts.edges.add(Edge(state, state, 1))
-
-            except KeyError:
-                self.work.clear()
-
-    def join(self, timeout=None):
-        self.work.set()
-        self.stop_request.set()
+                edges = self.model.compute_edges(state)
+            except Exception as error:
+                self.scheduler.fail(code, error)
+                return
+            self.scheduler.done(code, edges)
@@ -0,0 +1,120 @@
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from TS.Edge import Edge
+
+
+class TransitionMatrix:
+    def __init__(self, codes: np.array, indptr: np.array, targets: np.array, probabilities: list):
+        """
+        Immutable compressed sparse row (CSR) representation of encoded Edges of TransitionSystem.
+
+        Rows correspond to sorted codes of States, outgoing Edges of the i-th State are on positions
+        indptr[i]:indptr[i + 1] of targets (codes of target States) and probabilities, sorted by targets.
+        Probabilities are kept as they are in Edges (floats or strings for parametric TS).
+
+        :param codes: sorted codes of States
+        :param indptr: CSR index of Edges
+        :param targets: codes of target States of Edges
+        :param probabilities: probabilities of Edges
+        """
+        self.codes = codes
+        self.indptr = indptr
+        self.targets = targets
+        self.probabilities = tuple(probabilities)
+        for array in [self.codes, self.indptr, self.targets]:
+            array.setflags(write=False)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __iter__(self):
+        """
+        Iterates over groups of Edges with the same source (sorted by sources and targets),
+        States without outgoing Edges are skipped.
+        """
+        for row in np.flatnonzero(np.diff(self.indptr)).tolist():
+            yield self.edges(row)
+
+    def edges(self, row: int) -> list:
+        """
+        :param row: index of State
+        :return: outgoing Edges of the State
+        """
+        start, end = int(self.indptr[row]), int(self.indptr[row + 1])
+        source = int(self.codes[row])
+        return [Edge(source, target, probability, True) for target, probability
+                in zip(self.targets[start:end].tolist(), self.probabilities[start:end])]
+
+    def rows(self, codes) -> np.array:
+        """
+        :param codes: codes of States
+        :return: indices of the States
+        """
+        return np.searchsorted(self.codes, codes)
+
+    def sources(self) -> np.array:
+        """
+        :return: codes of source States of Edges
+        """
+        return np.repeat(self.codes, np.diff(self.indptr))
+
+    def is_parametric(self) -> bool:
+        return any([isinstance(probability, str) for probability in self.probabilities])
+
+    def to_scipy(self) -> csr_matrix:
+        """
+        Creates numeric transition matrix indexed by rows of States.
+
+        :return: SciPy CSR matrix of probabilities
+        """
+        if self.is_parametric():
+            raise TypeError("Parametric transition system cannot be converted to numeric matrix.")
+        return csr_matrix((np.array(self.probabilities, dtype=float), self.rows(self.targets), self.indptr),
+                          shape=(len(self), len(self)))
+
+    def transient(self, initial: int, steps: int) -> np.array:
+        """
+        Computes probability distribution over States after given number of steps.
+
+        :param initial: code of initial State
+        :param steps: number of steps
+        :return: probabilities of States (indexed by rows)
+        """
+        matrix = self.to_scipy().transpose().tocsr()
+        distribution = np.zeros(len(self))
+        distribution[self.rows(initial)] = 1
+        for _ in range(steps):
+            distribution = matrix.dot(distribution)
+        return distribution
+
+
+def create_csr(codes: np.array, sources: np.array, targets: np.array) -> tuple:
+    """
+    Sorts Edges given by sources and targets to CSR order.
+
+    :param codes: sorted codes of States (all sources have to be present)
+    :param sources: codes of source States of Edges
+    :param targets: codes of target States of Edges
+    :return: permutation of Edges to CSR order and CSR index
+    """
+    order = np.lexsort((targets, sources))
+    rows = np.searchsorted(codes, sources[order])
+    indptr = np.concatenate([[0], np.cumsum(np.bincount(rows, minlength=len(codes)))]).astype(np.int64)
+    return order, indptr
+
+
+def transition_matrix_from_edges(edges, codes=()) -> TransitionMatrix:
+    """
+    Creates TransitionMatrix from encoded Edges.
+
+    :param edges: encoded Edges
+    :param codes: codes of States (States occurring in Edges are added)
+    :return: TransitionMatrix
+    """
+    edges = list(edges)
+    sources = np.array([edge.source for edge in edges], dtype=np.int64)
+    targets = np.array([edge.target for edge in edges], dtype=np.int64)
+    codes = np.unique(np.concatenate([np.array(list(codes), dtype=np.int64), sources, targets]))
+    order, indptr = create_csr(codes, sources, targets)
+    return TransitionMatrix(codes, indptr, targets[order], [edges[i].probability for i in order.tolist()])
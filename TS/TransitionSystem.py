@@ -1,10 +1,13 @@
-import json
 import numpy as np
-from itertools import groupby
 from sortedcontainers import SortedList
 
+from TS.BinaryTS import create_binary_TS
 from TS.Edge import Edge
+from TS.JSONWriter import JSONWriter
 from TS.State import State
+from TS.TransitionMatrix import TransitionMatrix, transition_matrix_from_edges
+
+STORM_CHUNK = 2 ** 16  # number of Edges written at once to explicit Storm file
 
 
 class TransitionSystem:
@@ -13,6 +16,8 @@ class TransitionSystem:
         self.edges = set()  # Edge objects: (int from, int to, probability), can be used for explicit Storm format
         self.ordering = ordering  # used to decode State to actual agents
         self.init = int
+        self.store = None  # compact StateStore consistent with states_encoding (if available)
+        self.matrix = None  # TransitionMatrix of edges (built on demand, reset whenever edges or encoding change)
 
         # for TS generating
         self.unprocessed = set()
@@ -28,14 +33,7 @@ class TransitionSystem:
         """
         Used to iterate over equivalence classes (given by source) of sorted edges.
         """
-        self.index = 0
-        edges = sorted(self.edges)
-        self.data = groupby(edges, key=lambda edge: edge.source)
-        return self
-
-    def __next__(self):
-        new = next(self.data)
-        return list(new[-1])
+        return iter(self.transition_matrix())
 
     def __eq__(self, other: 'TransitionSystem'):
         """
@@ -71,10 +69,12 @@ class TransitionSystem:
         for state in self.processed | self.unprocessed:
             if state not in self.states_encoding:
                 self.states_encoding[state] = len(self.states_encoding) + 1
+                self.store = None
 
         self.init = self.states_encoding[init]
         self.processed = set()
         self.encode_edges()
+        self.matrix = None
 
     def encode_edges(self):
         """
@@ -83,6 +83,17 @@ class TransitionSystem:
         for edge in self.edges:
             edge.encode(self.states_encoding)
 
+    def transition_matrix(self) -> TransitionMatrix:
+        """
+        Creates CSR representation of encoded edges (see TransitionMatrix).
+        It is built only once and reused until it is reset (by setting matrix to None).
+
+        :return: TransitionMatrix of edges
+        """
+        if self.matrix is None:
+            self.matrix = transition_matrix_from_edges(self.edges, self.states_encoding.values())
+        return self.matrix
+
     def create_decoding(self) -> dict:
         """
         Swaps encoding dictionary for decoding purposes.
@@ -100,25 +111,48 @@ class TransitionSystem:
         """
         # swap dictionary
         old_encoding = self.create_decoding()
+        self.store = None
+        self.matrix = None
         self.edges = set(map(lambda edge: edge.recode(old_encoding, new_encoding), self.edges))
 
     def save_to_json(self, output_file: str):
         """
         Save current TS as a JSON file.
+        Nodes and edges are written one by one (see JSONWriter).
 
         :param output_file: given file to write to
         """
-        nodes = {value: str(key) for key, value in self.states_encoding.items()}
-        unique = list(map(str, self.ordering))
-        edges = [edge.to_dict() for edge in self.edges]
-
-        data = {'nodes': nodes, 'edges': edges, 'ordering': unique, "initial": self.init}
-
-        if self.unprocessed:
-            data['unprocessed'] = [str(state) for state in self.unprocessed]
+        with JSONWriter(output_file) as writer:
+            writer.start('nodes')
+            for state, code in self.states_encoding.items():
+                writer.item(str(state), code)
+            writer.end()
+
+            writer.start('edges', array=True)
+            for edge in self.edges:
+                writer.item(edge.to_dict())
+            writer.end()
+
+            writer.item(list(map(str, self.ordering)), 'ordering')
+            writer.item(self.init, 'initial')
+
+            if self.unprocessed:
+                writer.start('unprocessed', array=True)
+                for state in self.unprocessed:
+                    writer.item(str(state))
+                writer.end()
+
+    def save_to_binary(self, output_file: str):
+        """
+        Save current TS as a binary file (see BinaryTS), it can be loaded by load_TS.
 
-        with open(output_file, 'w') as json_file:
-            json.dump(data, json_file, indent=4)
+        :param output_file: given file to write to
+        """
+        nodes = {code: state.sequence for state, code in self.states_encoding.items()}
+        edges = ([edge.source for edge in self.edges], [edge.target for edge in self.edges],
+                 [edge.probability for edge in self.edges])
+        unprocessed = [self.states_encoding[state] for state in self.unprocessed]
+        create_binary_TS(list(map(str, self.ordering)), self.init, nodes, edges, unprocessed).save(output_file)
 
     def change_hell(self, bound):
         """
@@ -129,6 +163,8 @@ class TransitionSystem:
 
         :param bound: given allowed bound
         """
+        self.store = None
+        self.matrix = None
         for key, value in self.states_encoding.items():
             if key.is_inf:
                 del self.states_encoding[key]
@@ -145,14 +181,34 @@ class TransitionSystem:
         :param labels_file: file for labels
         :param labels: labels representing atomic propositions assigned to states
         """
-        trans_file = open(transitions_file, "w+")
-        trans_file.write("dtmc\n")
+        self.save_transitions_to_STORM(transitions_file)
+        self.save_labels_to_STORM(labels_file, state_labels, AP_labels)
 
-        for edge in sorted(self.edges):
-            trans_file.write(str(edge) + "\n")
-        trans_file.close()
+    def save_transitions_to_STORM(self, transitions_file: str):
+        """
+        Save transitions of the TransitionSystem as explicit Storm file.
+        Edges are written sorted in chunks directly from TransitionMatrix.
 
-        label_file = open(labels_file, "w+")
+        :param transitions_file: file for transitions
+        """
+        matrix = self.transition_matrix()
+        with open(transitions_file, "w") as trans_file:
+            trans_file.write("dtmc\n")
+            sources, targets = matrix.sources().tolist(), matrix.targets.tolist()
+            for start in range(0, len(targets), STORM_CHUNK):
+                end = start + STORM_CHUNK
+                trans_file.write("".join(["{} {} {}\n".format(*edge) for edge in
+                                          zip(sources[start:end], targets[start:end],
+                                              matrix.probabilities[start:end])]))
+
+    def save_labels_to_STORM(self, labels_file: str, state_labels: dict, AP_labels):
+        """
+        Save labels of states as explicit Storm file.
+
+        :param labels_file: file for labels
+        :param labels: labels representing atomic propositions assigned to states
+        """
+        label_file = open(labels_file, "w")
         unique_labels = ['init'] + list(map(str, AP_labels.values()))
         label_file.write("#DECLARATION\n" + " ".join(unique_labels) + "\n#END\n")
 
@@ -160,6 +216,35 @@ class TransitionSystem:
                                     for state in sorted(state_labels)]))
         label_file.close()
 
+    def save_AP_labels_to_STORM(self, labels_file: str, codes: np.array, satisfied: dict):
+        """
+        Save labels of states as explicit Storm file directly from vectors of states satisfying them.
+
+        :param labels_file: file for labels
+        :param codes: codes of states
+        :param satisfied: dictionary label -> boolean vector of states (aligned with codes) having it
+        """
+        labels = ['init'] + list(satisfied)
+        table = np.column_stack([codes == self.init] + list(satisfied.values())).reshape(len(codes), len(labels))
+        rows = np.flatnonzero(table.any(axis=1))
+        rows = rows[np.argsort(codes[rows], kind="stable")]
+
+        with open(labels_file, "w") as label_file:
+            label_file.write("#DECLARATION\n" + " ".join(labels) + "\n#END\n")
+            label_file.write("\n".join([str(code) + " " + " ".join([labels[i] for i in np.flatnonzero(row)])
+                                        for code, row in zip(codes[rows].tolist(), table[rows])]))
+
+    def states_matrix(self) -> tuple:
+        """
+        Creates matrix of all States (one State per row).
+
+        :return: codes of States and the matrix
+        """
+        codes = np.array(list(self.states_encoding.values()), dtype=np.int64)
+        if not self.states_encoding:
+            return codes, np.zeros((0, len(self.ordering)))
+        return codes, np.array([state.sequence for state in self.states_encoding], dtype=float)
+
     def save_to_prism(self, output_file: str, bound: int, params: set, prism_formulas: list):
         """
         Save the TransitionSystem as a PRISM file (parameters present).
@@ -170,7 +255,7 @@ class TransitionSystem:
         :param prism_formulas: definition of abstract Complexes
         """
 
-        prism_file = open(output_file, "w+")
+        prism_file = open(output_file, "w")
         prism_file.write("dtmc\n")
 
         # declare parameters
@@ -224,12 +309,6 @@ def create_indices(ordering_1: SortedList, ordering_2: SortedList):
     :return: np.array of indices
     """
     if set(ordering_1) == set(ordering_2):
-        result = []
-        for i_1 in range(len(ordering_1)):
-            for i_2 in range(len(ordering_2)):
-                if ordering_1[i_1] == ordering_2[i_2]:
-                    result.append(i_2)
-                    break
-        return True, np.array(result)
+        return True, np.array([ordering_2.index(agent) for agent in ordering_1])
     else:
         return False, None
@@ -1,44 +1,45 @@
+import copy
+import math
 import multiprocessing
+import queue
 
 import time
-from scipy.integrate import odeint
+import sympy
+from scipy.integrate import odeint, solve_ivp
 import numpy as np
 import pandas as pd
 import random
 from sortedcontainers import SortedList
 
+from Errors.InvalidInputError import InvalidInputError
+from TS.Checkpoint import Checkpoint
+from TS.Edge import Edge
 from TS.State import State
-from TS.TSworker import TSworker
+from TS.StochasticSimulator import StochasticSimulator, RunningStatistics, run_seeds
+from TS.TSprocess import TSprocess, owner
+from TS.TSworker import TSworker, Scheduler, CHECKPOINT_INTERVAL
 from TS.TransitionSystem import TransitionSystem
 
 AVOGADRO = 6.022 * 10 ** 23
+SOLVERS = ("odeint", "LSODA", "BDF", "Radau", "RK45", "RK23", "DOP853")
+IMPLICIT_SOLVERS = ("LSODA", "BDF", "Radau")
+ENGINES = ("workers", "batch")
+BATCH_SIZE = 1024
+BATCH_ENTRIES = 2 ** 24  # maximal size of (states x reactions x agents) arrays used by batch engine
 
 
 def fake_expovariate(rate):
     return 0.1
 
 
-def handle_number_of_threads(number, workers):
-    """
-    Estimated number of required workers for current volume of unprocessed states.
-
-    :param number: volume of unprocessed states
-    :param workers: available workers
-    """
-    number = np.math.ceil((1 / 50.0) * number - 1 / 2.)
-    for (i, worker) in enumerate(workers):
-        if i <= number:
-            worker.work.set()
-        else:
-            worker.work.clear()
-
-
 class VectorModel:
     def __init__(self, vector_reactions: set, init: State, ordering: SortedList, bound: int):
         self.vector_reactions = vector_reactions
         self.init = init
         self.ordering = ordering
         self.bound = bound if bound else self.compute_bound()
+        self.enablement = None
+        self.batch_kernel = None
 
     def __eq__(self, other: 'VectorModel') -> bool:
         return self.vector_reactions == other.vector_reactions and \
@@ -63,45 +64,116 @@ class VectorModel:
         reation_max = max(map(lambda r: max(max(r.source.sequence), max(r.target.sequence)), self.vector_reactions))
         return max(reation_max, max(self.init.sequence))
 
-    def deterministic_simulation(self, max_time: float, volume: float, step: float = 0.01) -> pd.DataFrame:
+    def create_ODEs(self) -> tuple:
+        """
+        Translates model to system of ODEs in symbolic form.
+        Each reaction contributes to the derivative of an agent by its rate multiplied
+        by the change of the agent (target minus source).
+
+        Rates of reactions are kept in vector form (they are translated on their copies).
+
+        :return: list of Sympy symbols (y_i for i-th agent) and list of corresponding right-hand sides
+        """
+        symbols = sympy.symbols("y_0:{}".format(len(self.init)))
+        terms = [[] for _ in range(len(self.init))]
+        for reaction in self.vector_reactions:
+            rate = copy.deepcopy(reaction.rate)
+            rate.to_symbolic()
+            expression = sympy.sympify(str(rate), locals={"y": symbols})
+            for i in np.flatnonzero(reaction.target.sequence - reaction.source.sequence):
+                terms[i].append(int(reaction.target.sequence[i] - reaction.source.sequence[i]) * expression)
+        return list(symbols), [sympy.Add(*summands) for summands in terms]
+
+    def create_rhs(self):
+        """
+        Creates right-hand side of the ODEs as a function of state vector.
+        Rates are compiled to Python functions and combined using matrix of changes
+        of agents (one row per reaction).
+
+        :return: function computing array of derivatives
+        """
+        reactions = list(self.vector_reactions)
+        changes = np.array([reaction.target.sequence - reaction.source.sequence
+                            for reaction in reactions], dtype=float).reshape(-1, len(self.init))
+        functions = [reaction.rate.compile() for reaction in reactions]
+        if not all(functions):
+            raise InvalidInputError("Provided model is parametrised - simulation cannot be executed.")
+
+        def rhs(y):
+            values = y.tolist()
+            return np.array([function(values) for function in functions], dtype=float).dot(changes)
+        return rhs
+
+    def create_jacobian(self):
         """
-        Translates model to ODE and runs odeint solver for given max_time.
+        Creates analytic Jacobian of the ODEs as a function of state vector.
+        Only non-zero entries (derivatives by symbols occurring in particular ODE) are computed.
+
+        :return: function computing 2D array of partial derivatives
+        """
+        symbols, ODEs = self.create_ODEs()
+        rows, columns, entries = [], [], []
+        for i, ODE in enumerate(ODEs):
+            for j, symbol in enumerate(symbols):
+                if symbol in ODE.free_symbols:
+                    rows.append(i)
+                    columns.append(j)
+                    entries.append(ODE.diff(symbol))
+        compiled = sympy.lambdify([symbols], entries, "numpy")
+
+        def jacobian(y):
+            result = np.zeros((len(symbols), len(symbols)))
+            result[rows, columns] = compiled(y)
+            return result
+        return jacobian
+
+    def deterministic_simulation(self, max_time: float, volume: float, step: float = 0.01,
+                                 solver: str = "odeint") -> pd.DataFrame:
+        """
+        Translates model to ODE and solves it for given max_time.
+
+        Right-hand side is created only once from compiled rates. For implicit methods of solve_ivp
+        (Radau, BDF or LSODA, suitable for stiff models), analytic Jacobian is derived symbolically
+        when the solver needs it for the first time. The odeint solver keeps its own Jacobian
+        approximation, so its results are not changed.
 
         :param max_time: end time of simulation
         :param volume: volume of the system
         :param step: distance between time points
+        :param solver: "odeint" or one of methods of solve_ivp (see SOLVERS)
         :return: simulated data
         """
+        if solver not in SOLVERS:
+            raise InvalidInputError("Unknown solver {}, use one of {}.".format(solver, ", ".join(SOLVERS)))
 
-        def fun(y, t):
-            """
-            Function used in odeint solver. See its docs for more info.
-            It uses global variable ODEs in local scope of the method.
+        rhs = self.create_rhs()
+        jacobian = None
 
-            :param y: data points
-            :param t: time points
-            """
-            return list(map(eval, ODEs))
+        def dfun(y):
+            nonlocal jacobian
+            if jacobian is None:
+                jacobian = self.create_jacobian()
+            return jacobian(y)
 
-        ODEs = [""] * len(self.init)
-        for reaction in self.vector_reactions:
-            reaction.to_symbolic()
-            for i in range(len(self.init)):
-                # negative effect
-                if reaction.source.sequence[i] > 0:
-                    ODEs[i] += " - {}*({})".format(reaction.source.sequence[i], reaction.rate)
-                    # positive effect
-                if reaction.target.sequence[i] > 0:
-                    ODEs[i] += " + {}*({})".format(reaction.target.sequence[i], reaction.rate)
-        
         t = np.arange(0, max_time + step, step)
         y_0 = list(map(lambda x: x / (AVOGADRO * volume), self.init.sequence))
-        y = odeint(fun, y_0, t)
+        if solver == "odeint":
+            y = odeint(lambda y, t: rhs(y), y_0, t)
+        else:
+            options = dict()
+            if solver in IMPLICIT_SOLVERS:
+                options["jac"] = lambda t, y: dfun(y)
+            solution = solve_ivp(lambda t, y: rhs(y), (0, t[-1]), y_0,
+                                 method=solver, t_eval=t, **options)
+            if not solution.success:
+                raise RuntimeError(solution.message)
+            y = solution.y.T
         df = pd.DataFrame(data=y, columns=list(map(str, self.ordering)))
         df.insert(0, "times", t)
         return df
 
-    def stochastic_simulation(self, max_time: float, runs: int, testing: bool = False) -> pd.DataFrame:
+    def stochastic_simulation(self, max_time: float, runs: int, testing: bool = False,
+                              method: str = "direct") -> pd.DataFrame:
         """
         Gillespie algorithm implementation.
 
@@ -109,8 +181,14 @@ class VectorModel:
         of all possible rates in particular State.
         Then such reaction is applied and next time is computed using Poisson distribution (random.expovariate).
 
+        Single runs are computed by StochasticSimulator on precomputed stoichiometry matrices.
+        Alternatively, Next Reaction Method can be used, which updates only rates of reactions
+        affected by the applied one (suitable for large number of reactions), or approximate
+        tau-leaping, which applies many reactions at once (suitable for large numbers of agents).
+
         :param max_time: time when simulation ends
         :param runs: how many time the process should be repeated (then average behaviour is taken)
+        :param method: simulation method ("direct", "next_reaction" or "tau_leaping")
         :return: simulated data
         """
         header = list(map(str, self.ordering))
@@ -122,32 +200,13 @@ class VectorModel:
             random.seed(10)
             time_step = fake_expovariate
 
+        simulator = StochasticSimulator(self.vector_reactions, self.init)
         for run in range(runs):
-            df = pd.DataFrame(columns=header, dtype=float)
-            solution = self.init
-            time = 0.0
-            while time < max_time:
-                # add to data
-                df.loc[time] = list(solution.sequence)
-
-                applied_reactions = pd.DataFrame(data=[reaction.apply(solution, np.math.inf)
-                                                       for reaction in self.vector_reactions],
-                                                 columns=["state", "rate"])
-                applied_reactions = applied_reactions.dropna()
-                if not applied_reactions.empty:
-                    rates_sum = applied_reactions.sum()["rate"]
-                    sorted_applied = applied_reactions.sort_values(by=["rate"])
-                    sorted_applied["cumsum"] = sorted_applied.cumsum(axis=0)["rate"]
-
-                    # pick random reaction based on rates
-                    rand_number = rates_sum * random.random()
-                    sorted_applied.drop(sorted_applied[sorted_applied["cumsum"] < rand_number].index, inplace=True)
-                    solution = sorted_applied.iloc[0]["state"]
-                else:
-                    rates_sum = random.uniform(0.5, 0.9)
-
-                # update time
-                time += time_step(rates_sum)
+            if method == "direct":
+                times, states = simulator.direct(max_time, time_step)
+            else:
+                times, states = simulator.run(max_time, method)
+            df = pd.DataFrame(data=states, index=times, columns=header, dtype=float)
 
             if run != 0:
                 # union of the indexes
@@ -169,48 +228,428 @@ class VectorModel:
         result_df.reset_index(inplace=True)
         return result_df
 
+    def stochastic_simulation_parallel(self, max_time: float, runs: int, step: float = 0.01,
+                                       processes: int = None, seed: int = None,
+                                       variance: bool = False, method: str = "direct") -> pd.DataFrame:
+        """
+        Independent Gillespie runs computed in a pool of processes.
+
+        Each run has its own random stream given by its seed (derived from the given seed), so the
+        result does not depend (up to rounding) on number of processes. Runs are sampled on a fixed time grid with
+        given step and aggregated on the fly using running mean and variance, therefore memory
+        does not depend on number of runs.
+
+        Value in a time point is the state reached in that time (no interpolation is done).
+
+        :param max_time: time when simulation ends
+        :param runs: number of runs
+        :param step: distance between time points
+        :param processes: number of processes (all available cores by default)
+        :param seed: seed for reproducibility
+        :param variance: include also variance of particular agents
+        :param method: simulation method ("direct", "next_reaction" or "tau_leaping")
+        :return: simulated data (average behaviour)
+        """
+        simulator = StochasticSimulator(self.vector_reactions, self.init)
+        grid = np.arange(0, max_time + step, step)
+        seeds = run_seeds(seed, runs)
+        processes = min(processes if processes else multiprocessing.cpu_count(), runs)
+
+        if processes > 1:
+            chunks = [seeds[i::processes] for i in range(processes)]
+            statistics = RunningStatistics((len(grid), len(self.init)))
+            with multiprocessing.Pool(processes) as pool:
+                for partial in pool.starmap(simulator.simulate_runs, [(max_time, grid, chunk, method)
+                                                                      for chunk in chunks]):
+                    statistics.merge(partial)
+        else:
+            statistics = simulator.simulate_runs(max_time, grid, seeds, method)
+
+        header = list(map(str, self.ordering))
+        df = pd.DataFrame(data=statistics.mean, columns=header)
+        if variance:
+            df = pd.concat([df, pd.DataFrame(data=statistics.variance,
+                                             columns=[name + " variance" for name in header])], axis=1)
+        df.insert(0, "times", grid)
+        return df
+
+    def create_enablement_index(self) -> tuple:
+        """
+        Creates index used to find enabled reactions.
+
+        Reactions are fixed in a list and their sources form a matrix of reactants (one row per reaction).
+        Each agent is mapped to reactions consuming it (i.e. having non-zero value on its position
+        in the source), reactions without reactants are enabled in any State.
+
+        :return: list of VectorReactions, matrix of reactants, list of positions of reactants for each
+            reaction, dict of (agent position, reaction indices), and indices of reactions without reactants
+        """
+        reactions = list(self.vector_reactions)
+        reactants = np.array([reaction.source.sequence for reaction in reactions]).reshape(-1, len(self.init))
+        positions = [np.flatnonzero(row) for row in reactants]
+        consumers = dict()
+        for index, reactant_positions in enumerate(positions):
+            for position in reactant_positions.tolist():
+                consumers.setdefault(position, []).append(index)
+        consumers = {position: np.array(indices) for position, indices in consumers.items()}
+        spontaneous = np.array([index for index, reactant_positions in enumerate(positions)
+                                if not len(reactant_positions)], dtype=int)
+        return reactions, reactants, positions, consumers, spontaneous
+
+    def candidate_reactions(self, state: State):
+        """
+        Gives reactions which are enabled in the given State.
+
+        Only reactions consuming some of present agents (and reactions without reactants) are considered,
+        they are checked at once using matrix of reactants (see create_enablement_index).
+
+        :param state: given State
+        :return: iterable of VectorReactions
+        """
+        if self.enablement is None:
+            self.enablement = self.create_enablement_index()
+        reactions, reactants, _, consumers, spontaneous = self.enablement
+
+        indices = [consumers[position] for position in np.flatnonzero(state.sequence).tolist()
+                   if position in consumers]
+        indices = np.unique(np.concatenate(indices + [spontaneous])).astype(int)
+        enabled = indices[(reactants[indices] <= state.sequence).all(axis=1)]
+        return [reactions[index] for index in enabled.tolist()]
+
+    def compute_edges(self, state: State) -> set:
+        """
+        Applies all reactions on the given State and creates outgoing Edges.
+
+        Multiple arrows between two states are not allowed, their rates are joined instead.
+        Rates are summed independently of the order of reactions (see sum_rates).
+        Finally, rates are normalised to probabilities. If there is no outgoing Edge
+        (or the State is special "hell" state), a self-loop is created.
+
+        :param state: given State
+        :return: set of outgoing Edges
+        """
+        # special "hell" state
+        if state.is_inf:
+            return {Edge(state, state, 1)}
+
+        unique_states = dict()
+        for reaction in self.candidate_reactions(state):
+            new_state, rate = reaction.apply(state, self.bound)
+            if new_state and rate:
+                unique_states.setdefault(new_state, []).append(rate)
+        return create_edges(state, unique_states)
+
+    def create_batch_kernel(self):
+        """
+        Prepares data used to expand a block of States at once (see compute_edges_batch).
+        It is possible only if all rates can be compiled to numeric functions (no undefined parameters).
+
+        :return: list of VectorReactions, matrix of reactants, matrix of changes (target minus source)
+            and compiled rates, or None if the model cannot be expanded in batches
+        """
+        if self.enablement is None:
+            self.enablement = self.create_enablement_index()
+        reactions, reactants, _, _, _ = self.enablement
+
+        functions = []
+        for reaction in reactions:
+            if reaction.rate is None:
+                return None
+            if reaction.rate.compiled is None:
+                reaction.rate.compiled = reaction.rate.compile()
+            if not reaction.rate.compiled:
+                return None
+            functions.append(reaction.rate.compiled)
+
+        targets = np.array([reaction.target.sequence for reaction in reactions]).reshape(-1, len(self.init))
+        return reactions, reactants, targets - reactants, functions
+
+    def compute_edges_batch(self, states: list) -> list:
+        """
+        Computes outgoing Edges of a block of States at once.
+
+        States are stacked to 2D array (one row per State), enabled reactions are found by a single
+        comparison with matrix of reactants, successors are created by a single addition of changes
+        and those exceeding the bound are mapped to the "hell" state. Rates are evaluated by compiled
+        functions on columns of the block (one call per reaction).
+        Resulting Edges are the same as given by compute_edges.
+
+        If the model cannot be expanded in batches (see create_batch_kernel), States are expanded one by one.
+
+        :param states: list of States
+        :return: list of sets of outgoing Edges (in the same order as States)
+        """
+        if self.batch_kernel is None:
+            self.batch_kernel = self.create_batch_kernel() or False
+        if not self.batch_kernel:
+            return [self.compute_edges(state) for state in states]
+        reactions, reactants, changes, functions = self.batch_kernel
+
+        result = [{Edge(state, state, 1)} if state.is_inf else None for state in states]
+        regular = [state for state in states if not state.is_inf]
+        block = np.array([state.sequence for state in regular]).reshape(-1, len(self.init))
+
+        enabled = (block[:, np.newaxis, :] >= reactants[np.newaxis, :, :]).all(axis=2)
+        rows, columns = np.nonzero(enabled)
+        successors = block[rows] + changes[columns]
+        overflow = (successors > self.bound).any(axis=1)
+
+        rates = np.zeros(enabled.shape)
+        values = block.T.astype(float)
+        with np.errstate(all="ignore"):
+            for column in np.flatnonzero(enabled.any(axis=0)).tolist():
+                rates[:, column] = functions[column](values)
+        rates = rates[rows, columns]
+        valid = np.flatnonzero(np.isfinite(rates) & (rates != 0))
+
+        hell = State(np.array([np.inf] * len(self.init)))
+        unique_states = [dict() for _ in regular]
+        for i, row, exceeded, rate in zip(valid.tolist(), rows[valid].tolist(), overflow[valid].tolist(),
+                                          rates[valid].tolist()):
+            new_state = hell if exceeded else State(successors[i])
+            unique_states[row].setdefault(new_state, []).append(rate)
+
+        edges = iter([create_edges(state, targets) for state, targets in zip(regular, unique_states)])
+        return [next(edges) if item is None else item for item in result]
+
     def generate_transition_system(self, ts: TransitionSystem = None,
-                                   max_time: float = np.inf, max_size: float = np.inf) -> TransitionSystem:
+                                   max_time: float = np.inf, max_size: float = np.inf,
+                                   processes: int = None, engine: str = "workers",
+                                   checkpoint: str = None,
+                                   checkpoint_interval: float = CHECKPOINT_INTERVAL) -> TransitionSystem:
         """
         Parallel implementation of Transition system generating.
 
-        The workload is distributed to Workers which take unprocessed States from the pool and process them.
+        The workload is distributed to Workers which take unprocessed States from the Scheduler and process them.
 
         If the given bound should be exceeded, a special infinite state is introduced.
 
-        The algorithm dynamically changes number of active workers using thread events. This is done according to the
-        current volume of unprocessed states.
+        Workers wait on the Scheduler when there is no work, generating ends as soon as there are no unprocessed
+        States and all Workers are idle, or when some of the limits is reached.
+
+        If number of processes is given, the state space is explored by separate processes instead
+        (see generate_transition_system_distributed). The "batch" engine expands blocks of States
+        using matrix operations (see generate_transition_system_batch).
 
+        If checkpoint file is given, the generated part of TS is periodically saved to it
+        (except for distributed generating), generating can be resumed from the TS loaded
+        by load_TS_from_checkpoint.
+
+        :param ts: partially generated TransitionSystem to be continued
+        :param max_time: time limit for generating (in seconds)
+        :param max_size: limit on number of states
+        :param processes: number of processes used for exploration
+        :param engine: "workers" or "batch" (see ENGINES)
+        :param checkpoint: file to store checkpoints
+        :param checkpoint_interval: time between checkpoints (in seconds)
         :return: generated Transition system
         """
+        if engine not in ENGINES:
+            raise InvalidInputError("Unknown engine {}, use one of {}.".format(engine, ", ".join(ENGINES)))
+
         if not ts:
             ts = TransitionSystem(self.ordering)
             ts.unprocessed = {self.init}
 
-        workers = [TSworker(ts, self) for _ in range(multiprocessing.cpu_count())]
+        if processes:
+            return self.generate_transition_system_distributed(ts, max_time, max_size, processes)
+
+        scheduler = Scheduler(ts, self.bound, max_time, max_size,
+                              Checkpoint(checkpoint, self.ordering, self.init) if checkpoint else None,
+                              checkpoint_interval)
+        if engine == "batch":
+            return self.generate_transition_system_batch(scheduler)
+
+        workers = [TSworker(scheduler, self) for _ in range(multiprocessing.cpu_count())]
         for worker in workers:
             worker.start()
 
-        workers[0].work.set()
-        start_time = time.time()
-
         try:
-            while any([worker.work.is_set() for worker in workers]) \
-                    and time.time() - start_time < max_time \
-                    and len(ts.processed) + len(ts.states_encoding) < max_size:
-                handle_number_of_threads(len(ts.unprocessed), workers)
-                time.sleep(1)
+            scheduler.wait()
         # probably should be changed to a different exceptions for the case when the execution is stopped on Galaxy
         # then also the ts should be exported to appropriate file
         except (KeyboardInterrupt, EOFError) as e:
-            pass
+            scheduler.stop()
+            scheduler.wait()
 
         for worker in workers:
             worker.join()
 
-        while any([worker.is_alive() for worker in workers]):
-            time.sleep(1)
+        if scheduler.error is not None:
+            raise scheduler.error
+
+        scheduler.finish()
 
         ts.encode(self.init)
 
         return ts
+
+    def generate_transition_system_batch(self, scheduler: Scheduler,
+                                         block_size: int = BATCH_SIZE) -> TransitionSystem:
+        """
+        Transition system generating by blocks of States.
+
+        Unprocessed States are taken from the Scheduler in blocks which are expanded at once
+        (see compute_edges_batch). Size of the blocks is limited to keep the intermediate
+        arrays reasonably small. If generating is interrupted, States of the current block which
+        were not finished are returned to the Scheduler, so they are kept as unprocessed.
+
+        :param scheduler: Scheduler of the TransitionSystem being generated
+        :param block_size: maximal number of States expanded at once
+        :return: generated Transition system
+        """
+        entries = max(len(self.vector_reactions), 1) * max(len(self.init), 1)
+        block_size = max(min(block_size, BATCH_ENTRIES // entries), 1)
+
+        block = []
+        try:
+            while time.time() < scheduler.deadline:
+                block = scheduler.take(block_size)
+                if not block:
+                    break
+                edges = self.compute_edges_batch([state for _, state in block])
+                for (code, _), state_edges in zip(block, edges):
+                    scheduler.done(code, state_edges)
+                scheduler.update_checkpoint()
+        except (KeyboardInterrupt, EOFError) as e:
+            pass
+        finally:
+            scheduler.release([code for code, _ in block])
+
+        scheduler.finish()
+
+        scheduler.ts.encode(self.init)
+
+        return scheduler.ts
+
+    def generate_transition_system_distributed(self, ts: TransitionSystem, max_time: float, max_size: float,
+                                               processes: int) -> TransitionSystem:
+        """
+        Multi-core implementation of Transition system generating.
+
+        States are partitioned by their hash among TSprocesses, each of them owns its part of processed
+        and unprocessed States and Edges leading from them. The processes explore the state space in
+        synchronised rounds, in each round they expand their frontier and exchange discovered States
+        in batches. Generating ends when all frontiers are empty or given limits are exceeded.
+        The number of States expanded in a round is limited by the remaining size (see expansion_limits),
+        so max_size is not exceeded by a wide frontier.
+
+        :param ts: TransitionSystem with unprocessed States to start from
+        :param max_time: time limit for generating (in seconds)
+        :param max_size: limit on number of states
+        :param processes: number of processes
+        :return: generated Transition system
+        """
+        processed = [set() for _ in range(processes)]
+        unprocessed = [set() for _ in range(processes)]
+        for state in ts.processed:
+            processed[owner(state, processes)].add(state)
+        for state in ts.unprocessed:
+            unprocessed[owner(state, processes)].add(state)
+
+        inboxes = [multiprocessing.Queue() for _ in range(processes)]
+        commands = [multiprocessing.Queue() for _ in range(processes)]
+        reports = multiprocessing.Queue()
+        workers = [TSprocess(i, self, processed[i], unprocessed[i], inboxes, commands[i], reports)
+                   for i in range(processes)]
+        for worker in workers:
+            worker.start()
+
+        start_time = time.time()
+        frontiers = list(map(len, unprocessed))
+        size = len(ts.processed)
+
+        try:
+            while sum(frontiers) and time.time() - start_time < max_time and size + len(ts.states_encoding) < max_size:
+                limits = expansion_limits(frontiers, max_size - size - len(ts.states_encoding))
+                for command_queue, limit in zip(commands, limits):
+                    command_queue.put(("expand", limit))
+                reports_data = sorted(collect_reports(reports, workers))
+                size = sum(map(lambda report: report[1], reports_data))
+                frontiers = list(map(lambda report: report[2], reports_data))
+        except (KeyboardInterrupt, EOFError) as e:
+            pass
+
+        for command_queue in commands:
+            command_queue.put("stop")
+
+        ts.processed, ts.unprocessed = set(), set()
+        for index, processed_states, unprocessed_states, edges in collect_reports(reports, workers):
+            ts.processed |= processed_states
+            ts.unprocessed |= unprocessed_states
+            ts.edges |= edges
+        ts.matrix = None
+
+        for worker in workers:
+            worker.join()
+
+        ts.encode(self.init)
+
+        return ts
+
+
+def create_edges(state: State, unique_states: dict) -> set:
+    """
+    Creates normalised outgoing Edges of a State.
+
+    :param state: source State
+    :param unique_states: dict of (target State, list of rates of reactions leading to it)
+    :return: set of outgoing Edges (self-loop if there is no target)
+    """
+    edges = {Edge(state, new_state, sum_rates(rates)) for new_state, rates in unique_states.items()}
+    if not edges:
+        return {Edge(state, state, 1)}
+
+    # normalise
+    factor = sum_rates(list(map(lambda edge: edge.probability, edges)))
+    for edge in edges:
+        edge.normalise(factor)
+    return edges
+
+
+def sum_rates(rates: list):
+    """
+    Sums given rates. Numeric rates are summed exactly rounded, therefore the result
+    does not depend on the order of rates. Symbolic rates are summed as usual.
+
+    :param rates: list of rates
+    :return: sum of rates
+    """
+    try:
+        return math.fsum(rates)
+    except TypeError:
+        return sum(rates)
+
+
+def expansion_limits(frontiers: list, remaining: float) -> list:
+    """
+    Splits the remaining number of States which can be processed among processes,
+    the frontiers are taken in order until the remaining number is used up.
+
+    :param frontiers: sizes of frontiers of the processes
+    :param remaining: number of States which can be processed
+    :return: maximal number of States expanded by each process
+    """
+    limits = []
+    for frontier in frontiers:
+        limits.append(int(min(frontier, remaining)))
+        remaining -= limits[-1]
+    return limits
+
+
+def collect_reports(reports: multiprocessing.Queue, workers: list) -> list:
+    """
+    Collects one report from each of the workers.
+
+    :param reports: queue with reports
+    :param workers: running TSprocesses
+    :return: list of reports
+    """
+    data = []
+    while len(data) < len(workers):
+        try:
+            data.append(reports.get(timeout=1))
+        except queue.Empty:
+            if not all([worker.is_alive() for worker in workers]):
+                raise RuntimeError("Transition system generating process terminated unexpectedly.")
+    return data
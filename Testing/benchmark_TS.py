@@ -0,0 +1,62 @@
+import multiprocessing
+import sys
+import time
+
+from Parsing.ParseBCSL import Parser
+
+"""
+Scaling benchmark of Transition system generating.
+
+Generates TS of the models used in test_vector_model.py using the threaded
+generator and the distributed one with increasing number of processes.
+
+Run as `python3 -m Testing.benchmark_TS [max_processes]` in the main directory
+(by default, up to the number of cores but at least MIN_PROCESSES).
+"""
+
+MODEL = """
+    #! rules
+    => {} K(S{{u}},T{{i}})::cyt @ omega
+    K(S{{u}})::cyt => K(S{{p}})::cyt @ alpha*[K(S{{u}})::cyt]
+    K(S{{p}})::cyt + B{{a}}::cyt => K(S{{p}}).B{{a}}::cyt @ beta*[K(S{{p}})::cyt]*[B{{a}}::cyt]
+    B{{_}}::cyt => @ gamma*[B{{_}}::cyt]
+    K(S{{u}},T{{i}}).B{{a}}::cyt => @ 5
+
+    #! inits
+    {} B{{a}}::cyt
+
+    #! definitions
+    alpha = 10
+    beta = 5
+    gamma = 2
+    omega = 3
+    """
+
+MIN_PROCESSES = 4
+
+MODELS = {"bigger_TS": MODEL.format(2, 6), "even_bigger_TS": MODEL.format(1, 10), "biggest_TS": MODEL.format(1, 14)}
+
+
+def measure(vector_model, processes):
+    start = time.time()
+    ts = vector_model.generate_transition_system(processes=processes)
+    return time.time() - start, len(ts.states_encoding)
+
+
+if __name__ == '__main__':
+    max_processes = int(sys.argv[1]) if len(sys.argv) > 1 else max(multiprocessing.cpu_count(), MIN_PROCESSES)
+    model_parser = Parser("model")
+    print("{} cores available".format(multiprocessing.cpu_count()))
+
+    for name, model_str in MODELS.items():
+        vector_model = model_parser.parse(model_str).data.to_vector_model()
+
+        duration, size = measure(vector_model, None)
+        print("{} ({} states)".format(name, size))
+        print("\tthreads:\t{:.2f} s".format(duration))
+
+        base, _ = measure(vector_model, 1)
+        print("\t1 process:\t{:.2f} s".format(base))
+        for processes in range(2, max_processes + 1):
+            duration, _ = measure(vector_model, processes)
+            print("\t{} processes:\t{:.2f} s (speedup {:.2f})".format(processes, duration, base / duration))
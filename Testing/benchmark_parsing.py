@@ -0,0 +1,68 @@
+import sys
+import time
+
+from Parsing.ParseBCSL import Parser
+
+"""
+Benchmark of parsing of large synthetic BCSL models.
+
+Generated models contain rules with structure agents, rates with complexes, abstract ("zooming")
+syntax with named complexes and rules with variables. Time of syntax check (Lark) and of
+construction of the Model (Parser.transform) is measured separately.
+
+Run as `python3 -m Testing.benchmark_parsing [max_rules]` in the main directory.
+"""
+
+RULES = [
+    "K(S{{u}},T{{i}}).B{{a}}::cyt + P{{x{0}}}::cyt => K(S{{p}},T{{i}}).B{{a}}::cyt + P{{x{0}}}::cyt "
+    "@ k{0}*[K(S{{u}},T{{i}}).B{{a}}::cyt]*[P{{x{0}}}::cyt]",
+    "2 A(S{{s{0}}})::cyt => A(S{{s{0}}}).A(S{{s{0}}})::cyt @ k{0}*[A(S{{s{0}}})::cyt]**2/(1+[A()::cyt])",
+    "T{{a}}:X():XYZ::rep => T{{o}}:X():XYZ::rep + Q{{q{0}}}::rep @ k{0}*[X().Y().Z()::rep]",
+    "S{{i}}:X():?::rep => S{{a}}:X():?::rep @ k{0}*[X().X()::rep] ; ? = {{ XX, XY }}",
+]
+
+MODEL = """
+#! rules
+{}
+
+#! inits
+2 K(S{{u}},T{{i}}).B{{a}}::cyt
+X(S{{i}},T{{a}}).Y().Z()::rep
+
+#! definitions
+{}
+
+#! complexes
+XYZ = X(S{{i}},T{{a}}).Y().Z()
+XX = X(S{{i}},T{{a}}).X(S{{i}},T{{a}})
+XY = X(S{{i}},T{{a}}).Y()
+"""
+
+
+def create_model(size: int) -> str:
+    rules = [RULES[i % len(RULES)].format(i) for i in range(size)]
+    definitions = ["k{} = {}".format(i, i + 1) for i in range(size)]
+    return MODEL.format("\n".join(rules), "\n".join(definitions))
+
+
+if __name__ == '__main__':
+    max_rules = int(sys.argv[1]) if len(sys.argv) > 1 else 8000
+    model_parser = Parser("model")
+
+    size = 1000
+    while size <= max_rules:
+        model_str = create_model(size)
+
+        start = time.time()
+        tree = model_parser.syntax_check(model_str)
+        syntax = time.time() - start
+
+        start = time.time()
+        model = model_parser.transform(tree.data)
+        transform = time.time() - start
+        assert model.success, model.data
+
+        print("{} rules ({} after expansion)".format(size, len(model.data.rules)))
+        print("\tsyntax check:\t{:.2f} s".format(syntax))
+        print("\ttransform:\t{:.2f} s".format(transform))
+        size *= 2
@@ -1,3 +1,5 @@
+import os
+import tempfile
 import unittest
 import numpy as np
 
@@ -119,3 +121,57 @@ class TestTransitionSystem(unittest.TestCase):
         new_hell = State(np.array([5, 5, 5]))
         new_encoding = {self.s1: 1, self.s2: 2, self.s3: 0, new_hell: 3}
         self.assertEqual(ts.states_encoding, new_encoding)
+
+    def test_transition_matrix(self):
+        matrix = self.ts_bigger.transition_matrix()
+        self.assertIs(self.ts_bigger.transition_matrix(), matrix)
+        np.testing.assert_array_equal(matrix.codes, [0, 1, 2, 3])
+        np.testing.assert_array_equal(matrix.indptr, [0, 1, 4, 4, 6])
+        np.testing.assert_array_equal(matrix.targets, [1, 0, 2, 3, 1, 2])
+        np.testing.assert_array_equal(matrix.sources(), [0, 1, 1, 1, 3, 3])
+        self.assertEqual(matrix.edges(2), [])
+        self.assertRaises(ValueError, lambda: matrix.targets.fill(0))
+
+        dense = matrix.to_scipy().toarray()
+        self.assertEqual(dense[1, 2], 0.8)
+        self.assertEqual(dense[3, 1], 0.9)
+        np.testing.assert_allclose(matrix.transient(0, 2), [0.5 * 0.3, 0, 0.5 * 0.8, 0.5 * 0.2])
+
+        # recoding resets the matrix
+        decoding = self.ts_bigger.create_decoding()
+        self.ts_bigger.recode({decoding[code]: code + 10 for code in decoding})
+        np.testing.assert_array_equal(self.ts_bigger.transition_matrix().sources(), [10, 11, 11, 11, 13, 13])
+
+        # changed edges are reflected once the matrix is reset
+        self.ts_bigger.edges = {Edge(2, 2, 1)}
+        self.ts_bigger.matrix = None
+        self.assertEqual(list(self.ts_bigger), [[Edge(2, 2, 1)]])
+
+        self.ts_bigger.edges = {Edge(0, 1, "(k)/(k + 1)"), Edge(0, 0, "1/(k + 1)")}
+        self.ts_bigger.matrix = None
+        self.assertEqual(list(self.ts_bigger), [[Edge(0, 0, "1/(k + 1)"), Edge(0, 1, "(k)/(k + 1)")]])
+        self.assertRaises(TypeError, self.ts_bigger.transition_matrix().to_scipy)
+
+    def test_save_AP_labels_to_STORM(self):
+        self.ts_bigger.init = 1
+        codes, states = self.ts_bigger.states_matrix()
+        self.assertEqual({code: State(state) for code, state in zip(codes.tolist(), states)},
+                         {code: state for state, code in self.ts_bigger.states_encoding.items()})
+
+        satisfied = {"property_0": states[:, 0] >= 2, "property_1": states[:, 1] == 2}
+        with tempfile.TemporaryDirectory() as directory:
+            self.ts_bigger.save_AP_labels_to_STORM(os.path.join(directory, "labels.lab"), codes, satisfied)
+            with open(os.path.join(directory, "labels.lab")) as file:
+                content = file.read()
+
+        expected = {code: {"init"} if code == 1 else set() for code in codes.tolist()}
+        for label, vector in satisfied.items():
+            for code in codes[vector].tolist():
+                expected[code].add(label)
+
+        header, lines = content.split("#END\n")
+        self.assertEqual(header, "#DECLARATION\ninit property_0 property_1\n")
+        lines = [line.split() for line in lines.split("\n")]
+        self.assertEqual([int(line[0]) for line in lines], sorted(code for code in expected if expected[code]))
+        self.assertEqual({int(line[0]): set(line[1:]) for line in lines},
+                         {code: labels for code, labels in expected.items() if labels})
@@ -0,0 +1,74 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from Parsing.ParseBCSL import load_TS_from_json, load_TS, load_TS_from_binary
+from TS.BinaryTS import binary_TS_from_file, binary_TS_from_json, is_binary_TS, HELL
+from TS.State import State, state_from_string
+
+
+class TestBinaryTS(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.file = os.path.join(self.directory.name, "ts.bcs.tsb")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_save_and_load(self):
+        for json_file in ["Testing/testing_bigger_ts.json", "Testing/ts_pMC.json",
+                          "Testing/interrupt_even_bigger_ts.json"]:
+            ts = load_TS_from_json(json_file)
+            ts.save_to_binary(self.file)
+            self.assertTrue(is_binary_TS(self.file))
+            self.assertFalse(is_binary_TS(json_file))
+
+            loaded_ts = load_TS(self.file)
+            self.assertEqual(loaded_ts, ts)
+            self.assertEqual(loaded_ts.states_encoding, ts.states_encoding)
+            self.assertEqual(loaded_ts.edges, ts.edges)
+            self.assertEqual(loaded_ts.unprocessed, ts.unprocessed)
+            self.assertEqual(loaded_ts.init, ts.init)
+
+            # matrix is taken from the arrays
+            matrix = ts.transition_matrix()
+            for name in ["codes", "indptr", "targets"]:
+                np.testing.assert_array_equal(getattr(loaded_ts.matrix, name), getattr(matrix, name))
+            self.assertEqual(loaded_ts.matrix.probabilities, matrix.probabilities)
+
+    def test_arrays(self):
+        ts = load_TS_from_json("Testing/testing_bigger_ts.json")
+        ts.save_to_binary(self.file)
+        data = binary_TS_from_file(self.file)
+
+        self.assertIsInstance(data.states, np.memmap)
+        self.assertEqual(len(data), len(ts.states_encoding))
+        self.assertEqual(data.states.shape, (len(ts.states_encoding), len(ts.ordering)))
+        self.assertEqual(data.indptr[-1], len(ts.edges))
+        self.assertTrue((np.diff(data.codes) > 0).all())
+
+        # edges of each state are sorted by target
+        sources = data.sources()
+        self.assertTrue((np.diff(sources) >= 0).all())
+        self.assertEqual(sorted(zip(sources.tolist(), data.targets.tolist())),
+                         list(zip(sources.tolist(), data.targets.tolist())))
+
+        hell = [row for row in range(len(data)) if (data.states[row] == HELL).all()]
+        self.assertEqual(len(hell), 1)
+        self.assertTrue(State(data.state(hell[0])).is_inf)
+
+        read = binary_TS_from_file(self.file, mmap=False)
+        np.testing.assert_array_equal(read.states, data.states)
+        np.testing.assert_array_equal(read.probabilities, data.probabilities)
+
+    def test_from_json(self):
+        for json_file in ["Testing/testing_bigger_ts.json", "Testing/ts_pMC.json"]:
+            binary_TS_from_json(json_file).save(self.file)
+            self.assertEqual(load_TS_from_binary(self.file), load_TS_from_json(json_file))
+
+    def test_state_from_string(self):
+        self.assertEqual(state_from_string("(1, 0, 2)"), State(np.array([1, 0, 2])))
+        self.assertEqual(state_from_string("(3.0,)"), State(np.array([3])))
+        self.assertTrue(state_from_string("(inf, inf)").is_inf)
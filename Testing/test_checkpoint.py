@@ -0,0 +1,78 @@
+import os
+import tempfile
+import unittest
+
+from Parsing.ParseBCSL import Parser, load_TS_from_json, load_TS_from_checkpoint
+from TS.Checkpoint import Checkpoint, is_checkpoint
+
+
+class TestCheckpoint(unittest.TestCase):
+    def setUp(self):
+        self.model_parser = Parser("model")
+        self.model = \
+            """#! rules
+            => 2 K(S{u},T{i})::cyt @ omega
+            K(S{u})::cyt => K(S{p})::cyt @ alpha*[K(S{u})::cyt]
+            K(S{p})::cyt + B{a}::cyt => K(S{p}).B{a}::cyt @ beta*[K(S{p})::cyt]*[B{a}::cyt]
+            B{_}::cyt => @ gamma*[B{_}::cyt]
+            K(S{u},T{i}).B{a}::cyt => @ 5
+
+            #! inits
+            6 B{a}::cyt
+
+            #! definitions
+            alpha = 10
+            beta = 5
+            gamma = 2
+            omega = 3
+            """
+        self.loaded_ts = load_TS_from_json("Testing/testing_bigger_ts.json")
+
+        self.directory = tempfile.TemporaryDirectory()
+        self.file = os.path.join(self.directory.name, "ts.ckpt")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_resume(self):
+        for engine in ["workers", "batch"]:
+            vector_model = self.model_parser.parse(self.model).data.to_vector_model()
+            partial_ts = vector_model.generate_transition_system(max_size=50, engine=engine, checkpoint=self.file)
+            self.assertTrue(is_checkpoint(self.file))
+
+            ts = load_TS_from_checkpoint(self.file)
+            self.assertEqual(ts.states_encoding, partial_ts.states_encoding)
+            self.assertEqual(ts.edges, partial_ts.edges)
+            self.assertEqual(ts.unprocessed, partial_ts.unprocessed)
+            self.assertEqual(ts.init, partial_ts.init)
+            self.assertEqual(ts.ordering, partial_ts.ordering)
+
+            vector_model = self.model_parser.parse(self.model).data.to_vector_model()
+            generated_ts = vector_model.generate_transition_system(ts, engine=engine)
+            self.assertEqual(generated_ts, self.loaded_ts)
+
+    def test_periodic_checkpoints(self):
+        vector_model = self.model_parser.parse(self.model).data.to_vector_model()
+        generated_ts = vector_model.generate_transition_system(engine="batch", checkpoint=self.file,
+                                                               checkpoint_interval=0)
+        self.assertFalse(os.path.exists(self.file + ".tmp"))
+        self.assertEqual(load_TS_from_checkpoint(self.file), self.loaded_ts)
+        self.assertEqual(load_TS_from_checkpoint(self.file).edges, generated_ts.edges)
+
+    def test_interrupted_write(self):
+        vector_model = self.model_parser.parse(self.model).data.to_vector_model()
+        partial_ts = vector_model.generate_transition_system(max_size=50, checkpoint=self.file)
+        size = os.path.getsize(self.file)
+
+        # next checkpoint is not complete
+        with open(self.file, "ab") as file:
+            file.write(b"S\x10\x00\x00\x00\x00\x00\x00\x00\x01\x02")
+        self.assertEqual(os.path.getsize(self.file), size + 11)
+        ts = load_TS_from_checkpoint(self.file)
+        self.assertEqual(ts.states_encoding, partial_ts.states_encoding)
+        self.assertEqual(ts.unprocessed, partial_ts.unprocessed)
+
+        with open(self.file, "wb") as file:
+            file.write(b"something else")
+        self.assertFalse(is_checkpoint(self.file))
+        self.assertRaises(ValueError, Checkpoint(self.file).load)
@@ -47,6 +47,14 @@ class TestComplex(unittest.TestCase):
         self.assertFalse(self.c2.compatible(self.c4))
         self.assertFalse(self.large_c1.compatible(self.large_c2))
 
+        # matching has to reassign already matched agents
+        self.assertTrue(Complex([self.s3, self.s1], "cyt").compatible(Complex([self.s1, self.s1], "cyt")))
+        self.assertFalse(Complex([self.s1, self.s1], "cyt").compatible(Complex([self.s1, self.s3], "cyt")))
+        self.assertTrue(Complex([self.s5, self.s4, self.s6] * 4, "cyt")
+                        .compatible(Complex([self.s2] * 12, "cyt")))
+        self.assertFalse(Complex([self.s5, self.s4, self.s6] * 4, "cyt")
+                         .compatible(Complex([self.s2] * 11 + [self.s1], "cyt")))
+
     def test_to_PRISM_code(self):
         self.assertEqual(self.c1.to_PRISM_code(5), "VAR_5")
 
@@ -0,0 +1,24 @@
+dtmc
+
+	const double p;
+
+module TS
+
+	VAR_0 : [0..7] init 0; // S()::rep
+	VAR_1 : [0..7] init 0; // D()::rep
+
+	[] (VAR_0=0) & (VAR_1=0) -> p : (VAR_0'=1) & (VAR_1'=0) + (1-p) : (VAR_0'=2) & (VAR_1'=0);
+	[] (VAR_0=1) & (VAR_1=0) -> p : (VAR_0'=3) & (VAR_1'=0) + (1-p) : (VAR_0'=4) & (VAR_1'=0);
+	[] (VAR_0=2) & (VAR_1=0) -> p : (VAR_0'=5) & (VAR_1'=0) + (1-p) : (VAR_0'=6) & (VAR_1'=0);
+	[] (VAR_0=3) & (VAR_1=0) -> p : (VAR_0'=1) & (VAR_1'=0) + (1-p) : (VAR_0'=7) & (VAR_1'=1);
+	[] (VAR_0=4) & (VAR_1=0) -> p : (VAR_0'=7) & (VAR_1'=2) + (1-p) : (VAR_0'=7) & (VAR_1'=3);
+	[] (VAR_0=5) & (VAR_1=0) -> p : (VAR_0'=7) & (VAR_1'=4) + (1-p) : (VAR_0'=7) & (VAR_1'=5);
+	[] (VAR_0=6) & (VAR_1=0) -> p : (VAR_0'=2) & (VAR_1'=0) + (1-p) : (VAR_0'=7) & (VAR_1'=6);
+	[] (VAR_0=7) & (VAR_1=1) -> 1 : (VAR_0'=7) & (VAR_1'=1);
+	[] (VAR_0=7) & (VAR_1=2) -> 1 : (VAR_0'=7) & (VAR_1'=2);
+	[] (VAR_0=7) & (VAR_1=3) -> 1 : (VAR_0'=7) & (VAR_1'=3);
+	[] (VAR_0=7) & (VAR_1=4) -> 1 : (VAR_0'=7) & (VAR_1'=4);
+	[] (VAR_0=7) & (VAR_1=5) -> 1 : (VAR_0'=7) & (VAR_1'=5);
+	[] (VAR_0=7) & (VAR_1=6) -> 1 : (VAR_0'=7) & (VAR_1'=6);
+endmodule
+
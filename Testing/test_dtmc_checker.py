@@ -0,0 +1,76 @@
+import unittest
+
+import Parsing.ParsePCTLformula
+from Errors.InvalidInputError import InvalidInputError
+from Parsing.ParseBCSL import Parser
+from TS.DTMCChecker import DTMCChecker
+from TS.Edge import Edge
+from TS.TransitionMatrix import transition_matrix_from_edges
+
+
+class TestDTMCChecker(unittest.TestCase):
+    def setUp(self):
+        self.parser = Parsing.ParsePCTLformula.PCTLparser()
+        model_str = """
+        #! rules
+        X()::rep => @ k1*[X()::rep]
+        Z()::rep => X()::rep @ k2
+        => Y()::rep @ 1/(1+([X()::rep])**4)
+
+        #! inits
+        2 X()::rep
+        Y()::rep
+
+        #! definitions
+        k2 = 5
+        k1 = 2
+        """
+        self.model = Parser("model").parse(model_str).data
+
+        # 1 -> 2 -> 3 (with self-loop in 2), 1 -> 4, 4 without outgoing edges
+        self.matrix = transition_matrix_from_edges({Edge(1, 2, 0.5), Edge(1, 4, 0.5), Edge(2, 2, 0.5),
+                                                    Edge(2, 3, 0.5), Edge(3, 3, 1.0)})
+
+    def test_model_checking_native(self):
+        formulas = ['P=? [F X()::rep = 1]', 'P <= 0.5[F X()::rep=1]', 'P=? [X X()::rep = 1]',
+                    'P=? [G X()::rep >= 1]', 'P=? [Y()::rep<2 U Y()::rep>2]',
+                    'P=? [F X()::rep = 0 & !(P>0.5 [X X()::rep = 1])]', 'P=? [F X()::rep = 0 & Y()::rep = 1 | True]']
+        results = self.model.PCTL_model_checking_native([self.parser.parse(formula) for formula in formulas])
+
+        go_up, go_down = 1 / 69, 68 / 69  # rates 1/(1+2**4) and k1*2 normalised
+        self.assertAlmostEqual(results[0], go_down + go_up * go_down)
+        self.assertFalse(results[1])
+        self.assertAlmostEqual(results[2], go_down)
+        self.assertAlmostEqual(results[3], go_up * go_up + go_up * go_down * 0.2 + go_down * 0.2 * 0.2)
+        self.assertEqual(results[4], 0)
+        self.assertAlmostEqual(results[5], 1 - results[3])
+        self.assertAlmostEqual(results[6], 1)
+
+    def test_until(self):
+        target, left = [self.parser.parse(formula).get_APs()[0] for formula in ['P=? [F X()::rep = 1]',
+                                                                              'P=? [F Y()::rep = 1]']]
+        checker = DTMCChecker(self.matrix, 1, {target: {3}, left: {1, 2}})
+        formulas = ['P=? [F X()::rep = 1]', 'P=? [X X()::rep = 1]', 'P=? [Y()::rep = 1 U X()::rep = 1]',
+                    'P=? [G Y()::rep = 1]', 'P >= 0.5 [F X()::rep = 1]', 'P > 0.5 [F X()::rep = 1]']
+        results = checker.check_all([self.parser.parse(formula) for formula in formulas])
+        self.assertEqual(results[:4], [0.5, 0, 0.5, 0])
+        self.assertEqual(results[4:], [True, False])
+
+        checker = DTMCChecker(self.matrix, 1, {target: {3}, left: {1}})
+        self.assertEqual(checker.check(self.parser.parse('P=? [Y()::rep = 1 U X()::rep = 1]')), 0)
+
+    def test_high_out_degree(self):
+        target = self.parser.parse('P=? [F X()::rep = 1]').get_APs()[0]
+        for degree in [100, 200, 1000]:
+            successors = range(2, degree + 2)
+            edges = {Edge(1, successor, 1 / degree) for successor in successors}
+            checker = DTMCChecker(transition_matrix_from_edges(edges), 1, {target: set(successors)})
+            self.assertAlmostEqual(checker.check(self.parser.parse('P=? [F X()::rep = 1]')), 1)
+
+    def test_errors(self):
+        checker = DTMCChecker(self.matrix, 1, {})
+        self.assertRaises(InvalidInputError, checker.check, self.parser.parse('P=? [F X()::rep = 1]'))
+        checker = DTMCChecker(self.matrix, 1, {self.parser.parse('P=? [F X()::rep = 1]').get_APs()[0]: {3}})
+        self.assertRaises(InvalidInputError, checker.check, self.parser.parse('P>0.5 [F P=? [F X()::rep = 1]]'))
+        transition_matrix = transition_matrix_from_edges({Edge(1, 2, "p")})
+        self.assertRaises(TypeError, DTMCChecker, transition_matrix, 1, {})
@@ -0,0 +1,25 @@
+import random
+import unittest
+import numpy as np
+
+from TS.IndexedPriorityQueue import IndexedPriorityQueue
+
+
+class TestIndexedPriorityQueue(unittest.TestCase):
+    def test_top(self):
+        queue = IndexedPriorityQueue([5.0, 2.0, np.inf, 3.0])
+        self.assertEqual(queue.top(), (1, 2.0))
+        self.assertEqual(len(queue), 4)
+
+    def test_update(self):
+        generator = random.Random(1)
+        keys = [generator.random() for _ in range(50)]
+        queue = IndexedPriorityQueue(keys)
+        for _ in range(500):
+            item = generator.randrange(50)
+            keys[item] = generator.choice([generator.random(), np.inf])
+            queue.update(item, keys[item])
+            self.assertEqual(queue.top()[1], min(keys))
+            self.assertEqual(keys[queue.top()[0]], min(keys))
+        self.assertEqual(sorted(queue.heap), list(range(50)))
+        self.assertTrue(all([queue.heap[queue.position[item]] == item for item in range(50)]))
@@ -0,0 +1,96 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+
+import numpy as np
+from numpy import inf
+
+from Parsing.ParseBCSL import load_TS_from_json
+from TS.JSONStream import JSONStream, iterate_TS_json
+from TS.JSONWriter import JSONWriter
+from TS.State import State
+
+
+class TestJSONStream(unittest.TestCase):
+    def setUp(self):
+        self.data = {"nodes": {"1": "(0, 1)", "22": "(inf, inf)"}, "empty": {}, "none": [],
+                     "edges": [{"s": 1, "t": 22, "p": 0.25}, {"s": 22, "t": 22, "p": "(k)/(k + 1)"}],
+                     "initial": 123456789, "nested": [[1, [2, {"a": [3.5e-10]}]], "x\n\"y"]}
+
+        self.directory = tempfile.TemporaryDirectory()
+        self.file = os.path.join(self.directory.name, "ts.json")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_read(self):
+        document = json.dumps(self.data, indent=4)
+        for chunk_size in [1, 3, 7, 1000]:
+            stream = JSONStream(io.StringIO(document), chunk_size)
+            result = dict()
+            for key in stream.members():
+                if key == "nodes":
+                    result[key] = {code: stream.value() for code in stream.members()}
+                elif key == "edges":
+                    result[key] = [stream.value() for _ in stream.elements()]
+                else:
+                    result[key] = stream.value()
+            self.assertEqual(result, self.data)
+
+        stream = JSONStream(io.StringIO('{"a": [1, 2'), 3)
+        members = stream.members()
+        next(members)
+        self.assertRaises(ValueError, lambda: [stream.value() for _ in stream.elements()])
+
+    def test_write(self):
+        with JSONWriter(self.file) as writer:
+            writer.start("nodes")
+            for code, state in self.data["nodes"].items():
+                writer.item(state, code)
+            writer.end()
+            writer.start("empty")
+            writer.end()
+            writer.start("none", array=True)
+            writer.end()
+            writer.start("edges", array=True)
+            for edge in self.data["edges"]:
+                writer.item(edge)
+            writer.end()
+            writer.item(self.data["initial"], "initial")
+            writer.item(self.data["nested"], "nested")
+
+        with open(self.file) as file:
+            self.assertEqual(file.read(), json.dumps(self.data, indent=4))
+
+        # failed writing does not change the previous document
+        with self.assertRaises(KeyboardInterrupt):
+            with JSONWriter(self.file) as writer:
+                writer.start("edges", array=True)
+                writer.item(self.data["edges"][0])
+                raise KeyboardInterrupt
+        with open(self.file) as file:
+            self.assertEqual(file.read(), json.dumps(self.data, indent=4))
+        self.assertEqual(os.listdir(self.directory.name), ["ts.json"])
+
+    def test_iterate_TS_json(self):
+        items = list(iterate_TS_json("Testing/ts_pMC.json"))
+        with open("Testing/ts_pMC.json") as file:
+            data = json.load(file)
+
+        nodes = {item[1]: item[2] for item in items if item[0] == "node"}
+        self.assertEqual(nodes, {int(code): State(np.array(eval(state))) for code, state in data["nodes"].items()})
+        self.assertEqual(len([item for item in items if item[0] == "edge"]), len(data["edges"]))
+        self.assertIn(("ordering", data["ordering"]), items)
+        self.assertIn(("initial", data["initial"]), items)
+
+    def test_save_and_load(self):
+        ts = load_TS_from_json("Testing/interrupt_even_bigger_ts.json")
+        ts.unprocessed = set(list(ts.states_encoding)[:10])
+        ts.save_to_json(self.file)
+        loaded_ts = load_TS_from_json(self.file)
+        self.assertEqual(loaded_ts.states_encoding, ts.states_encoding)
+        self.assertEqual(loaded_ts.edges, ts.edges)
+        self.assertEqual(loaded_ts.unprocessed, ts.unprocessed)
+        self.assertEqual(loaded_ts.init, ts.init)
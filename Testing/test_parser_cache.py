@@ -0,0 +1,56 @@
+import os
+import tempfile
+import unittest
+
+import Parsing.ParseBCSL
+from Parsing.ParseBCSL import Parser
+from Parsing.ParsePCTLformula import PCTLparser
+
+
+class TestParserCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.tables_directory = Parsing.ParseBCSL.TABLES_DIRECTORY
+        self.parsers = dict(Parsing.ParseBCSL.PARSERS)
+        self.model = """
+            #! rules
+            X()::rep => @ k1*[X()::rep]
+            Z()::rep => X()::rep @ k2
+
+            #! inits
+            2 X()::rep
+
+            #! definitions
+            k2 = 5
+            k1 = 2
+        """
+
+    def tearDown(self):
+        Parsing.ParseBCSL.TABLES_DIRECTORY = self.tables_directory
+        Parsing.ParseBCSL.PARSERS.clear()
+        Parsing.ParseBCSL.PARSERS.update(self.parsers)
+        self.directory.cleanup()
+
+    def test_cached_parser(self):
+        self.assertIs(Parser("model").parser, Parser("model").parser)
+        self.assertIsNot(Parser("model").parser, Parser("rate_complex").parser)
+        self.assertIs(PCTLparser().parser, PCTLparser().parser)
+        self.assertEqual(Parser("model").parse(self.model).data, Parser("model").parse(self.model).data)
+
+    def test_tables(self):
+        Parsing.ParseBCSL.TABLES_DIRECTORY = self.directory.name
+        Parsing.ParseBCSL.PARSERS.clear()
+        expected = Parser("model").parse(self.model).data
+        self.assertTrue(os.path.exists(os.path.join(self.directory.name, "model.lark")))
+
+        # new process would load the tables
+        Parsing.ParseBCSL.PARSERS.clear()
+        self.assertEqual(Parser("model").parse(self.model).data, expected)
+        self.assertTrue(PCTLparser().parse("P=? [F X()::rep = 1]").success)
+        self.assertTrue(os.path.exists(os.path.join(self.directory.name, "PCTL.lark")))
+
+        # tables cannot be written
+        Parsing.ParseBCSL.TABLES_DIRECTORY = os.path.join(self.directory.name, "tables.lark")
+        os.makedirs(os.path.join(Parsing.ParseBCSL.TABLES_DIRECTORY, "rate_complex.lark"))
+        Parsing.ParseBCSL.PARSERS.clear()
+        self.assertTrue(Parser("rate_complex").parse("X()::rep").success)
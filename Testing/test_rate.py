@@ -73,6 +73,26 @@ class TestRate(unittest.TestCase):
         self.rate_2.vectorize(ordering, dict())
         self.assertEqual(self.rate_2.evaluate(self.state_2), sympy.sympify("3*4.0 + 2"))
 
+    def test_compile(self):
+        ordering = (self.c2, self.c3)
+        self.rate_1.vectorize(ordering, {"v_1": 5})
+        self.assertEqual(self.rate_1.compile()([2, 3]), 37.5)
+
+        # evaluate both single state and matrix of states (given by columns)
+        ordering = (self.c2, self.c3, self.c4, self.c5, self.c6, self.c7)
+        self.rate_2.vectorize(ordering, dict())
+        compiled = self.rate_2.compile()
+        self.assertEqual(compiled(self.state_2.sequence), 14)
+        states = np.array([self.state_2.sequence, self.state_2.sequence * 2]).T
+        np.testing.assert_array_equal(compiled(states), np.array([14, 28]))
+        self.assertEqual(self.rate_2.positions(), {0, 1, 2, 3})
+
+        # parametric rate stays symbolic
+        rate = Core.Rate.Rate(self.parser.parse("3.0*[K()::cyt]/2.0*v_1").data)
+        rate.vectorize(ordering, dict())
+        self.assertFalse(rate.compile())
+        self.assertEqual(rate.evaluate(self.state_2), sympy.sympify("3.0*2/2.0*v_1"))
+
     def test_to_symbolic(self):
         ordering = (self.c2, self.c3)
         self.rate_1.vectorize(ordering, dict())
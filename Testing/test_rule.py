@@ -192,6 +192,11 @@ class TestRule(unittest.TestCase):
         self.assertEqual(self.rule_no_change.create_reactions(atomic_signature, structure_signature),
                          {self.reaction_c1_1})
 
+        # reactions are generated lazily
+        generated = self.rule_c1.generate_reactions(atomic_signature, structure_signature)
+        self.assertEqual(next(generated) in self.reactions_c1, True)
+        self.assertEqual({next(generated)} | set(generated) | self.reactions_c1, self.reactions_c1)
+
         rule_exp = "K(T{a}).K().K()::cyt => K(T{i}).K().K()::cyt @ k1*[K(T{a}).K().K()::cyt]"
         rule = self.parser.parse(rule_exp).data
         result = rule.create_reactions(atomic_signature, structure_signature)
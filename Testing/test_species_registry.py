@@ -0,0 +1,48 @@
+import unittest
+from sortedcontainers import SortedList
+
+from Core.Atomic import AtomicAgent
+from Core.Complex import Complex
+from Core.SpeciesRegistry import SpeciesRegistry
+from Core.Structure import StructureAgent
+
+
+class TestSpeciesRegistry(unittest.TestCase):
+    def setUp(self):
+        self.a1 = AtomicAgent("T", "i")
+        self.a2 = AtomicAgent("T", "a")
+        self.a3 = AtomicAgent("T", "_")
+
+        self.s1 = StructureAgent("K", {self.a1})
+        self.s2 = StructureAgent("K", {self.a2})
+        self.s3 = StructureAgent("K", {self.a3})
+
+        self.c1 = Complex([self.s1], "cyt")
+        self.c2 = Complex([self.s2], "cyt")
+        self.c3 = Complex([self.s1, self.a2], "cyt")
+        self.c4 = Complex([self.s2, self.a1], "cyt")
+        self.c5 = Complex([self.s1], "cell")
+
+        self.registry = SpeciesRegistry([self.c4, self.c1, self.c3, self.c2, self.c1, self.c5])
+
+    def test_ordering(self):
+        self.assertEqual(len(self.registry), 5)
+        self.assertEqual(self.registry, SortedList([self.c1, self.c2, self.c3, self.c4, self.c5]))
+        self.assertEqual(SortedList([self.c1, self.c2, self.c3, self.c4, self.c5]), self.registry)
+        self.assertEqual(list(self.registry), list(SortedList([self.c1, self.c2, self.c3, self.c4, self.c5])))
+
+    def test_index(self):
+        for i, complex in enumerate(self.registry):
+            self.assertEqual(self.registry.index(complex), i)
+        self.assertTrue(Complex([self.a2, self.s1], "cyt") in self.registry)
+        self.assertFalse(Complex([self.s3], "cyt") in self.registry)
+        self.assertRaises(ValueError, self.registry.index, Complex([self.s3], "cyt"))
+
+    def test_identify_compatible(self):
+        abstract = Complex([self.s3], "cyt")
+        self.assertEqual(abstract.identify_compatible(self.registry), abstract.identify_compatible(tuple(self.registry)))
+        self.assertEqual(abstract.identify_compatible(self.registry),
+                         sorted([self.registry.index(self.c1), self.registry.index(self.c2)]))
+        abstract = Complex([self.a3, self.s3], "cyt")
+        self.assertEqual(abstract.identify_compatible(self.registry),
+                         sorted([self.registry.index(self.c3), self.registry.index(self.c4)]))
@@ -0,0 +1,55 @@
+import unittest
+import numpy as np
+
+from TS.State import State
+from TS.StateStore import StateStore
+
+
+class TestStateStore(unittest.TestCase):
+    def setUp(self):
+        self.s1 = State(np.array((1, 2, 3)))
+        self.s2 = State(np.array((0, 0, 7)))
+        self.s3 = State(np.array((7, 7, 0)))
+        self.hell = State(np.array((np.inf, np.inf, np.inf)))
+
+        self.store = StateStore(3, 7)
+
+    def test_add(self):
+        self.assertEqual(self.store.add(self.s1), (1, True))
+        self.assertEqual(self.store.add(self.s2), (2, True))
+        self.assertEqual(self.store.add(self.s1), (1, False))
+        self.assertEqual(self.store.add(self.hell), (3, True))
+        self.assertEqual(len(self.store), 3)
+
+        self.assertTrue(self.s2 in self.store)
+        self.assertFalse(self.s3 in self.store)
+        self.assertEqual(self.store.code(self.s3), None)
+
+        self.assertRaises(ValueError, self.store.add, State(np.array((0, 0, 16))))
+
+    def test_get(self):
+        for state in [self.s1, self.s2, self.hell, self.s3]:
+            self.store.add(state)
+        self.assertEqual(self.store.get(2), self.s2)
+        self.assertTrue(self.store.get(3).is_inf)
+        self.assertEqual(self.store.to_encoding(), {self.s1: 1, self.s2: 2, self.hell: 3, self.s3: 4})
+
+        # 3 values with 4 bits each
+        self.assertEqual(self.store.to_array().shape, (4, 1))
+        self.assertEqual(self.store.to_array()[0, 0], 1 + (2 << 4) + (3 << 8))
+
+    def test_grow(self):
+        store = StateStore(2, 100, capacity=4)
+        states = [State(np.array((i, j))) for i in range(100) for j in range(10)]
+        for code, state in enumerate(states, 1):
+            self.assertEqual(store.add(state), (code, True))
+        for code, state in enumerate(states, 1):
+            self.assertEqual(store.code(state), code)
+            self.assertEqual(store.get(code), state)
+
+        # wide vectors take multiple words
+        store = StateStore(100, 1000)
+        state = State(np.arange(100))
+        store.add(state)
+        self.assertEqual(store.get(1), state)
+        self.assertEqual(store.to_array().shape, (1, 16))
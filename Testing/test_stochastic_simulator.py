@@ -0,0 +1,143 @@
+import random
+import unittest
+import numpy as np
+
+from Parsing.ParseBCSL import Parser
+from TS.StochasticSimulator import StochasticSimulator, RunningStatistics, run_seeds
+
+
+class TestStochasticSimulator(unittest.TestCase):
+    def setUp(self):
+        self.model_parser = Parser("model")
+
+        self.model = \
+            """#! rules
+            T{a}::rep => T{i}::rep @ k1*[T{a}::rep]
+            T{i}::rep => T{a}::rep @ k2*[T{i}::rep]
+
+            #! inits
+            10 T{a}::rep
+
+            #! definitions
+            k1 = 0.5
+            k2 = 0.2
+            """
+
+        self.vector_model = self.model_parser.parse(self.model).data.to_vector_model()
+        self.simulator = StochasticSimulator(self.vector_model.vector_reactions, self.vector_model.init)
+
+    def test_matrices(self):
+        # ordering: T{a}::rep, T{i}::rep
+        self.assertEqual(self.simulator.reactants.shape, (2, 2))
+        self.assertEqual(sorted(map(tuple, self.simulator.changes)), [(-1, 1), (1, -1)])
+
+        rates = self.simulator.propensities(np.array([10, 0]))
+        self.assertEqual(sorted(rates[~np.isnan(rates)]), [5.0])
+        self.assertEqual(np.isnan(rates).sum(), 1)
+
+    def test_direct(self):
+        random.seed(42)
+        times, states = self.simulator.direct(10, random.expovariate)
+
+        self.assertEqual(len(times), len(states))
+        self.assertEqual(times[0], 0)
+        self.assertTrue((np.diff(times) > 0).all())
+        self.assertTrue((times < 10).all())
+        np.testing.assert_array_equal(states[0], [10, 0])
+        # number of agents is preserved
+        np.testing.assert_array_equal(states.sum(axis=1), 10)
+
+    def test_dependency_graph(self):
+        # both reactions change both agents
+        self.assertEqual(self.simulator.dependencies, [[0, 1], [0, 1]])
+
+        model = """#! rules
+            X()::rep => Y()::rep @ k1*[X()::rep]
+            Z()::rep => Z()::rep + Z()::rep @ k2*[Z()::rep]
+
+            #! inits
+            2 X()::rep
+            1 Z()::rep
+
+            #! definitions
+            k1 = 0.5
+            k2 = 0.2
+            """
+        vector_model = self.model_parser.parse(model).data.to_vector_model()
+        simulator = StochasticSimulator(vector_model.vector_reactions, vector_model.init)
+        self.assertEqual(simulator.dependencies, [[0], [1]])
+
+    def test_next_reaction(self):
+        generator = random.Random(42)
+        times, states = self.simulator.next_reaction(10, generator)
+
+        self.assertEqual(len(times), len(states))
+        self.assertTrue((np.diff(times) > 0).all())
+        self.assertTrue((times < 10).all())
+        np.testing.assert_array_equal(states[0], [10, 0])
+        np.testing.assert_array_equal(states.sum(axis=1), 10)
+        # each step applies exactly one reaction
+        self.assertTrue((np.abs(np.diff(states, axis=0)).sum(axis=1) == 2).all())
+
+        # both methods agree with analytic mean 10*(2 + 5*exp(-0.7*t))/7
+        grid = np.array([0, 1, 5])
+        expected = 10 * (2 + 5 * np.exp(-0.7 * grid)) / 7
+        for method in ["direct", "next_reaction"]:
+            statistics = self.simulator.simulate_runs(5, grid, run_seeds(3, 400), method)
+            np.testing.assert_allclose(statistics.mean[:, 0], expected, atol=0.4)
+
+    def test_tau_leaping(self):
+        # small populations are simulated exactly
+        times, states = self.simulator.tau_leaping(10, random.Random(42))
+        self.assertTrue((np.diff(times) > 0).all())
+        self.assertTrue((np.abs(np.diff(states, axis=0)).sum(axis=1) == 2).all())
+
+        grid = np.array([0, 1, 5])
+        expected = 10 * (2 + 5 * np.exp(-0.7 * grid)) / 7
+        statistics = self.simulator.simulate_runs(5, grid, run_seeds(3, 400), "tau_leaping")
+        np.testing.assert_allclose(statistics.mean[:, 0], expected, atol=0.4)
+
+        # large populations are leaped
+        model = self.model.replace("10 T{a}::rep", "100000 T{a}::rep")
+        vector_model = self.model_parser.parse(model).data.to_vector_model()
+        simulator = StochasticSimulator(vector_model.vector_reactions, vector_model.init)
+        times, states = simulator.tau_leaping(5, random.Random(42))
+        self.assertLess(len(times), 1000)
+        self.assertTrue((states >= 0).all())
+        np.testing.assert_array_equal(states.sum(axis=1), 100000)
+        statistics = simulator.simulate_runs(5, grid, run_seeds(3, 10), "tau_leaping")
+        np.testing.assert_allclose(statistics.mean[:, 0], expected * 10000, rtol=0.02)
+
+    def test_running_statistics(self):
+        data = np.random.RandomState(0).random_sample((10, 3, 2))
+        statistics = RunningStatistics((3, 2))
+        for values in data:
+            statistics.add(values)
+        np.testing.assert_allclose(statistics.mean, data.mean(axis=0))
+        np.testing.assert_allclose(statistics.variance, data.var(axis=0, ddof=1))
+
+        left, right = RunningStatistics((3, 2)), RunningStatistics((3, 2))
+        for values in data[:4]:
+            left.add(values)
+        for values in data[4:]:
+            right.add(values)
+        left.merge(right)
+        self.assertEqual(left.count, 10)
+        np.testing.assert_allclose(left.mean, statistics.mean)
+        np.testing.assert_allclose(left.variance, statistics.variance)
+
+    def test_stochastic_simulation_parallel(self):
+        self.assertEqual(run_seeds(1, 3), run_seeds(1, 3))
+        self.assertEqual(len(set(run_seeds(1, 3))), 3)
+
+        sequential = self.vector_model.stochastic_simulation_parallel(5, 20, 0.5, processes=1, seed=7)
+        parallel = self.vector_model.stochastic_simulation_parallel(5, 20, 0.5, processes=2, seed=7)
+
+        self.assertEqual(list(sequential.columns), ["times", "T{a}::rep", "T{i}::rep"])
+        self.assertEqual(len(sequential), 11)
+        np.testing.assert_allclose(sequential.values, parallel.values)
+        np.testing.assert_allclose(sequential.values[:, 1] + sequential.values[:, 2], 10)
+
+        with_variance = self.vector_model.stochastic_simulation_parallel(5, 20, 0.5, processes=1, seed=7,
+                                                                         variance=True)
+        self.assertEqual(list(with_variance.columns)[3:], ["T{a}::rep variance", "T{i}::rep variance"])
@@ -0,0 +1,150 @@
+import os
+import re
+import stat
+import tempfile
+import unittest
+from itertools import accumulate
+from unittest import mock
+
+import Parsing.ParsePCTLformula
+from Core import StormPool as storm_pool
+from Core.StormPool import StormPool, is_available
+from Errors.StormNotAvailable import StormNotAvailable
+from Parsing.ParseBCSL import Parser
+
+FAKE_STORM = """#!/bin/sh
+if [ "$1" = "--version" ]; then
+    echo "Storm (fake)"
+    exit 0
+fi
+if [ -n "$FAKE_STORM_LOG" ]; then echo "start" >> "$FAKE_STORM_LOG"; fi
+sleep "${FAKE_STORM_SLEEP:-0}"
+if [ -n "$FAKE_STORM_LOG" ]; then echo "end" >> "$FAKE_STORM_LOG"; fi
+for argument in "$@"; do
+    echo "argument: $argument"
+    if [ -p "$argument" ]; then
+        echo "fifo: $argument"
+    fi
+    if [ -z "$FAKE_STORM_SKIP" ] && { [ -f "$argument" ] || [ -p "$argument" ]; }; then
+        content="$(cat "$argument")"
+        echo "content: $(echo "$content" | head -n 1)"
+        echo "lines: $(echo "$content" | wc -l)"
+    fi
+done
+echo "Result (for initial states): 0.5"
+"""
+
+
+class TestStormPool(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        for binary in ["storm", "storm-pars"]:
+            path = os.path.join(self.directory.name, binary)
+            with open(path, "w") as file:
+                file.write(FAKE_STORM)
+            os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+
+        self.path = os.environ["PATH"]
+        os.environ["PATH"] = self.directory.name + os.pathsep + self.path
+        storm_pool.AVAILABLE.clear()
+
+        model_str = """
+        #! rules
+        X()::rep => @ k1*[X()::rep]
+        Z()::rep => X()::rep @ k2
+        => Y()::rep @ p*1/(1+([X()::rep])**4)
+
+        #! inits
+        2 X()::rep
+        Y()::rep
+
+        #! definitions
+        k2 = 5
+        k1 = 2
+        """
+        self.model = Parser("model").parse(model_str).data
+        self.parser = Parsing.ParsePCTLformula.PCTLparser()
+
+    def tearDown(self):
+        os.environ["PATH"] = self.path
+        os.environ.pop("FAKE_STORM_SLEEP", None)
+        os.environ.pop("FAKE_STORM_SKIP", None)
+        os.environ.pop("FAKE_STORM_LOG", None)
+        storm_pool.AVAILABLE.clear()
+        self.directory.cleanup()
+
+    def test_model_checking(self):
+        formulas = [self.parser.parse('P=? [F X()::rep = 1]'), self.parser.parse('P > 0.5 [F X()::rep = 0]')]
+        output = self.model.PCTL_model_checking(formulas).decode()
+
+        self.assertIn('argument: P=? [F "property_0"]; P > 0.5 [F "property_1"]', output)
+        self.assertIn("content: dtmc", output)
+        self.assertIn("content: #DECLARATION", output)
+
+        # files were in unique job directory which is already removed
+        files = re.findall("argument: (.*exp_transitions.tra)", output)
+        self.assertEqual(len(files), 1)
+        self.assertNotEqual(os.path.dirname(files[0]), "/tmp")
+        self.assertFalse(os.path.exists(os.path.dirname(files[0])))
+
+        other = self.model.PCTL_model_checking(formulas[0]).decode()
+        self.assertNotEqual(re.findall("argument: (.*exp_transitions.tra)", other), files)
+
+    def test_fifo(self):
+        formula = self.parser.parse('P=? [F X()::rep = 1]')
+        files = self.model.PCTL_model_checking(formula).decode()
+        output = self.model.PCTL_model_checking(formula, fifo=True).decode()
+        self.assertEqual(len(re.findall("fifo: ", output)), 2)
+        self.assertEqual(re.findall("(content|lines): (.*)", output), re.findall("(content|lines): (.*)", files))
+
+        output = self.model.PCTL_synthesis(self.parser.parse('P=? [F X()::rep = 1]'), None, fifo=True).decode()
+        self.assertEqual(len(re.findall("fifo: ", output)), 1)
+        self.assertIn("content: dtmc", output)
+
+        # Storm not reading the files does not block writers
+        os.environ["FAKE_STORM_SKIP"] = "1"
+        output = self.model.PCTL_model_checking(formula, fifo=True).decode()
+        self.assertNotIn("content: ", output)
+
+        # files are used when FIFOs are not available
+        del os.environ["FAKE_STORM_SKIP"]
+        with mock.patch("os.mkfifo", side_effect=OSError):
+            output = self.model.PCTL_model_checking(formula, fifo=True).decode()
+        self.assertNotIn("fifo: ", output)
+        self.assertEqual(re.findall("(content|lines): (.*)", output), re.findall("(content|lines): (.*)", files))
+
+    def test_synthesis(self):
+        formula = self.parser.parse('P <= 0.5 [F X()::rep = 1]')
+        output = self.model.PCTL_synthesis(formula, "0<=p<=1").decode()
+        self.assertEqual(re.findall("argument: (.*)", output)[2:],
+                         ["--prop", "P <= 0.5 [F VAR_0 = 1]", "--region", "0<=p<=1", "--refine", "0.01", "10",
+                          "--printfullresult"])
+        self.assertIn("content: dtmc", output)
+
+    def test_probe_once(self):
+        self.assertTrue(is_available("storm"))
+        os.environ["PATH"] = self.path
+        self.assertTrue(is_available("storm"))
+
+        storm_pool.AVAILABLE.clear()
+        os.environ["PATH"] = self.directory.name + "_missing"
+        self.assertFalse(is_available("storm"))
+        with StormPool() as pool:
+            self.assertRaises(StormNotAvailable, pool.run, ["storm", "--version"])
+
+    def test_pool(self):
+        # each process logs its start and end, the order of the log gives the number of running processes
+        log = os.path.join(self.directory.name, "log")
+        os.environ["FAKE_STORM_SLEEP"] = "0.2"
+        os.environ["FAKE_STORM_LOG"] = log
+        with StormPool(2) as pool:
+            outputs = pool.map([["storm", str(i)] for i in range(6)])
+
+        self.assertEqual([output.decode().split("\n")[0] for output in outputs],
+                         ["argument: {}".format(i) for i in range(6)])
+        with open(log) as file:
+            events = file.read().split()
+        self.assertEqual(events.count("start"), 6)
+        running = list(accumulate(1 if event == "start" else -1 for event in events))
+        self.assertLessEqual(max(running), 2)
+        self.assertEqual(running[-1], 0)
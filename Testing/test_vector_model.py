@@ -1,4 +1,8 @@
+import json
+import os
+import tempfile
 import unittest
+from unittest import mock
 import numpy as np
 import pandas as pd
 
@@ -6,11 +10,13 @@ from Core.Atomic import AtomicAgent
 from Core.Rate import Rate
 from Core.Structure import StructureAgent
 from Core.Complex import Complex
+from Errors.InvalidInputError import InvalidInputError
 from Parsing.ParseBCSL import Parser, load_TS_from_json
 from TS.Edge import Edge
 from TS.State import State
+from TS.TSworker import Scheduler
 from TS.TransitionSystem import TransitionSystem
-from TS.VectorModel import VectorModel
+from TS.VectorModel import VectorModel, expansion_limits
 from TS.VectorReaction import VectorReaction
 
 
@@ -234,6 +240,29 @@ class TestVectorModel(unittest.TestCase):
     def test_compute_bound(self):
         self.assertEqual(self.vm_1.bound, 2)
 
+    def test_candidate_reactions(self):
+        reactions, reactants, positions, consumers, spontaneous = self.vm_2.create_enablement_index()
+        self.assertEqual(reactants.shape, (3, 3))
+        self.assertEqual(sorted(map(list, positions)), [[], [0], [2]])
+        self.assertEqual(sorted(consumers), [0, 2])
+        self.assertEqual(len(spontaneous), 1)
+
+        def sources(state):
+            return sorted(tuple(reaction.source.sequence) for reaction in self.vm_2.candidate_reactions(state))
+
+        self.assertEqual(sources(State(np.array([2.0, 1.0, 1.0]))), [(0, 0, 0), (0, 0, 1), (1, 0, 0)])
+        self.assertEqual(sources(State(np.array([0.0, 3.0, 1.0]))), [(0, 0, 0), (0, 0, 1)])
+        self.assertEqual(sources(State(np.array([0.0, 0.0, 0.0]))), [(0, 0, 0)])
+
+        # same successors as applying all reactions
+        for state in [State(np.array([2.0, 1.0, 1.0])), State(np.array([0.0, 2.0, 1.0]))]:
+            expected = set()
+            for reaction in self.vm_2.vector_reactions:
+                new_state, rate = reaction.apply(state, self.vm_2.bound)
+                if new_state and rate:
+                    expected.add(new_state)
+            self.assertEqual({edge.target for edge in self.vm_2.compute_edges(state)}, expected)
+
     def test_deterministic_simulation(self):
         # simple rates
         data_simulated = self.vm_2.deterministic_simulation(3, 1/(6.022 * 10**23))
@@ -250,6 +279,39 @@ class TestVectorModel(unittest.TestCase):
 
         pd.testing.assert_frame_equal(data_simulated, data_loaded)
 
+        # rates of the model are not changed
+        self.assertTrue(vector_model.stochastic_simulation(1, 1) is not None)
+
+    def test_deterministic_simulation_solvers(self):
+        data_loaded = pd.read_csv("Testing/simple_out.csv")
+        for solver in ["LSODA", "BDF", "Radau", "RK45"]:
+            data_simulated = self.vm_2.deterministic_simulation(3, 1/(6.022 * 10**23), solver=solver)
+            pd.testing.assert_frame_equal(data_simulated, data_loaded, rtol=1e-2)
+
+        symbols, ODEs = self.vm_2.create_ODEs()
+        self.assertEqual(len(symbols), len(ODEs))
+        self.assertRaises(InvalidInputError, self.vm_2.deterministic_simulation, 3, 1, solver="Euler")
+
+    def test_deterministic_simulation_absent_agent(self):
+        model_str = """
+        #! rules
+        X()::rep => @ k1*[X()::rep] + k2*[Z()::rep]
+
+        #! inits
+        2 X()::rep
+
+        #! definitions
+        k1 = 0.05
+        k2 = 0.12
+        """
+        vector_model = self.model_parser.parse(model_str).data.to_vector_model()
+        symbols, ODEs = vector_model.create_ODEs()
+        self.assertEqual(len(ODEs), 1)
+        data_loaded = vector_model.deterministic_simulation(3, 1/(6.022 * 10**23))
+        for solver in ["LSODA", "BDF", "Radau"]:
+            data_simulated = vector_model.deterministic_simulation(3, 1/(6.022 * 10**23), solver=solver)
+            pd.testing.assert_frame_equal(data_simulated, data_loaded, rtol=1e-2)
+
     def test_stochastic_simulation(self):
         model = self.model_parser.parse(self.model_abstract).data
         vector_model = model.to_vector_model()
@@ -276,6 +338,77 @@ class TestVectorModel(unittest.TestCase):
         loaded_ts = load_TS_from_json("Testing/testing_bigger_ts.json")
         self.assertEqual(generated_ts, loaded_ts)
 
+    def test_generate_transition_system_rule_based(self):
+        model = self.model_parser.parse(self.model_TS).data
+        rule_based_model = model.to_rule_based_model()
+        self.assertEqual(rule_based_model.bound, model.to_vector_model().bound)
+        self.assertEqual(self.test_ts, rule_based_model.generate_transition_system())
+
+        model = self.model_parser.parse(self.model_bigger_TS).data
+        generated_ts = model.to_rule_based_model().generate_transition_system()
+        loaded_ts = load_TS_from_json("Testing/testing_bigger_ts.json")
+        self.assertEqual(generated_ts, loaded_ts)
+
+    def test_generate_transition_system_batch(self):
+        model = self.model_parser.parse(self.model_TS).data
+        vector_model = model.to_vector_model()
+        self.assertEqual(self.test_ts, vector_model.generate_transition_system(engine="batch"))
+
+        model = self.model_parser.parse(self.model_bigger_TS).data
+        vector_model = model.to_vector_model()
+        loaded_ts = load_TS_from_json("Testing/testing_bigger_ts.json")
+        self.assertEqual(loaded_ts, vector_model.generate_transition_system(engine="batch"))
+
+        # blocks of States give the same Edges as single States (including the "hell" state)
+        states = [vector_model.init, State(np.array([np.inf] * len(vector_model.init)))] + \
+                 [edge.target for edge in vector_model.compute_edges(vector_model.init)]
+        self.assertEqual(vector_model.compute_edges_batch(states), list(map(vector_model.compute_edges, states)))
+
+        model = self.model_parser.parse(self.model_even_bigger_TS).data
+        vector_model = model.to_vector_model()
+        generated_ts = vector_model.generate_transition_system(max_size=100, engine="batch")
+        self.assertEqual(len({edge.source for edge in generated_ts.edges}), 100)
+        self.assertTrue(generated_ts.unprocessed)
+
+        with self.assertRaises(InvalidInputError):
+            vector_model.generate_transition_system(engine="unknown")
+
+    def test_generate_transition_system_max_size(self):
+        model = self.model_parser.parse(self.model_even_bigger_TS).data
+        vector_model = model.to_vector_model()
+        generated_ts = vector_model.generate_transition_system(max_size=100)
+        self.assertEqual(len({edge.source for edge in generated_ts.edges}), 100)
+        self.assertTrue(generated_ts.unprocessed)
+
+    def test_generate_transition_system_distributed(self):
+        model = self.model_parser.parse(self.model_TS).data
+        vector_model = model.to_vector_model()
+        generated_ts = vector_model.generate_transition_system(processes=3)
+        self.assertEqual(self.test_ts, generated_ts)
+
+        model = self.model_parser.parse(self.model_bigger_TS).data
+        vector_model = model.to_vector_model()
+        generated_ts = vector_model.generate_transition_system(processes=2)
+        loaded_ts = load_TS_from_json("Testing/testing_bigger_ts.json")
+        self.assertEqual(generated_ts, loaded_ts)
+
+        # interrupted and continued
+        model = self.model_parser.parse(self.model_even_bigger_TS).data
+        vector_model = model.to_vector_model()
+        generated_ts = vector_model.generate_transition_system(max_size=1000, processes=2)
+        self.assertTrue(generated_ts.unprocessed)
+        self.assertEqual(len(generated_ts.states_encoding) - len(generated_ts.unprocessed), 1000)
+        generated_ts.save_to_json("Testing/TS_in_progress.json")
+        loaded_unfinished_ts = load_TS_from_json("Testing/TS_in_progress.json")
+        generated_ts = vector_model.generate_transition_system(loaded_unfinished_ts, processes=3)
+        loaded_ts = load_TS_from_json("Testing/interrupt_even_bigger_ts.json")
+        self.assertEqual(generated_ts, loaded_ts)
+
+    def test_expansion_limits(self):
+        self.assertEqual(expansion_limits([5, 0, 3], 6), [5, 0, 1])
+        self.assertEqual(expansion_limits([5, 2], np.inf), [5, 2])
+        self.assertEqual(expansion_limits([5, 2], 0), [0, 0])
+
     def test_save_to_json(self):
         model = self.model_parser.parse(self.model_TS).data
         vector_model = model.to_vector_model()
@@ -314,6 +447,68 @@ class TestVectorModel(unittest.TestCase):
 
         self.assertEqual(generated_ts, loaded_ts)
 
+    def test_generate_transition_system_batch_interrupt(self):
+        model = self.model_parser.parse(self.model_bigger_TS).data
+        vector_model = model.to_vector_model()
+        done = Scheduler.done
+        calls = []
+
+        def interrupted_done(scheduler, source, edges):
+            calls.append(source)
+            if len(calls) == 3:
+                raise KeyboardInterrupt
+            done(scheduler, source, edges)
+
+        # interrupted in the middle of a block
+        with mock.patch.object(Scheduler, "done", interrupted_done):
+            generated_ts = vector_model.generate_transition_system(engine="batch")
+        self.assertTrue(generated_ts.unprocessed)
+
+        generated_ts = vector_model.generate_transition_system(generated_ts, engine="batch")
+        self.assertEqual(generated_ts, load_TS_from_json("Testing/testing_bigger_ts.json"))
+
+    def test_generate_transition_system_non_contiguous_codes(self):
+        model = self.model_parser.parse(self.model_bigger_TS).data
+        vector_model = model.to_vector_model()
+        generated_ts = vector_model.generate_transition_system(max_size=200)
+
+        # codes of the loaded TS differ from the ones assigned during generating
+        with tempfile.TemporaryDirectory() as directory:
+            ts_file = os.path.join(directory, "ts.json")
+            generated_ts.save_to_json(ts_file)
+            with open(ts_file) as file:
+                data = json.load(file)
+            data["nodes"] = {str(int(code) * 3): state for code, state in data["nodes"].items()}
+            for edge in data["edges"]:
+                edge["s"], edge["t"] = edge["s"] * 3, edge["t"] * 3
+            data["initial"] *= 3
+            with open(ts_file, "w") as file:
+                json.dump(data, file)
+            loaded_ts = load_TS_from_json(ts_file)
+
+        generated_ts = vector_model.generate_transition_system(loaded_ts)
+        self.assertEqual(generated_ts, load_TS_from_json("Testing/testing_bigger_ts.json"))
+
+    def test_generate_transition_system_error(self):
+        model = self.model_parser.parse(self.model_bigger_TS).data
+        vector_model = model.to_vector_model()
+        compute_edges = VectorModel.compute_edges
+        calls = []
+
+        def failing_compute_edges(model, state):
+            calls.append(state)
+            if len(calls) == 3:
+                raise RuntimeError("failed")
+            return compute_edges(model, state)
+
+        # error of a worker is raised by the generating, not hidden in the worker thread
+        with mock.patch.object(VectorModel, "compute_edges", failing_compute_edges):
+            self.assertRaisesRegex(RuntimeError, "failed", vector_model.generate_transition_system)
+
+        # the same as in the batch engine
+        with mock.patch.object(VectorModel, "compute_edges_batch", side_effect=RuntimeError("failed")):
+            self.assertRaisesRegex(RuntimeError, "failed", vector_model.generate_transition_system, engine="batch")
+
     def test_handle_sinks(self):
         model = self.model_parser.parse(self.model_with_sinks).data
         vector_model = model.to_vector_model()
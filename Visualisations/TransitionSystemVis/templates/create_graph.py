@@ -1,19 +1,24 @@
 import collections
 import json
+import os
 import sys
 from numpy import inf
 
+# this add to path eBCSgen home dir, so binary TS can be loaded
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..")))
+
+from TS.BinaryTS import binary_TS_from_file, is_binary_TS
+
 
 def to_counter(state, ordering):
     """
     Transforms given state to Counter using given ordering
 
-    :param state: str representation of state
+    :param state: sequence of values of the state
     :param ordering: enumeration of agents
     :return: Counter representing the state
     """
-    state = eval(state)
-    if state[0] == inf:
+    if len(state) and state[0] == inf:
         return inf
     return +collections.Counter({ordering[i]: state[i] for i in range(len(ordering))})
 
@@ -89,19 +94,38 @@ def write_reaction(edge_id, left_index, right_index, substrates, products, rate)
         edge_id, left_index, right_index, side_to_string(substrates), side_to_string(products), rate)
 
 
-def create_HTML_graph(data):
-    output_file = firstpart
-
-    data = json.load(data)  # loads !!
+def load_data(filename):
+    """
+    Loads TS either from JSON or from binary format (its arrays are memory-mapped).
 
+    :param filename: given TS file
+    :return: ordering, dict of nodes (Counters of agents), list of edges (as dicts) and initial node
+    """
+    if is_binary_TS(filename):
+        data = binary_TS_from_file(filename)
+        nodes = {code: to_counter(data.state(row), data.ordering) for row, code in enumerate(data.codes.tolist())}
+        probabilities = list(data.probabilities)
+        edges = [{'s': source, 't': target, 'p': probability} for source, target, probability
+                 in zip(data.sources().tolist(), data.targets.tolist(), probabilities)]
+        return data.ordering, nodes, edges, data.initial
+
+    with open(filename, "r") as json_file:
+        data = json.load(json_file)
     ordering = data['ordering']
-    nodes = {int(key): to_counter(data['nodes'][key], ordering) for key in data['nodes'].keys()}
+    nodes = {int(key): to_counter(eval(data['nodes'][key]), ordering) for key in data['nodes'].keys()}
+    return ordering, nodes, data['edges'], data['initial']
+
+
+def create_HTML_graph(filename):
+    output_file = firstpart
+
+    ordering, nodes, data_edges, initial = load_data(filename)
 
     border_nodes = set()
 
     edges = []
     self_loops = []
-    for edge_id, edge in enumerate(data['edges'], 1):
+    for edge_id, edge in enumerate(data_edges, 1):
         substrates, products = create_sides(nodes[edge['s']], nodes[edge['t']])
         if edge['s'] == edge['t']:
             self_loops.append((edge_id, edge['s'], edge['t'], substrates, products, edge.get('p', None)))
@@ -133,8 +157,6 @@ def create_HTML_graph(data):
     for edge in self_loops:
         output_file += write_reaction(*edge)
 
-    initial = data['initial']
-
     iterations = (len(nodes)//100+1) * 100
     step = iterations//100
 
@@ -603,7 +625,5 @@ stabil_bar = \
                 var updateInterval = {};
 '''
 
-filename = open(sys.argv[-1], "r")
-
-graph = create_HTML_graph(filename)
+graph = create_HTML_graph(sys.argv[-1])
 print(graph)
@@ -109,3 +109,24 @@ class Storm_check(Text):
             dataset.peek = 'file does not exist'
             dataset.blurb = 'file purged from disk'
 
+
+# this class definition has to be added to file
+# ~/galaxy/lib/galaxy/datatypes/binary.py
+
+class BCS_TSB(Binary):
+    """Class describing a .bcs.tsb file (binary transition system)"""
+    file_ext = "bcs.tsb"
+
+    def sniff(self, filename):
+        """
+        Determines whether the file is in .bcs.tsb format
+        """
+        return open(filename, 'rb').read(8) == b"BCSTSB01"
+
+    def set_peek(self, dataset, is_multi_byte=False):
+        if not dataset.dataset.purged:
+            dataset.peek = "Binary transition system"
+            dataset.blurb = nice_size(dataset.get_size())
+        else:
+            dataset.peek = 'file does not exist'
+            dataset.blurb = 'file purged from disk'